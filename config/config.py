@@ -3,6 +3,8 @@ Configuration settings for the chatbot QA tests.
 """
 
 import os
+import tempfile
+from typing import Dict, List, Optional
 
 # Browser configuration
 BROWSER_TYPE: str = "chrome"  # Options: chrome, firefox, edge
@@ -11,10 +13,116 @@ HEADLESS: bool = True  # Set to False for debugging visual issues
 LARAIGO_CHATBOT_PROD: str = "https://demos.laraigo.com/QAOmar/Automatizacion.html"
 LARAIGO_CHATBOT_TEST: str = "https://demos.laraigo.com/QAOmar/AutomatizacionTST.html"
 
+# Environments selectable by name (e.g. main.py envdiff --baseline prod --candidate test)
+ENVIRONMENTS: Dict[str, str] = {
+    "prod": LARAIGO_CHATBOT_PROD,
+    "test": LARAIGO_CHATBOT_TEST,
+}
+
 PAGE_URL: str = LARAIGO_CHATBOT_TEST
 PAGE_TIMEOUT: int = 300
+FAST_POLL_INTERVAL: float = 0.05  # Seconds between DOM checks in fast waits (e.g. in-chat reset)
+CHAT_RESET_TIMEOUT: float = 10.0  # Seconds for the widget to be ready again after an in-chat reset
+CHAT_RESET_SETTLE: float = 0.05  # Seconds the new welcome must stay unchanged (multi-bubble greetings)
+INPUT_STRATEGY: str = "script"  # Options: script (one JS call), typing (send_keys, realistic)
 
 PYTEST_WORKERS: int = 5
 TEST_DATA_DIR: str = os.path.join(os.path.dirname(__file__), "../test_data")
 SCREENSHOT_DIR: str = os.path.join(os.path.dirname(__file__), "../screenshots")
-TAKE_SCREENSHOT_ON_FAILURE: bool = True
+TAKE_SCREENSHOT_ON_FAILURE: bool = False
+
+# Failure diagnostics: compressed snapshot of the chat history, console log and
+# last WebDriver commands, stored next to the screenshots and shown in the report
+DOM_SNAPSHOT_ON_FAILURE: bool = True
+SNAPSHOT_LAST_COMMANDS: int = 20
+
+# Browser resource sampling (CPU, RSS, threads, FDs of the driver process tree)
+RESOURCE_SAMPLING: bool = True
+RESOURCE_SAMPLE_INTERVAL: float = 0.5  # Seconds between samples
+MEMORY_GROWTH_THRESHOLD_MB: float = 5.0  # Peak RSS slope (MB per test) flagged as growth
+
+# WebDriver command instrumentation (count and time every driver round trip)
+COMMAND_INSTRUMENTATION: bool = True
+COMMAND_TOP_N: int = 10  # Chattiest call sites listed per test and per run
+
+# DevTools performance log (Chrome/Edge only): splits each reply latency into
+# network, server and render time. Opt-in, it adds log traffic to every message
+PERF_LOG_CAPTURE: bool = False
+
+# Live run dashboard served by the pytest controller (also enabled with --live-dashboard)
+LIVE_DASHBOARD: bool = False
+LIVE_DASHBOARD_PORT: int = 8765  # Local port of the dashboard (0 picks a free one)
+LIVE_DASHBOARD_WINDOW: int = 200  # Latest latencies per category in the rolling percentiles
+LIVE_STATUS_INTERVAL: float = 60.0  # Seconds between terminal status lines (0 disables them)
+
+# Metrics export (OpenMetrics): reply latency per case, outcomes, browser startup and page load
+METRICS_TEXTFILE: Optional[str] = os.path.join(os.path.dirname(__file__), "../reports/metrics/chatbot_qa.prom")  # Written by main.py runs (pytest: --metrics-textfile); None disables it
+METRICS_PORT: int = 0  # Local scrape endpoint served while the tests run (0 disables it)
+METRICS_LATENCY_BUCKETS: tuple = (0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 21.0, 34.0)
+METRICS_STARTUP_BUCKETS: tuple = (0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Run history (SQLite) and latency regression detection
+HISTORY_DB: str = os.path.join(os.path.dirname(__file__), "../reports/history.sqlite")
+HISTORY_BASELINE_RUNS: int = 10  # Previous runs in the rolling baseline
+REGRESSION_T_THRESHOLD: float = 3.0  # Minimum Welch t statistic for a regression
+REGRESSION_MIN_RATIO: float = 1.2  # Minimum current/baseline mean latency ratio
+REGRESSION_MIN_SAMPLES: int = 5  # Baseline samples needed to judge a test
+
+# Targeted retries of failed cases (main.py) and quarantine of chronically flaky cases
+RETRY_FAILED: bool = True
+RETRY_MAX_ATTEMPTS: int = 2  # Retry rounds; each round re-runs the cases still failing
+RETRY_BUDGET: int = 10  # Case re-executions allowed per run, across all rounds
+RETRY_BACKOFF: float = 5.0  # Seconds before the first round, doubled every round
+FLAKE_HISTORY_RUNS: int = 20  # Recent runs used for flake statistics
+QUARANTINE_FLAKY: bool = True  # Skip quarantined cases unless run with --run-quarantined
+QUARANTINE_FLAKE_RATE: float = 0.3  # Share of runs that needed a retry to pass
+QUARANTINE_MIN_RUNS: int = 5  # Runs a case needs before it can be quarantined
+
+# Stratified sampling of the cases (pytest --sample-budget, main.py --sample-budget and monitor)
+SAMPLE_ROTATION_CYCLES: int = 4  # Every case runs at least once every this many runs
+SAMPLE_HISTORY_RUNS: int = 10  # Recent runs used to weight failing and slow cases
+SAMPLE_FAILURE_WEIGHT: float = 4.0  # Extra weight of a case that failed in every recent run
+SAMPLE_SLOW_WEIGHT: float = 2.0  # Extra weight per multiple of its category median latency
+
+# Duration-aware scheduling across xdist workers (longest-first)
+DURATION_AWARE_SCHEDULING: bool = True
+DURATION_HISTORY_RUNS: int = 10  # Recent runs used to estimate test durations
+DEFAULT_TEST_DURATION: float = 30.0  # Seconds assumed for tests with no history
+
+# Soak mode: one long conversation in a single session (run with -m soak)
+SOAK_MESSAGES: int = 2000  # Messages sent from the corpus
+SOAK_MESSAGE_INTERVAL: float = 2.0  # Seconds between sends (fixed rate)
+SOAK_SAMPLE_EVERY: int = 25  # Turns between DOM / JS heap / RSS samples
+SOAK_LATENCY_GROWTH_RATIO: float = 1.5  # Late/early median latency ratio flagged
+SOAK_MEMORY_SLOPE_MB: float = 20.0  # JS heap or RSS growth (MB per 1000 turns) flagged
+
+# Benchmarks (run with -m benchmark)
+MEDIA_FIXTURE_DIR: str = os.path.join(tempfile.gettempdir(), "chatbot-qa-media")  # Generated media cache
+UPLOAD_BENCHMARK_SIZES_KB: List[int] = [10, 100, 1000, 5000]  # Attachment sizes per media type
+MESSAGE_SIZE_LENGTHS: List[int] = [1, 16, 64, 256, 1024, 4096]  # Message lengths (plus the input limit)
+MESSAGE_LATENCY_JUMP_RATIO: float = 1.5  # Latency ratio between consecutive lengths flagged as a jump
+MESSAGE_LATENCY_JUMP_MIN_S: float = 0.25  # Minimum latency increase (seconds) for a jump
+
+# Conversation flows (YAML scripts, run with -m flows or main.py flows)
+FLOW_DIR: str = os.path.join(os.path.dirname(__file__), "../flows")
+FLOW_MAX_LATENCY: float = 15.0  # Max seconds per turn for turns and flows that do not set one
+
+# Synthetic monitoring (main.py monitor): warm sessions answer a corpus sample every interval
+MONITOR_INTERVAL: float = 60.0  # Seconds between samples
+MONITOR_SAMPLE_SIZE: int = 6  # Corpus queries sent per interval
+MONITOR_SESSIONS: int = 2  # Warm browsers kept open
+MONITOR_SESSION_MAX_MESSAGES: int = 500  # Messages before a browser is recycled
+MONITOR_ALERT_P95: float = 10.0  # p95 reply latency (seconds) per category that fires an alert
+MONITOR_ALERT_FAILURE_RATE: float = 0.2  # Share of failed queries per category that fires an alert
+MONITOR_ALERT_WINDOW: int = 30  # Latest results per category evaluated
+MONITOR_ALERT_MIN_SAMPLES: int = 5  # Results needed before a category is evaluated
+MONITOR_ALERT_WEBHOOK: Optional[str] = os.environ.get("MONITOR_ALERT_WEBHOOK")  # JSON POST per alert
+
+# Environment comparison (main.py envdiff)
+ENVDIFF_REPEATS: int = 5  # Times every corpus query is sent to each environment
+
+# Remote execution on a Selenium Grid compatible endpoint (local browsers when unset)
+REMOTE_GRID_URL: Optional[str] = os.environ.get("REMOTE_GRID_URL")  # e.g. http://localhost:4444
+GRID_MAX_SESSIONS: int = 5  # Sessions leased at once per test process
+GRID_QUEUE_TIMEOUT: float = 300.0  # Seconds to wait for a free grid slot
+GRID_REUSE_SESSIONS: bool = True  # Clean and reuse released sessions instead of quitting them
@@ -7,23 +7,65 @@ import pytest
 import json
 import base64
 import time
+import html
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.remote.webdriver import WebDriver
 from pytest_html import extras
 
 from utils.logger import TestLogger
+from utils.driver_factory import create_driver
+from utils.resource_sampler import BrowserResourceSampler, detect_memory_growth
+from utils.tracing import TRACER, aggregate_spans, format_span_tree, phase_totals
+from utils.command_stats import CommandRecorder, merge_command_summaries
+from utils.history import RunHistory, normalize_test_id
+from utils.scheduling import LongestFirstScheduling
+from utils.benchmarks import latency_curve, throughput_curves
+from utils.slo import evaluate_slos, validate_objectives
+from utils.grid_pool import GridPool, grid_node_stats
+from utils.diagnostics import capture_snapshot, snapshot_html
+from utils.perf_log import summarize_breakdowns
+from utils.flow_runner import turn_timings
+from utils.live_dashboard import LiveDashboard
+from utils.metrics import create_registry, observe_test
+from utils.sampling import stratified_sample
+from utils.responses import ResponseInterner, group_by_response, response_groups_html
 from config.config import (
     BROWSER_TYPE,
+    COMMAND_INSTRUMENTATION,
+    COMMAND_TOP_N,
+    DEFAULT_TEST_DURATION,
+    DOM_SNAPSHOT_ON_FAILURE,
+    DURATION_AWARE_SCHEDULING,
+    DURATION_HISTORY_RUNS,
+    FLAKE_HISTORY_RUNS,
+    GRID_MAX_SESSIONS,
+    GRID_QUEUE_TIMEOUT,
+    GRID_REUSE_SESSIONS,
     HEADLESS,
+    HISTORY_DB,
+    LIVE_DASHBOARD,
+    LIVE_DASHBOARD_PORT,
+    LIVE_DASHBOARD_WINDOW,
+    LIVE_STATUS_INTERVAL,
+    MEMORY_GROWTH_THRESHOLD_MB,
+    MESSAGE_LATENCY_JUMP_MIN_S,
+    MESSAGE_LATENCY_JUMP_RATIO,
+    METRICS_LATENCY_BUCKETS,
+    METRICS_PORT,
+    METRICS_STARTUP_BUCKETS,
+    QUARANTINE_FLAKE_RATE,
+    QUARANTINE_FLAKY,
+    QUARANTINE_MIN_RUNS,
+    REMOTE_GRID_URL,
+    RESOURCE_SAMPLE_INTERVAL,
+    RESOURCE_SAMPLING,
+    SAMPLE_FAILURE_WEIGHT,
+    SAMPLE_HISTORY_RUNS,
+    SAMPLE_ROTATION_CYCLES,
+    SAMPLE_SLOW_WEIGHT,
     SCREENSHOT_DIR,
+    SNAPSHOT_LAST_COMMANDS,
     TAKE_SCREENSHOT_ON_FAILURE,
 )
 
@@ -34,6 +76,9 @@ def pytest_configure(config):
     if not os.path.exists(SCREENSHOT_DIR):
         os.makedirs(SCREENSHOT_DIR)
 
+    config.addinivalue_line(
+        "markers", "unit: mark an offline test of the harness utilities (no browser needed)"
+    )
     config.addinivalue_line("markers", "examples: mark a test as an example test")
     config.addinivalue_line(
         "markers", "laraigo: mark a test as a Laraigo-specific test"
@@ -41,6 +86,23 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "laraigo_ui: mark a test as a Laraigo-UI debug test"
     )
+    config.addinivalue_line(
+        "markers", "soak: mark a test as a long-running soak test (run with -m soak)"
+    )
+    config.addinivalue_line(
+        "markers", "benchmark: mark a test as a benchmark (run with -m benchmark)"
+    )
+    config.addinivalue_line(
+        "markers", "grid: mark a test of the remote grid session pool"
+    )
+    config.addinivalue_line(
+        "markers", "flows: mark a test that runs YAML conversation flows"
+    )
+    config.addinivalue_line(
+        "markers",
+        "slo(p95=..., max=..., mean=..., min_samples=...): latency objectives in seconds "
+        "evaluated over all cases and repeats of the test function",
+    )
 
     # Add custom CSS via environment variable which pytest-html will pick up
     css = """
@@ -51,17 +113,213 @@ def pytest_configure(config):
     if hasattr(config, "_metadata"):
         config._metadata["Test Data CSS"] = css
 
+    # The dashboard lives on the controller: workers only send their usual reports
+    global live_dashboard
+    port = config.getoption("live_dashboard")
+    if port is not None and not hasattr(config, "workerinput"):
+        live_dashboard = LiveDashboard(LIVE_DASHBOARD_WINDOW)
+        try:
+            url = live_dashboard.serve(port)
+        except OSError as e:
+            live_dashboard = None
+            print(f"Live dashboard not started on port {port}: {e}")
+        else:
+            print(f"Live dashboard: {url}")
+
+    metrics_port = config.getoption("metrics_port")
+    if metrics_port and not hasattr(config, "workerinput"):
+        try:
+            print(f"Metrics endpoint: {run_metrics.serve(metrics_port)}")
+        except OSError as e:
+            print(f"Metrics endpoint not started on port {metrics_port}: {e}")
+
+
+def pytest_addoption(parser):
+    """Add the command line options of the harness."""
+    parser.addoption(
+        "--run-quarantined",
+        action="store_true",
+        default=False,
+        help="Run cases quarantined for being chronically flaky",
+    )
+    parser.addoption(
+        "--live-dashboard",
+        nargs="?",
+        type=int,
+        const=LIVE_DASHBOARD_PORT,
+        default=LIVE_DASHBOARD_PORT if LIVE_DASHBOARD else None,
+        metavar="PORT",
+        help=f"Serve a live progress and latency dashboard (default port {LIVE_DASHBOARD_PORT})",
+    )
+    parser.addoption(
+        "--sample-budget",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Run a sample of N cases stratified by test function, weighted toward "
+        "recently failing or slow cases (repeats of a case count once)",
+    )
+    parser.addoption(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT,
+        metavar="PORT",
+        help="Serve the run metrics on a local /metrics scrape endpoint (0 disables it)",
+    )
+    parser.addoption(
+        "--metrics-textfile",
+        default=None,
+        metavar="PATH",
+        help="Write the run metrics to a .prom file for the node-exporter textfile collector",
+    )
+
+
+# Last, so the sample is drawn from the items left after -m/-k deselection
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """Validate SLO markers, skip quarantined and opt-in tests, and sample the cases if asked."""
+    for item in items:
+        marker = item.get_closest_marker("slo")
+        if marker is not None:
+            try:
+                validate_objectives(marker.kwargs)
+            except ValueError as e:
+                raise pytest.UsageError(f"{item.nodeid}: {e}")
+
+    markexpr = config.getoption("markexpr") or ""
+    for marker in OPT_IN_MARKERS:
+        if marker in markexpr:
+            continue
+        skip = pytest.mark.skip(reason=f"{marker} test: run with -m {marker}")
+        for item in items:
+            if marker in item.keywords:
+                item.add_marker(skip)
+
+    # Chronically flaky cases stop costing full timeouts on every run
+    if QUARANTINE_FLAKY and not config.getoption("run_quarantined") and os.path.exists(HISTORY_DB):
+        history = RunHistory(HISTORY_DB)
+        quarantined = history.quarantined(
+            FLAKE_HISTORY_RUNS, QUARANTINE_MIN_RUNS, QUARANTINE_FLAKE_RATE
+        )
+        history.close()
+        for item in items:
+            stats = quarantined.get(normalize_test_id(item.nodeid))
+            if stats is not None:
+                item.add_marker(
+                    pytest.mark.skip(
+                        reason=f"quarantined: flaky in {stats['flaky']}/{stats['runs']} recent runs "
+                        "(run with --run-quarantined)"
+                    )
+                )
+
+    budget = config.getoption("sample_budget")
+    if budget is not None:
+        _sample_items(config, items, budget)
+
+
+def _sample_items(config, items, budget):
+    """Deselect the cases left out of a stratified sample of the runnable items."""
+    cases = {
+        normalize_test_id(item.nodeid): item.nodeid.split("[")[0]
+        for item in items
+        if item.get_closest_marker("skip") is None
+    }
+    stats, cycle = {}, 0
+    if os.path.exists(HISTORY_DB):
+        history = RunHistory(HISTORY_DB)
+        stats = history.flake_stats(SAMPLE_HISTORY_RUNS)
+        # Each stored run is one cycle of the rotation
+        cycle = history.run_count()
+        history.close()
+    selected = set(
+        stratified_sample(
+            cases,
+            budget,
+            cycle,
+            SAMPLE_ROTATION_CYCLES,
+            stats,
+            SAMPLE_FAILURE_WEIGHT,
+            SAMPLE_SLOW_WEIGHT,
+        )
+    )
+    deselected = [
+        item
+        for item in items
+        if normalize_test_id(item.nodeid) in cases and normalize_test_id(item.nodeid) not in selected
+    ]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item not in deselected]
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Dispatch tests longest-first across xdist workers using the run history."""
+    if not DURATION_AWARE_SCHEDULING or config.getoption("dist") != "load":
+        return None
+
+    durations = {}
+    if os.path.exists(HISTORY_DB):
+        history = RunHistory(HISTORY_DB)
+        durations = history.durations(DURATION_HISTORY_RUNS)
+        history.close()
+    return LongestFirstScheduling(config, log, durations, DEFAULT_TEST_DURATION)
+
 
 @pytest.fixture(scope="function")
 def driver(request):
     """Fixture for WebDriver."""
+    start_time = time.perf_counter()
     driver = _setup_driver()
+    TEST_DATA[request.node.nodeid]["browser_startup_s"] = round(time.perf_counter() - start_time, 3)
+    if grid_pool is not None:
+        TEST_DATA[request.node.nodeid]["grid"] = grid_pool.lease_info(driver)
+    sampler = None
+    if RESOURCE_SAMPLING:
+        sampler = BrowserResourceSampler(driver, RESOURCE_SAMPLE_INTERVAL).start()
+        RESOURCE_SAMPLERS[request.node.nodeid] = sampler
     yield driver
-    driver.quit()
+    if sampler is not None:
+        sampler.stop()
+        RESOURCE_SAMPLERS.pop(request.node.nodeid, None)
+    _teardown_driver(driver)
 
 
 TEST_DATA = {}
+RESOURCE_SAMPLERS = {}
+# Distinct bot replies; tests keep only the fingerprint (response_id)
+RESPONSES = ResponseInterner()
+WORKER_ID = os.environ.get("PYTEST_XDIST_WORKER", "master")
 test_logger = TestLogger()
+command_recorder = CommandRecorder(COMMAND_TOP_N, SNAPSHOT_LAST_COMMANDS)
+grid_pool = (
+    GridPool(
+        REMOTE_GRID_URL,
+        GRID_MAX_SESSIONS,
+        GRID_QUEUE_TIMEOUT,
+        GRID_REUSE_SESSIONS,
+        BROWSER_TYPE,
+        HEADLESS,
+    )
+    if REMOTE_GRID_URL
+    else None
+)
+
+# SLO group results, evaluated on the controller at session finish
+SLO_RESULTS = {}
+
+# Live dashboard of the controller (started in pytest_configure with --live-dashboard)
+live_dashboard = None
+last_status_line = 0.0
+
+# Metrics of the run, fed on the controller and exported at session finish
+run_metrics = create_registry(METRICS_LATENCY_BUCKETS, METRICS_STARTUP_BUCKETS)
+
+# Long-running tests that only run when selected with -m
+OPT_IN_MARKERS = ("soak", "benchmark")
+
+# Spans reported as bot latency phases in the summary JSON and run history
+LATENCY_PHASES = ("LaraigoPage.page_load", "send_keys", "echo_wait", "reply_wait")
 
 
 @pytest.fixture(scope="function")
@@ -92,7 +350,19 @@ def pytest_runtest_protocol(item, nextitem):
         "error": None,
         "screenshot": None,
         "duration": None,
+        "worker": WORKER_ID,
+        "browser_resources": None,
+        "spans": None,
+        "webdriver_commands": None,
+        "status": None,
     }
+    # Cases of a test function with an slo marker are evaluated together at session end
+    slo_marker = item.get_closest_marker("slo")
+    if slo_marker is not None:
+        TEST_DATA[test_id]["slo"] = dict(slo_marker.kwargs)
+        TEST_DATA[test_id]["slo_group"] = test_id.split("[")[0]
+    TRACER.reset(test_id)
+    command_recorder.reset()
     # Log test start
     test_logger.log_test_start(test_id)
     yield
@@ -119,6 +389,22 @@ def pytest_runtest_makereport(item, call):
             duration = time.time() - TEST_DATA[test_id]["start_time"]
             TEST_DATA[test_id]["duration"] = duration
 
+            # Attach the span tree; root attributes are promoted to test data
+            spans = TRACER.finish()
+            TEST_DATA[test_id]["spans"] = spans
+            for key, value in spans.get("attributes", {}).items():
+                TEST_DATA[test_id][key] = value
+            TEST_DATA[test_id]["latency_phases"] = phase_totals(spans, LATENCY_PHASES)
+            TEST_DATA[test_id]["status"] = report.outcome
+
+            # Attach the WebDriver round trips issued so far by this test
+            TEST_DATA[test_id]["webdriver_commands"] = command_recorder.summary()
+
+            # Attach the browser resource usage sampled so far for this test
+            sampler = RESOURCE_SAMPLERS.get(test_id)
+            if sampler is not None:
+                TEST_DATA[test_id]["browser_resources"] = sampler.summary()
+
             # Include response_time in the HTML report if it exists
             if "response_time" in TEST_DATA[test_id]:
                 TEST_DATA[test_id]["response_time_ms"] = round(
@@ -157,38 +443,69 @@ def pytest_runtest_makereport(item, call):
                                 "error"
                             ] = f"Error getting messages: {str(e)}"
 
+            # Keep one copy of each distinct reply; the controller only receives new ones
+            response = TEST_DATA[test_id].pop("response_text", None)
+            if response is not None:
+                fingerprint, new = RESPONSES.intern(response)
+                TEST_DATA[test_id]["response_id"] = fingerprint
+                if new:
+                    report.responses = {fingerprint: RESPONSES.texts[fingerprint]}
+
     if report.when == "call" and report.failed:
         driver = item.funcargs.get("driver", None)
-        if driver and TAKE_SCREENSHOT_ON_FAILURE:
-            screenshot_name = f"failure_{item.name}"
-            screenshot_path = take_screenshot(driver, screenshot_name)
-            if screenshot_path and test_id in TEST_DATA:
-                TEST_DATA[test_id]["screenshot"] = screenshot_path
-                TEST_DATA[test_id]["error"] = (
-                    report.longrepr.reprcrash.message
-                    if hasattr(report, "longrepr")
-                    and hasattr(report.longrepr, "reprcrash")
-                    else "Test failed"
+        if driver and test_id in TEST_DATA:
+            TEST_DATA[test_id]["error"] = (
+                report.longrepr.reprcrash.message
+                if hasattr(report, "longrepr")
+                and hasattr(report.longrepr, "reprcrash")
+                else "Test failed"
+            )
+            failure_extras = []
+
+            # Compressed DOM/console/commands snapshot, viewable inline in the report
+            if DOM_SNAPSHOT_ON_FAILURE:
+                capture = capture_snapshot(
+                    driver,
+                    command_recorder.commands,
+                    SNAPSHOT_LAST_COMMANDS,
+                    SCREENSHOT_DIR,
+                    f"failure_{item.name}",
                 )
+                if capture:
+                    TEST_DATA[test_id]["snapshot"] = {
+                        key: capture[key] for key in ("path", "bytes", "capture_ms")
+                    }
+                    failure_extras.append(extras.html(snapshot_html(capture)))
 
-                # Add the screenshot to the HTML report
-                try:
-                    with open(screenshot_path, "rb") as img_file:
-                        screenshot_base64 = base64.b64encode(img_file.read()).decode(
-                            "utf-8"
+            if TAKE_SCREENSHOT_ON_FAILURE:
+                screenshot_name = f"failure_{item.name}"
+                start = time.perf_counter()
+                screenshot_path = take_screenshot(driver, screenshot_name)
+                if screenshot_path:
+                    TEST_DATA[test_id]["screenshot"] = screenshot_path
+                    TEST_DATA[test_id]["screenshot_ms"] = round(
+                        (time.perf_counter() - start) * 1000, 2
+                    )
+
+                    # Add the screenshot to the HTML report
+                    try:
+                        with open(screenshot_path, "rb") as img_file:
+                            screenshot_base64 = base64.b64encode(img_file.read()).decode(
+                                "utf-8"
+                            )
+                        failure_extras.append(
+                            extras.image(screenshot_base64, screenshot_name)
                         )
-                    report.extras = [
-                        extras.html(
-                            f'<div class="test-data"><h3>Test Data</h3><pre>{json.dumps(TEST_DATA[test_id], indent=2)}</pre></div>'
-                        ),
-                        extras.image(screenshot_base64, screenshot_name),
-                    ]
-                except Exception as e:
-                    report.extras = [
-                        extras.html(
-                            f'<div class="test-data"><h3>Test Data</h3><pre>{json.dumps(TEST_DATA[test_id], indent=2)}</pre><p>Error loading screenshot: {str(e)}</p></div>'
+                    except Exception as e:
+                        failure_extras.append(
+                            extras.html(f"<p>Error loading screenshot: {str(e)}</p>")
                         )
-                    ]
+
+            report.extras = [
+                extras.html(
+                    f'<div class="test-data"><h3>Test Data</h3><pre>{json.dumps(TEST_DATA[test_id], indent=2)}</pre></div>'
+                )
+            ] + failure_extras
 
     # Add test data to the report for passed tests too
     if report.when == "call" and report.passed and test_id in TEST_DATA:
@@ -199,14 +516,13 @@ def pytest_runtest_makereport(item, call):
         if TEST_DATA[test_id].get("sent_message"):
             test_data_html += f'<tr><td style="padding:8px; border:1px solid #ddd; font-weight:bold;">Sent Message:</td><td style="padding:8px; border:1px solid #ddd;">{TEST_DATA[test_id]["sent_message"]}</td></tr>'
 
-        if TEST_DATA[test_id].get("response_text"):
-            # Format the response text (could be a list or string)
-            response = TEST_DATA[test_id]["response_text"]
-            if isinstance(response, list):
-                response_formatted = "<br>".join(response)
-            else:
-                response_formatted = str(response)
-            test_data_html += f'<tr><td style="padding:8px; border:1px solid #ddd; font-weight:bold;">Bot Response:</td><td style="padding:8px; border:1px solid #ddd;">{response_formatted}</td></tr>'
+        if TEST_DATA[test_id].get("response_id"):
+            # The full text is shown once per distinct reply in the Test Data Summary
+            fingerprint = TEST_DATA[test_id]["response_id"]
+            preview = RESPONSES.texts[fingerprint].split("\n")[0]
+            if len(preview) > 80:
+                preview = preview[:80] + "..."
+            test_data_html += f'<tr><td style="padding:8px; border:1px solid #ddd; font-weight:bold;">Bot Response:</td><td style="padding:8px; border:1px solid #ddd;">{html.escape(preview)} <span style="font-family:monospace; color:#888;">[{fingerprint}]</span></td></tr>'
 
         # Add response time if it exists
         if TEST_DATA[test_id].get("response_time"):
@@ -218,19 +534,297 @@ def pytest_runtest_makereport(item, call):
             duration_sec = round(TEST_DATA[test_id]["duration"], 2)
             test_data_html += f'<tr><td style="padding:8px; border:1px solid #ddd; font-weight:bold;">Test Duration:</td><td style="padding:8px; border:1px solid #ddd;">{duration_sec} sec</td></tr>'
 
+        # Add browser resource usage if it was sampled
+        resources = TEST_DATA[test_id].get("browser_resources")
+        if resources:
+            test_data_html += (
+                f'<tr><td style="padding:8px; border:1px solid #ddd; font-weight:bold;">Browser Resources:</td><td style="padding:8px; border:1px solid #ddd;">'
+                f'CPU peak {resources["cpu_percent_peak"]}% / mean {resources["cpu_percent_mean"]}%<br>'
+                f'RSS peak {resources["rss_mb_peak"]} MB / mean {resources["rss_mb_mean"]} MB<br>'
+                f'Threads peak {resources["threads_peak"]} / FDs peak {resources["open_fds_peak"]}</td></tr>'
+            )
+
+        # Add WebDriver round-trip counts if they were recorded
+        commands = TEST_DATA[test_id].get("webdriver_commands")
+        if commands:
+            top_sites = "<br>".join(
+                f"{html.escape(site)}: {count}" for site, count in commands["top_call_sites"]
+            )
+            test_data_html += (
+                f'<tr><td style="padding:8px; border:1px solid #ddd; font-weight:bold;">WebDriver Commands:</td><td style="padding:8px; border:1px solid #ddd;">'
+                f'{commands["count"]} round trips / {commands["total_ms"]} ms<br>{top_sites}</td></tr>'
+            )
+
+        # Add the soak verdict if this was a soak test
+        soak = TEST_DATA[test_id].get("soak")
+        if soak:
+            test_data_html += (
+                f'<tr><td style="padding:8px; border:1px solid #ddd; font-weight:bold;">Soak:</td><td style="padding:8px; border:1px solid #ddd;">'
+                f'{soak["turns"]} turns<br>Latency: {soak["latency"]}<br>'
+                f'Trends per 1000 turns: {soak["trends"]}</td></tr>'
+            )
+
         test_data_html += "</table>"
 
+        # Add the span tree in a collapsible section
+        if TEST_DATA[test_id].get("spans"):
+            span_lines = "\n".join(format_span_tree(TEST_DATA[test_id]["spans"]))
+            test_data_html += f'<details><summary style="margin-top:10px; cursor:pointer;">Trace</summary><pre>{html.escape(span_lines)}</pre></details>'
+
         # Add raw data in a collapsible section
         test_data_html += f'<details><summary style="margin-top:10px; cursor:pointer;">Raw Test Data</summary><pre>{json.dumps(TEST_DATA[test_id], indent=2)}</pre></details></div>'
 
         report.extras = [extras.html(test_data_html)]
 
+    # Tests that never reach the call phase still need a status
+    if report.when == "setup" and not report.passed and test_id in TEST_DATA:
+        TEST_DATA[test_id]["status"] = "skipped" if report.skipped else "error"
+        if report.failed:
+            TEST_DATA[test_id]["error"] = (
+                report.longrepr.reprcrash.message
+                if hasattr(report.longrepr, "reprcrash")
+                else str(report.longrepr)[-500:]
+            )
+
+    # Ship the test data with the report so the xdist controller can aggregate it
+    if test_id in TEST_DATA and (
+        report.when == "call" or (report.when == "setup" and not report.passed)
+    ):
+        report.test_data = TEST_DATA[test_id]
+
+
+def pytest_runtest_logstart(nodeid, location):
+    """Track the tests in flight for the live dashboard."""
+    if live_dashboard is not None:
+        live_dashboard.test_started(nodeid)
+
+
+def pytest_runtest_logreport(report):
+    """Merge test data sent by xdist workers and feed the run metrics and live dashboard."""
+    test_data = getattr(report, "test_data", None)
+    if test_data:
+        TEST_DATA.setdefault(report.nodeid, {}).update(test_data)
+    RESPONSES.update(getattr(report, "responses", None) or {})
+
+    if not (report.when == "call" or (report.when == "setup" and not report.passed)):
+        return
+    observe_test(run_metrics, report.nodeid, test_data or {}, report.outcome, BROWSER_TYPE)
+    if live_dashboard is None:
+        return
+    error = None
+    if report.failed and report.longreprtext:
+        error = report.longreprtext.strip().splitlines()[-1]
+    live_dashboard.test_finished(
+        report.nodeid,
+        report.outcome,
+        response_time=(test_data or {}).get("response_time"),
+        error=error,
+    )
+
+    global last_status_line
+    if LIVE_STATUS_INTERVAL and time.time() - last_status_line >= LIVE_STATUS_INTERVAL:
+        last_status_line = time.time()
+        print(f"\n{live_dashboard.status_line()}")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Evaluate SLO groups on the controller and fail the session if any is violated."""
+    if grid_pool is not None:
+        grid_pool.close()
+    if hasattr(session.config, "workerinput"):
+        return
+    if live_dashboard is not None:
+        live_dashboard.stop()
+    run_metrics.stop()
+    metrics_textfile = session.config.getoption("metrics_textfile")
+    if metrics_textfile and TEST_DATA:
+        try:
+            run_metrics.write_textfile(metrics_textfile)
+        except OSError as e:
+            print(f"Failed to write metrics textfile: {e}")
+    SLO_RESULTS.update(evaluate_slos(TEST_DATA))
+    # Groups without data (all cases skipped) do not fail the session
+    if exitstatus == pytest.ExitCode.OK and any(
+        result["passed"] is False for result in SLO_RESULTS.values()
+    ):
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def _memory_growth_by_worker():
+    """Detect browser memory growth across the tests run by each worker."""
+    series = {}
+    for data in sorted(TEST_DATA.values(), key=lambda d: d.get("start_time") or 0):
+        resources = data.get("browser_resources")
+        if resources:
+            series.setdefault(data.get("worker", "master"), []).append(
+                resources["rss_mb_peak"]
+            )
+
+    growth = {}
+    for worker, rss_series in series.items():
+        result = detect_memory_growth(
+            rss_series, threshold_mb=MEMORY_GROWTH_THRESHOLD_MB
+        )
+        if result is not None:
+            growth[worker] = result
+    return growth
+
 
 @pytest.hookimpl(hookwrapper=True)
 def pytest_terminal_summary(terminalreporter, exitstatus, config):
     """Add test data summary to HTML report."""
     yield
 
+    memory_growth = _memory_growth_by_worker()
+    for worker, result in memory_growth.items():
+        if result["growing"]:
+            terminalreporter.write_line(
+                f"WARNING: browser memory keeps growing on worker {worker} "
+                f"({result['slope_mb_per_test']} MB per test)",
+                yellow=True,
+            )
+
+    for test_id, data in TEST_DATA.items():
+        soak = data.get("soak")
+        if soak and (soak["latency_degraded"] or soak["memory_degraded"]):
+            terminalreporter.write_line(
+                f"WARNING: {test_id} degrades over {soak['turns']} turns "
+                f"(latency {soak['latency']}, trends {soak['trends']})",
+                yellow=True,
+            )
+
+    if SLO_RESULTS:
+        terminalreporter.write_sep("-", "latency SLOs per test function")
+        for group, result in SLO_RESULTS.items():
+            objectives = ", ".join(
+                f"{name}={o['measured']}{'' if name == 'min_samples' else 's'} (target {o['target']})"
+                for name, o in result["objectives"].items()
+            )
+            label = {"passed": "PASS", "failed": "FAIL", "no data": "NO DATA"}[result["status"]]
+            terminalreporter.write_line(
+                f"{label} {group} "
+                f"(n={result['samples']}, missing={result['missing']}): {objectives}",
+                green=result["passed"] is True,
+                red=result["passed"] is False,
+                yellow=result["passed"] is None,
+            )
+
+    grid_stats = grid_node_stats(
+        [
+            dict(
+                data["grid"],
+                commands=(data.get("webdriver_commands") or {}).get("count"),
+                command_ms=(data.get("webdriver_commands") or {}).get("total_ms"),
+            )
+            for data in TEST_DATA.values()
+            if data.get("grid")
+        ]
+    )
+    if grid_stats:
+        terminalreporter.write_sep("-", "grid sessions per node")
+        for node, row in grid_stats.items():
+            terminalreporter.write_line(
+                f"{node:<40} tests={row['tests']:<5} reused={row['reused']:<5} "
+                f"queue={row['queue_ms_mean']}/{row['queue_ms_max']} ms (mean/max)  "
+                f"create={row['create_ms_mean']} ms  command={row['mean_command_ms']} ms"
+            )
+
+    flow_timings = turn_timings(
+        [result for data in TEST_DATA.values() for result in data.get("flows") or []]
+    )
+    for flow, rows in flow_timings.items():
+        terminalreporter.write_sep("-", f"conversation flow turns: {flow}")
+        for row in rows:
+            terminalreporter.write_line(
+                f"{row['turn']:>3} {str(row['input'])[:40]:<40} mean={row['mean_s']} s  "
+                f"max={row['max_s']} s  (n={row['samples']}, failures={row['failures']})",
+                red=bool(row["failures"]),
+            )
+
+    latency_breakdown = summarize_breakdowns(
+        [b for data in TEST_DATA.values() for b in data.get("latency_breakdown") or []]
+    )
+    if latency_breakdown:
+        terminalreporter.write_sep(
+            "-", f"reply latency breakdown (performance log, {latency_breakdown['messages']} messages)"
+        )
+        for component in ("network_ms", "server_ms", "render_ms", "total_ms"):
+            values = latency_breakdown[component]
+            terminalreporter.write_line(
+                f"{component[:-3]:<10} "
+                + (f"mean={values['mean']} ms  max={values['max']} ms" if values else "n/a")
+            )
+
+    response_groups = group_by_response(TEST_DATA, RESPONSES.texts)
+    if response_groups:
+        terminalreporter.write_sep(
+            "-",
+            f"bot responses: {len(response_groups)} distinct for "
+            f"{sum(g['tests'] for g in response_groups)} tests",
+        )
+        for group in response_groups[:10]:
+            latency = group["latency"] or {}
+            preview = (group["text"] or "").split("\n")[0][:40]
+            terminalreporter.write_line(
+                f"{group['fingerprint']}  tests={group['tests']:<4} failed={group['failed']:<4} "
+                f"p50={latency.get('p50')} s  p95={latency.get('p95')} s  {preview}"
+            )
+
+    upload_curves = throughput_curves(
+        [data["upload"] for data in TEST_DATA.values() if data.get("upload")]
+    )
+    for media_type, points in upload_curves.items():
+        terminalreporter.write_sep("-", f"upload throughput vs size: {media_type}")
+        for point in points:
+            terminalreporter.write_line(
+                f"{point['size_kb']:>10} KB  bubble={point['bubble_s']:>8} s  "
+                f"ack={point['ack_s']} s  throughput={point['throughput_kb_s']} KB/s  (n={point['samples']})"
+            )
+
+    message_curves = latency_curve(
+        [data["message_size"] for data in TEST_DATA.values() if data.get("message_size")],
+        MESSAGE_LATENCY_JUMP_RATIO,
+        MESSAGE_LATENCY_JUMP_MIN_S,
+    )
+    for charset, curve in message_curves.items():
+        terminalreporter.write_sep("-", f"reply latency vs message length: {charset}")
+        for point in curve["points"]:
+            terminalreporter.write_line(
+                f"{point['length']:>8} chars  latency={point['latency_s']:>8} s  (n={point['samples']})"
+            )
+        if curve["fit"]:
+            terminalreporter.write_line(
+                f"fit: {curve['fit']['slope_ms_per_char']} ms/char + {curve['fit']['intercept_s']} s"
+            )
+        for jump in curve["jumps"]:
+            terminalreporter.write_line(
+                f"WARNING: latency jumps between {jump['from_length']} and {jump['to_length']} chars "
+                f"({jump['from_s']} s -> {jump['to_s']} s)",
+                yellow=True,
+            )
+
+    span_table = aggregate_spans(
+        [data["spans"] for data in TEST_DATA.values() if data.get("spans")]
+    )
+    if span_table:
+        terminalreporter.write_sep("-", "harness time per method (self time)")
+        for name, row in list(span_table.items())[:15]:
+            terminalreporter.write_line(
+                f"{name:<45} calls={row['calls']:<6} self={row['self_ms']:>10} ms  total={row['total_ms']:>10} ms"
+            )
+
+    command_summary = merge_command_summaries(
+        [data.get("webdriver_commands") for data in TEST_DATA.values()],
+        COMMAND_TOP_N,
+    )
+    if command_summary:
+        terminalreporter.write_sep(
+            "-",
+            f"webdriver round trips: {command_summary['count']} commands, {command_summary['total_ms']} ms",
+        )
+        for call_site, count in command_summary["top_call_sites"]:
+            terminalreporter.write_line(f"{call_site:<45} {count}")
+
     # Create a summary JSON file with all test data
     if config.getoption("htmlpath"):
         html_path = config.getoption("htmlpath")
@@ -242,18 +836,48 @@ def pytest_terminal_summary(terminalreporter, exitstatus, config):
             clean_data = {
                 "name": test_name,
                 "sent_message": data.get("sent_message", None),
-                "response_text": data.get("response_text", None),
-                "duration": round(data.get("duration", 0), 2),
+                "response_text": RESPONSES.texts.get(data.get("response_id")),
+                "response_id": data.get("response_id"),
+                "duration": round(data.get("duration") or 0, 2),
+                "response_time": data.get("response_time", None),
+                "latency_phases": data.get("latency_phases", None),
                 "error": data.get("error", None),
                 "screenshot": (
                     os.path.basename(data.get("screenshot", ""))
                     if data.get("screenshot")
                     else None
                 ),
-                "status": "failed" if data.get("error") else "passed",
+                "snapshot": (
+                    dict(data["snapshot"], path=os.path.basename(data["snapshot"]["path"]))
+                    if data.get("snapshot") and data["snapshot"].get("path")
+                    else data.get("snapshot")
+                ),
+                "status": data.get("status")
+                or ("failed" if data.get("error") else "passed"),
+                "worker": data.get("worker", None),
+                "input_strategy": data.get("input_strategy", None),
+                "browser_resources": data.get("browser_resources", None),
             }
+            for key in ("soak", "upload", "message_size", "grid", "latency_breakdown", "flows"):
+                if data.get(key):
+                    clean_data[key] = data[key]
+            if data.get("slo_group") in SLO_RESULTS:
+                clean_data["slo_passed"] = SLO_RESULTS[data["slo_group"]]["passed"]
             summary_data[test_id] = clean_data
 
+        # Replies are listed once in the grouped section, not per test
+        compact_summary = {
+            test_id: {key: value for key, value in data.items() if key != "response_text"}
+            for test_id, data in summary_data.items()
+        }
+
+        # Write the summary next to the HTML report so main.py can store it in the run history
+        try:
+            with open(_summary_json_path(html_path), "w", encoding="utf-8") as f:
+                json.dump(summary_data, f, indent=2)
+        except Exception as e:
+            print(f"Error writing test data summary JSON: {e}")
+
         try:
             # Add the summary to the HTML report
             if os.path.exists(html_path):
@@ -266,7 +890,47 @@ def pytest_terminal_summary(terminalreporter, exitstatus, config):
                     <h2>Test Data Summary</h2>
                     <details>
                         <summary>Click to view JSON summary of all tests</summary>
-                        <pre style="max-height: 500px; overflow: auto;">{json.dumps(summary_data, indent=2)}</pre>
+                        <pre style="max-height: 500px; overflow: auto;">{json.dumps(compact_summary, indent=2)}</pre>
+                    </details>
+                    <details open>
+                        <summary>Bot responses grouped by fingerprint ({len(response_groups)} distinct)</summary>
+                        {response_groups_html(response_groups)}
+                    </details>
+                    <details open>
+                        <summary>Latency SLOs per test function</summary>
+                        {_slo_table_html(SLO_RESULTS)}
+                    </details>
+                    <details>
+                        <summary>Harness time per method (flame-style, sorted by self time)</summary>
+                        {_span_table_html(span_table)}
+                    </details>
+                    <details>
+                        <summary>WebDriver round trips per command, method and call site</summary>
+                        <pre>{json.dumps(command_summary, indent=2)}</pre>
+                    </details>
+                    <details>
+                        <summary>Grid sessions and latency per node</summary>
+                        <pre>{json.dumps(grid_stats, indent=2)}</pre>
+                    </details>
+                    <details>
+                        <summary>Conversation flow timings per turn</summary>
+                        <pre>{json.dumps(flow_timings, indent=2, ensure_ascii=False)}</pre>
+                    </details>
+                    <details>
+                        <summary>Reply latency breakdown: network, server and render (performance log)</summary>
+                        <pre>{json.dumps(latency_breakdown, indent=2)}</pre>
+                    </details>
+                    <details>
+                        <summary>Upload throughput vs size per media type</summary>
+                        <pre>{json.dumps(upload_curves, indent=2)}</pre>
+                    </details>
+                    <details>
+                        <summary>Reply latency vs message length per charset (fit and jumps)</summary>
+                        <pre>{json.dumps(message_curves, indent=2)}</pre>
+                    </details>
+                    <details>
+                        <summary>Browser memory growth per worker</summary>
+                        <pre>{json.dumps(memory_growth, indent=2)}</pre>
                     </details>
                 </div>
                 """
@@ -282,6 +946,56 @@ def pytest_terminal_summary(terminalreporter, exitstatus, config):
             print(f"Error creating test data summary: {e}")
 
 
+def _summary_json_path(html_path):
+    """Return the path of the summary JSON written next to an HTML report."""
+    return os.path.splitext(html_path)[0] + ".json"
+
+
+def _slo_table_html(slo_results):
+    """Render the SLO group results as an HTML table."""
+    rows = ""
+    for group, result in slo_results.items():
+        color = {"passed": "#2ecc71", "failed": "#e74c3c", "no data": "#95a5a6"}[result["status"]]
+        verdicts = {True: "ok", False: "violated", None: "no data"}
+        objectives = "<br>".join(
+            f'{name}: {o["measured"]}{"" if name == "min_samples" else " s"} '
+            f'(target {o["target"]}) {verdicts[o["passed"]]}'
+            for name, o in result["objectives"].items()
+        )
+        rows += (
+            f'<tr><td style="padding:4px;">{html.escape(group)}</td>'
+            f'<td style="padding:4px; color:{color}; font-weight:bold;">{result["status"]}</td>'
+            f'<td style="padding:4px;">{result["samples"]} ({result["missing"]} missing)</td>'
+            f'<td style="padding:4px;">{objectives}</td></tr>'
+        )
+    return (
+        '<table style="width:100%; border-collapse: collapse;">'
+        "<tr><th>Test function</th><th>SLO</th><th>Samples</th><th>Objectives</th></tr>"
+        f"{rows}</table>"
+    )
+
+
+def _span_table_html(span_table):
+    """Render the aggregated span table as an HTML table with self-time bars."""
+    total_self = sum(row["self_ms"] for row in span_table.values()) or 1
+    rows = ""
+    for name, row in span_table.items():
+        share = round(row["self_ms"] * 100 / total_self, 1)
+        rows += (
+            f'<tr><td style="padding:4px;">{html.escape(name)}</td>'
+            f'<td style="padding:4px;">{row["calls"]}</td>'
+            f'<td style="padding:4px;">{row["self_ms"]}</td>'
+            f'<td style="padding:4px;">{row["total_ms"]}</td>'
+            f'<td style="padding:4px;">{row["mean_ms"]}</td>'
+            f'<td style="padding:4px; width:30%;"><div style="background:#e67e22; height:10px; width:{share}%;"></div></td></tr>'
+        )
+    return (
+        '<table style="width:100%; border-collapse: collapse;">'
+        "<tr><th>Span</th><th>Calls</th><th>Self (ms)</th><th>Total (ms)</th><th>Mean (ms)</th><th>Share of self time</th></tr>"
+        f"{rows}</table>"
+    )
+
+
 def take_screenshot(driver, name):
     """Take a screenshot and save it to the screenshots directory."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -298,36 +1012,16 @@ def take_screenshot(driver, name):
 
 
 def _setup_driver():
-    """Set up the WebDriver based on configuration."""
-    if BROWSER_TYPE.lower() == "chrome":
-        options = webdriver.ChromeOptions()
-        if HEADLESS:
-            options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        # Add additional options to improve headless stability
-        options.add_argument("--disable-gpu")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-infobars")
-        return webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=options
-        )
-
-    elif BROWSER_TYPE.lower() == "firefox":
-        options = webdriver.FirefoxOptions()
-        if HEADLESS:
-            options.add_argument("--headless")
-        return webdriver.Firefox(
-            service=FirefoxService(GeckoDriverManager().install()), options=options
-        )
+    """Set up the WebDriver based on configuration (grid lease or local browser)."""
+    driver = grid_pool.acquire() if grid_pool is not None else create_driver()
+    if COMMAND_INSTRUMENTATION:
+        command_recorder.install(driver)
+    return driver
 
-    elif BROWSER_TYPE.lower() == "edge":
-        options = webdriver.EdgeOptions()
-        if HEADLESS:
-            options.add_argument("--headless")
-        return webdriver.Edge(
-            service=EdgeService(EdgeChromiumDriverManager().install()), options=options
-        )
 
+def _teardown_driver(driver):
+    """Return a grid session to the pool or quit the local browser."""
+    if grid_pool is not None:
+        grid_pool.release(driver)
     else:
-        raise ValueError(f"Unsupported browser type: {BROWSER_TYPE}")
+        driver.quit()
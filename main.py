@@ -4,21 +4,574 @@ Simplified test runner for chatbot QA tests using pytest.
 """
 import os
 import sys
+import json
 import argparse
 import logging
+import signal
 import subprocess
+import time
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from config.config import PYTEST_WORKERS, SCREENSHOT_DIR
+from config.config import (
+    BROWSER_TYPE,
+    DEFAULT_TEST_DURATION,
+    DURATION_HISTORY_RUNS,
+    ENVDIFF_REPEATS,
+    ENVIRONMENTS,
+    FLAKE_HISTORY_RUNS,
+    FLOW_DIR,
+    FLOW_MAX_LATENCY,
+    HISTORY_BASELINE_RUNS,
+    HISTORY_DB,
+    LIVE_DASHBOARD_PORT,
+    MEDIA_FIXTURE_DIR,
+    METRICS_LATENCY_BUCKETS,
+    METRICS_PORT,
+    METRICS_STARTUP_BUCKETS,
+    METRICS_TEXTFILE,
+    MONITOR_ALERT_FAILURE_RATE,
+    MONITOR_ALERT_MIN_SAMPLES,
+    MONITOR_ALERT_P95,
+    MONITOR_ALERT_WEBHOOK,
+    MONITOR_ALERT_WINDOW,
+    MONITOR_INTERVAL,
+    MONITOR_SAMPLE_SIZE,
+    MONITOR_SESSION_MAX_MESSAGES,
+    MONITOR_SESSIONS,
+    PAGE_URL,
+    PYTEST_WORKERS,
+    QUARANTINE_FLAKE_RATE,
+    QUARANTINE_MIN_RUNS,
+    REGRESSION_MIN_RATIO,
+    REGRESSION_MIN_SAMPLES,
+    REGRESSION_T_THRESHOLD,
+    RETRY_BACKOFF,
+    RETRY_BUDGET,
+    RETRY_FAILED,
+    RETRY_MAX_ATTEMPTS,
+    SAMPLE_FAILURE_WEIGHT,
+    SAMPLE_HISTORY_RUNS,
+    SAMPLE_ROTATION_CYCLES,
+    SAMPLE_SLOW_WEIGHT,
+    SCREENSHOT_DIR,
+)
+from utils.corpus import CORPUS, corpus_messages
+from utils.envdiff import compare_environments, render_envdiff_html, run_corpus
+from utils.flow_runner import load_flows, run_flows, turn_timings
+from utils.history import RunHistory, git_revision
+from utils.metrics import create_registry, observe_test
+from utils.monitor import (
+    AlertEvaluator,
+    SyntheticMonitor,
+    monitor_summary,
+    post_alert,
+    sample_corpus,
+)
+from utils.scheduling import estimate_durations
+from utils.sharding import (
+    load_shard_plan,
+    write_shard_plan,
+    merge_fragments,
+    parse_shard,
+    partition_tests,
+    render_summary_html,
+)
+
+# Exit code used when the run passed but regressed against the history baseline
+REGRESSION_EXIT_CODE = 3
+
+
+def compare_with_baseline(history, run_id, logger):
+    """
+    Compare a stored run against the rolling baseline and log the findings.
+
+    Returns:
+        dict: Comparison result with "regressions" and "new_failures"
+    """
+    comparison = history.compare(
+        run_id,
+        window=HISTORY_BASELINE_RUNS,
+        t_threshold=REGRESSION_T_THRESHOLD,
+        min_ratio=REGRESSION_MIN_RATIO,
+        min_samples=REGRESSION_MIN_SAMPLES,
+    )
+    for regression in comparison["regressions"]:
+        logger.warning(
+            f"Latency regression: {regression['test']} "
+            f"{regression['baseline_mean']}s -> {regression['current_mean']}s "
+            f"(x{regression['ratio']}, t={regression['t']})"
+        )
+    for failure in comparison["new_failures"]:
+        logger.warning(f"New failure: {failure['test']} - {failure['error']}")
+    if not comparison["regressions"] and not comparison["new_failures"]:
+        logger.info("No regressions against the run history baseline")
+    return comparison
+
+
+def record_run_history(summary_file, report_file, exit_code, logger):
+    """
+    Store the summary JSON of a run in the history database.
+
+    Returns:
+        tuple: (RunHistory, run id) or (None, None) if there is no summary
+    """
+    if not os.path.exists(summary_file):
+        logger.warning(f"No summary found at {summary_file}; run not stored in history")
+        return None, None
+
+    with open(summary_file, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+
+    history = RunHistory(HISTORY_DB)
+    run_id = history.record_run(
+        summary,
+        page_url=PAGE_URL,
+        git_rev=git_revision(os.path.dirname(os.path.abspath(__file__))),
+        exit_code=exit_code,
+        report_path=report_file,
+    )
+    logger.info(f"Run stored in history as #{run_id} ({HISTORY_DB})")
+    return history, run_id
+
+
+def collect_test_ids(selection_args, count, logger):
+    """Collect the test ids pytest would run for the given selection."""
+    cmd_args = (
+        [sys.executable, "-m", "pytest", "--collect-only", "-q"]
+        + selection_args
+        + ["--count", str(count)]
+    )
+    logger.info(f"Collecting tests: {' '.join(cmd_args)}")
+    result = subprocess.run(cmd_args, capture_output=True, text=True)
+    return [line.strip() for line in result.stdout.splitlines() if "::" in line]
+
+
+def plan_shards(total, selection_args, count, logger):
+    """
+    Partition the collected tests into duration-balanced shards.
+
+    The durations (and a --sample-budget selection) come from the local run
+    history, so machines with different histories compute different
+    partitions; see select_shard().
+
+    Returns:
+        list: One (test ids, estimated seconds) tuple per shard
+    """
+    test_ids = collect_test_ids(selection_args, count, logger)
+
+    durations = {}
+    if os.path.exists(HISTORY_DB):
+        history = RunHistory(HISTORY_DB)
+        durations = history.durations(DURATION_HISTORY_RUNS)
+        history.close()
+    estimates = estimate_durations(test_ids, durations, DEFAULT_TEST_DURATION)
+
+    bins = partition_tests(test_ids, estimates, total)
+    for i, (ids, load) in enumerate(bins, start=1):
+        logger.info(f"Shard {i}/{total}: {len(ids)} tests, ~{load}s estimated")
+    return bins
+
+
+def select_shard(shard, selection_args, count, timestamp, logger, plan_path=None):
+    """
+    Compute the tests of one shard and write them to an args file for pytest.
+
+    With plan_path, the partition is read from that shared plan file, or
+    computed and written there if it does not exist yet, so every machine
+    runs its part of the same partition whatever its local history.
+
+    Returns:
+        list: pytest arguments selecting the shard's tests
+
+    Raises:
+        ValueError: If the shard or the plan does not match this run
+    """
+    index, total = parse_shard(shard)
+    if plan_path and os.path.exists(plan_path):
+        bins = load_shard_plan(plan_path, total, count)
+        logger.info(f"Using shard plan {plan_path}")
+    else:
+        bins = plan_shards(total, selection_args, count, logger)
+        if plan_path:
+            write_shard_plan(plan_path, bins, count)
+            logger.info(f"Shard plan written to {plan_path}")
+
+    shard_ids, _ = bins[index - 1]
+    ids_file = f"reports/{timestamp}_shard-{index}-of-{total}_tests.txt"
+    with open(ids_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(shard_ids) + "\n")
+    # pytest reads arguments from files passed as @<path>
+    return ["@" + ids_file]
+
+
+def merge_shards(fragment_paths, timestamp, logger):
+    """
+    Merge shard result fragments into one summary JSON and HTML report.
+
+    Returns:
+        tuple: (summary JSON path, HTML report path, exit code of the merged run)
+    """
+    summary = merge_fragments(fragment_paths)
+    summary_file = f"reports/{timestamp}_merged.json"
+    report_file = f"reports/{timestamp}_merged.html"
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    with open(report_file, "w", encoding="utf-8") as f:
+        f.write(render_summary_html(summary, f"Merged report ({len(fragment_paths)} shards)"))
+    logger.info(f"Merged {len(fragment_paths)} fragments into {report_file}")
+
+    failed = any(data.get("status") in ("failed", "error") for data in summary.values())
+    return summary_file, report_file, 1 if failed else 0
+
+
+def retry_failed_cases(summary_file, verbosity_args, parallel, count, timestamp, logger):
+    """
+    Re-run only the failed cases of a run, each round in a new pytest session.
+
+    Rounds are spaced with exponential backoff and stop when RETRY_MAX_ATTEMPTS
+    rounds ran or RETRY_BUDGET case re-executions were spent. A case that
+    passes on a retry replaces its failed result and is marked flaky; the
+    summary JSON is rewritten so the run history keeps the attempts.
+
+    Returns:
+        bool: True if every failed case passed on a retry
+    """
+    with open(summary_file, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    failing = [t for t, d in summary.items() if d.get("status") in ("failed", "error")]
+    if not failing:
+        return False
+
+    budget = RETRY_BUDGET
+    for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+        batch = failing[: max(budget, 0)]
+        if not batch:
+            break
+        delay = RETRY_BACKOFF * 2 ** (attempt - 1)
+        logger.info(
+            f"Retry round {attempt}: {len(batch)} failed cases in {delay}s "
+            f"({budget - len(batch)} re-executions left in the budget)"
+        )
+        time.sleep(delay)
+
+        ids_file = f"reports/{timestamp}_retry-{attempt}_tests.txt"
+        with open(ids_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(batch) + "\n")
+        retry_report = f"reports/{timestamp}_retry-{attempt}_report.html"
+        workers = min(parallel, len(batch))
+        # With --count the ids carry their repetition ("[case-2-5]") and select that
+        # single execution; --count is only passed so that those ids exist
+        cmd_args = (
+            [sys.executable, "-m", "pytest"]
+            + verbosity_args
+            + (["-n", str(workers)] if workers > 1 else [])
+            + ["@" + ids_file, "--count", str(count)]
+            + ["--html=" + retry_report, "--self-contained-html", "--capture=tee-sys"]
+        )
+        logger.info(f"Running command: {' '.join(cmd_args)}")
+        subprocess.run(cmd_args, capture_output=False)
+
+        retry_summary_file = os.path.splitext(retry_report)[0] + ".json"
+        retried = {}
+        if os.path.exists(retry_summary_file):
+            with open(retry_summary_file, "r", encoding="utf-8") as f:
+                retried = json.load(f)
+        # Charge what the retry session actually ran, never less than the batch
+        budget -= max(len(batch), len(retried))
+        for test_id in batch:
+            previous = summary[test_id]
+            attempts = previous.get("attempts", 1) + 1
+            errors = previous.get("retry_errors", []) + [previous.get("error")]
+            result = retried.get(test_id)
+            if result and result.get("status") == "passed":
+                summary[test_id] = dict(result, attempts=attempts, retry_errors=errors, flaky=True)
+                logger.info(f"Passed on retry {attempt}: {test_id}")
+            else:
+                summary[test_id] = dict(
+                    result or previous, attempts=attempts, retry_errors=errors
+                )
+            # SLOs are judged on the full run, not on the retried subset
+            summary[test_id]["slo_passed"] = previous.get("slo_passed")
+        failing = [t for t in failing if summary[t].get("status") in ("failed", "error")]
+
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    for test_id in failing:
+        logger.warning(f"Still failing after retries: {test_id}")
+    return not failing
+
+
+def slo_violated(summary_file):
+    """Check if a run summary records a violated latency SLO."""
+    with open(summary_file, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    return any(data.get("slo_passed") is False for data in summary.values())
+
+
+def report_flakes(logger):
+    """
+    Print the flake statistics of the run history and the quarantined cases.
+
+    Returns:
+        dict: test key -> flake statistics, flakiest first
+    """
+    history = RunHistory(HISTORY_DB)
+    stats = history.flake_stats(FLAKE_HISTORY_RUNS)
+    quarantined = history.quarantined(
+        FLAKE_HISTORY_RUNS, QUARANTINE_MIN_RUNS, QUARANTINE_FLAKE_RATE
+    )
+    history.close()
+
+    stats = dict(
+        sorted(stats.items(), key=lambda i: (i[1]["flake_rate"], i[1]["fail_rate"]), reverse=True)
+    )
+    for key, row in stats.items():
+        if row["flaky"] or key in quarantined:
+            retry_latency = (
+                f"{row['retry_latency']}s" if row["retry_latency"] is not None else "n/a"
+            )
+            logger.info(
+                f"{'QUARANTINED ' if key in quarantined else ''}{key}: flaky {row['flaky']}/{row['runs']} "
+                f"({row['flake_rate']:.0%}), failed {row['failed']}, retry latency {retry_latency}"
+            )
+    logger.info(f"{len(quarantined)} quarantined cases (threshold {QUARANTINE_FLAKE_RATE:.0%})")
+    return stats
+
+
+def compare_environment_pair(baseline_env, candidate_env, repeats, timestamp, logger):
+    """
+    Send the corpus to two environments concurrently and write a diff report.
+
+    Returns:
+        tuple: (comparison dict, HTML report path)
+    """
+    messages = corpus_messages(sum(len(c["queries"]) for c in CORPUS.values()))
+    logger.info(
+        f"Comparing {baseline_env} vs {candidate_env}: {len(messages)} queries x {repeats} repeats"
+    )
+    # Both environments run at the same time so they see the same network conditions
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        baseline_future = executor.submit(
+            run_corpus, ENVIRONMENTS[baseline_env], messages, repeats
+        )
+        candidate_future = executor.submit(
+            run_corpus, ENVIRONMENTS[candidate_env], messages, repeats
+        )
+        baseline, candidate = baseline_future.result(), candidate_future.result()
+
+    comparison = compare_environments(
+        baseline, candidate, REGRESSION_T_THRESHOLD, REGRESSION_MIN_RATIO
+    )
+    comparison.update(baseline=baseline_env, candidate=candidate_env, repeats=repeats)
+
+    report_file = f"reports/{timestamp}_envdiff_{baseline_env}-vs-{candidate_env}.html"
+    with open(os.path.splitext(report_file)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump(comparison, f, indent=2, ensure_ascii=False)
+    with open(report_file, "w", encoding="utf-8") as f:
+        f.write(
+            render_envdiff_html(comparison, f"{baseline_env} vs {candidate_env}")
+        )
+
+    for row in comparison["queries"]:
+        if row["slower"]:
+            logger.warning(
+                f"Slower in {candidate_env}: {row['query']} "
+                f"{row['baseline_mean']}s -> {row['candidate_mean']}s (x{row['ratio']}, t={row['t']})"
+            )
+        if row["text_changed"]:
+            logger.info(f"Response changed: {row['query']}")
+    logger.info(
+        f"{comparison['text_changes']} text changes, {comparison['slower']} slower, "
+        f"{comparison['faster']} faster, {comparison['new_errors']} new errors. Report: {report_file}"
+    )
+    return comparison, report_file
+
+
+def run_conversation_flows(workers, count, timestamp, logger):
+    """
+    Run the YAML conversation flows in parallel and write per-turn timings.
+
+    Returns:
+        list: Flow results
+    """
+    flows = load_flows(FLOW_DIR)
+    logger.info(
+        f"Running {len(flows)} flows x {count} from {FLOW_DIR} with {workers} parallel sessions"
+    )
+
+    def log_result(result):
+        for turn in result["turns"]:
+            logger.info(
+                f"{result['name']} turn {turn['turn']} ({turn['input']}): {turn['latency_s']}s"
+                + (f" - {'; '.join(turn['failures'])}" if turn["failures"] else "")
+            )
+        if result.get("error"):
+            logger.error(f"{result['name']}: {result['error']}")
+        logger.info(f"Flow {result['name']} {'passed' if result['passed'] else 'FAILED'}")
+
+    results = []
+    for _ in range(count):
+        results += run_flows(
+            flows, PAGE_URL, workers, FLOW_MAX_LATENCY, MEDIA_FIXTURE_DIR, on_result=log_result
+        )
+    report_file = f"reports/{timestamp}_flows.json"
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(
+            {"flows": results, "turn_timings": turn_timings(results)},
+            f,
+            indent=2,
+            ensure_ascii=False,
+        )
+    passed = sum(r["passed"] for r in results)
+    logger.info(f"{passed}/{len(results)} flows passed. Results: {report_file}")
+    return results
+
+
+def run_monitor(interval, sample_size, sessions, iterations, metrics_port, logger):
+    """
+    Send a corpus sample on warm sessions every interval until stopped.
+
+    Each interval is stored in the history as a "monitor" run, exported to
+    the metrics textfile (and scrape endpoint) and checked against the alert
+    thresholds.
+
+    Returns:
+        int: Alerts still firing when the monitor stopped
+    """
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Let a service manager stop the daemon cleanly, quitting its browsers
+    signal.signal(signal.SIGTERM, stop)
+
+    monitor = SyntheticMonitor(PAGE_URL, sessions, MONITOR_SESSION_MAX_MESSAGES)
+    alerts = AlertEvaluator(
+        MONITOR_ALERT_P95, MONITOR_ALERT_FAILURE_RATE, MONITOR_ALERT_WINDOW, MONITOR_ALERT_MIN_SAMPLES
+    )
+    # Own prefix and file, so suite runs and the monitor can share a textfile collector
+    registry = create_registry(
+        METRICS_LATENCY_BUCKETS, METRICS_STARTUP_BUCKETS, prefix="chatbot_qa_monitor"
+    )
+    registry.gauge("warm_sessions", "Browsers kept open by the monitor")
+    registry.gauge("alerts_firing", "Monitor alerts currently firing")
+    textfile = (
+        os.path.splitext(METRICS_TEXTFILE)[0] + "_monitor.prom" if METRICS_TEXTFILE else None
+    )
+    if metrics_port:
+        logger.info(f"Metrics endpoint: {registry.serve(metrics_port)}")
+    history = RunHistory(HISTORY_DB)
+    git_rev = git_revision(os.path.dirname(os.path.abspath(__file__)))
+    logger.info(
+        f"Monitoring {PAGE_URL}: {sample_size} queries every {interval}s on {sessions} warm sessions"
+    )
+
+    completed = 0
+    next_tick = time.monotonic()
+    try:
+        while True:
+            messages = sample_corpus(
+                sample_size,
+                history.run_count(kind="monitor"),
+                SAMPLE_ROTATION_CYCLES,
+                history.flake_stats(SAMPLE_HISTORY_RUNS, kind="monitor"),
+                SAMPLE_FAILURE_WEIGHT,
+                SAMPLE_SLOW_WEIGHT,
+            )
+            results, startups = monitor.run_interval(messages)
+            for startup_s, page_load_s in startups:
+                registry.observe("browser_startup_seconds", {"browser": BROWSER_TYPE}, startup_s)
+                registry.observe("page_load_seconds", None, page_load_s)
+                logger.info(f"Browser session started in {startup_s}s, chat loaded in {page_load_s}s")
+
+            for test_id, data in monitor_summary(results).items():
+                observe_test(registry, test_id, data, data["status"], BROWSER_TYPE)
+                if data["status"] != "passed":
+                    logger.warning(f"{test_id} {data['status']}: {data['error']}")
+            # Queries never sent (no browser could be started) say nothing about the bot:
+            # keep them out of the history, the sampling weights and the alerts
+            sent = [r for r in results if r["status"] != "skipped"]
+            failed = sum(r["status"] == "failed" for r in sent)
+            run_id = history.record_run(
+                monitor_summary(sent),
+                page_url=PAGE_URL,
+                git_rev=git_rev,
+                exit_code=int(bool(failed)),
+                kind="monitor",
+            )
+
+            for result in sent:
+                alerts.add(result)
+            for alert in alerts.evaluate():
+                message = (
+                    f"ALERT {alert['state']}: {alert['category']} {alert['alert']} "
+                    f"{alert['value']} (threshold {alert['threshold']})"
+                )
+                if alert["state"] == "firing":
+                    logger.error(message)
+                else:
+                    logger.info(message)
+                if MONITOR_ALERT_WEBHOOK:
+                    try:
+                        post_alert(MONITOR_ALERT_WEBHOOK, dict(alert, page_url=PAGE_URL))
+                    except OSError as e:
+                        logger.warning(f"Alert webhook failed: {e}")
+
+            registry.set("warm_sessions", None, monitor.warm_sessions())
+            registry.set("alerts_firing", None, len(alerts.active))
+            if textfile:
+                try:
+                    registry.write_textfile(textfile)
+                except OSError as e:
+                    logger.warning(f"Failed to write metrics textfile: {e}")
+
+            latencies = sorted(r["response_time"] for r in results if r["response_time"] is not None)
+            logger.info(
+                f"Monitor run #{run_id}: {len(sent) - failed}/{len(sent)} passed"
+                + (f", {len(results) - len(sent)} skipped" if len(sent) < len(results) else "")
+                + (f", max latency {latencies[-1]}s" if latencies else "")
+            )
+
+            completed += 1
+            if iterations and completed >= iterations:
+                break
+            # Fixed rate; an interval that overran starts the next one right away
+            next_tick = max(next_tick + interval, time.monotonic())
+            time.sleep(next_tick - time.monotonic())
+    except KeyboardInterrupt:
+        logger.info("Monitor stopped")
+    finally:
+        monitor.close()
+        registry.stop()
+        history.close()
+    return len(alerts.active)
 
 
 def main():
     """Run chatbot QA tests with pytest."""
     # Parse arguments
     parser = argparse.ArgumentParser(description="Run Chatbot QA Tests")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        default="run",
+        choices=["run", "compare", "merge", "plan", "envdiff", "flows", "flakes", "monitor"],
+        help="run: execute the tests (default); compare: check the latest stored run against its baseline; "
+        "merge: combine shard result fragments; plan: write the shard partition to --shard-plan; "
+        "envdiff: compare two environments on the corpus; "
+        "flows: run the YAML conversation flows without pytest; "
+        "flakes: show per-case flake rates and the quarantined cases; "
+        "monitor: sample the corpus on warm browsers every interval (synthetic monitoring)",
+    )
+    parser.add_argument(
+        "fragments",
+        nargs="*",
+        help="Shard summary JSON files for the merge command",
+    )
     parser.add_argument(
         "--suite",
         default="all",
@@ -39,6 +592,101 @@ def main():
         default=1,
         help="Number of times to repeat the test run (default: 1)",
     )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help=f"Exit with code {REGRESSION_EXIT_CODE} when latency regressions or new failures are found",
+    )
+    parser.add_argument(
+        "--shard",
+        default=None,
+        help="Run only shard <index>/<total> of the collected tests, balanced by historical durations",
+    )
+    parser.add_argument(
+        "--shard-plan",
+        default=None,
+        help="Shared shard partition (JSON): read if it exists, otherwise computed and written. "
+        "Needed when the shard machines do not share the same history DB",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="Number of shards of the plan command",
+    )
+    parser.add_argument(
+        "--run-id",
+        type=int,
+        default=None,
+        help="Run to evaluate with the compare command (default: latest)",
+    )
+    parser.add_argument(
+        "--no-retry",
+        action="store_true",
+        help="Do not re-run failed cases (retries are on by default, see RETRY_* in config)",
+    )
+    parser.add_argument(
+        "--run-quarantined",
+        action="store_true",
+        help="Also run the cases quarantined for being chronically flaky",
+    )
+    parser.add_argument(
+        "--live-dashboard",
+        nargs="?",
+        type=int,
+        const=LIVE_DASHBOARD_PORT,
+        metavar="PORT",
+        help=f"Serve a live progress and latency dashboard during the run (default port {LIVE_DASHBOARD_PORT})",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=MONITOR_INTERVAL,
+        help=f"Seconds between corpus samples of the monitor command (default: {MONITOR_INTERVAL})",
+    )
+    parser.add_argument(
+        "--sample-budget",
+        type=int,
+        default=None,
+        help="Run a stratified sample of N cases, weighted toward recently failing or slow ones "
+        f"(run), or send N corpus queries per interval (monitor, default: {MONITOR_SAMPLE_SIZE})",
+    )
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=MONITOR_SESSIONS,
+        help=f"Warm browsers kept open by the monitor (default: {MONITOR_SESSIONS})",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=0,
+        help="Monitor intervals to run before exiting (default: 0, run until stopped)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT,
+        help="Serve the metrics of the run or monitor on a local /metrics endpoint (0 disables it)",
+    )
+    parser.add_argument(
+        "--baseline",
+        default="prod",
+        choices=sorted(ENVIRONMENTS),
+        help="Reference environment for the envdiff command (default: prod)",
+    )
+    parser.add_argument(
+        "--candidate",
+        default="test",
+        choices=sorted(ENVIRONMENTS),
+        help="Environment compared against the baseline by envdiff (default: test)",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=ENVDIFF_REPEATS,
+        help="Times every corpus query is sent to each environment by envdiff",
+    )
     args = parser.parse_args()
 
     # Setup basic directories
@@ -55,6 +703,74 @@ def main():
         handlers=[logging.FileHandler(log_file), logging.StreamHandler()],
     )
     logger = logging.getLogger(__name__)
+
+    if args.command == "compare":
+        history = RunHistory(HISTORY_DB)
+        run_id = args.run_id or history.latest_run_id()
+        if run_id is None:
+            logger.error(f"No runs stored in {HISTORY_DB}")
+            sys.exit(1)
+        comparison = compare_with_baseline(history, run_id, logger)
+        print(json.dumps(comparison, indent=2))
+        history.close()
+        sys.exit(
+            REGRESSION_EXIT_CODE
+            if comparison["regressions"] or comparison["new_failures"]
+            else 0
+        )
+
+    if args.command == "envdiff":
+        comparison, _ = compare_environment_pair(
+            args.baseline, args.candidate, args.repeats, timestamp, logger
+        )
+        # Gate the promotion on performance: slower queries or new errors fail it
+        sys.exit(
+            REGRESSION_EXIT_CODE
+            if comparison["slower"] or comparison["new_errors"]
+            else 0
+        )
+
+    if args.command == "flakes":
+        print(json.dumps(report_flakes(logger), indent=2))
+        sys.exit(0)
+
+    if args.command == "monitor":
+        firing = run_monitor(
+            args.interval,
+            args.sample_budget or MONITOR_SAMPLE_SIZE,
+            args.sessions,
+            args.iterations,
+            args.metrics_port,
+            logger,
+        )
+        sys.exit(1 if firing else 0)
+
+    if args.command == "flows":
+        try:
+            results = run_conversation_flows(args.parallel, args.count, timestamp, logger)
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(2)
+        sys.exit(0 if all(r["passed"] for r in results) else 1)
+
+    if args.command == "merge":
+        if not args.fragments:
+            logger.error("The merge command needs the shard summary JSON files")
+            sys.exit(2)
+        summary_file, report_file, exit_code = merge_shards(
+            args.fragments, timestamp, logger
+        )
+        history, run_id = record_run_history(summary_file, report_file, exit_code, logger)
+        comparison = compare_with_baseline(history, run_id, logger)
+        history.close()
+        if (
+            exit_code == 0
+            and args.fail_on_regression
+            and (comparison["regressions"] or comparison["new_failures"])
+        ):
+            exit_code = REGRESSION_EXIT_CODE
+        sys.exit(exit_code)
+
     logger.info("Starting test execution")
 
     # Build pytest arguments
@@ -63,21 +779,57 @@ def main():
     # Set verbosity
     if args.verbose:
         pytest_args.extend(["-" + "v" * args.verbose])
+    if args.run_quarantined:
+        pytest_args.append("--run-quarantined")
+    verbosity_args = list(pytest_args)
+    if args.live_dashboard is not None:
+        pytest_args.extend(["--live-dashboard", str(args.live_dashboard)])
+    if args.metrics_port:
+        pytest_args.extend(["--metrics-port", str(args.metrics_port)])
+    # Not passed to the retry sessions, which would overwrite it with the retried subset
+    if METRICS_TEXTFILE:
+        pytest_args.extend(["--metrics-textfile", METRICS_TEXTFILE])
 
     # Set parallel execution
     if args.parallel > 1:
         pytest_args.extend(["-n", str(args.parallel)])
 
     # Set test suite
+    selection_args = []
     if args.suite == "all":
-        pytest_args.append("tests/")
+        selection_args.append("tests/")
     else:
-        pytest_args.extend(["-m", args.suite])
+        selection_args.extend(["-m", args.suite])
+    # Part of the selection, so shards partition the sampled cases
+    if args.sample_budget:
+        selection_args.extend(["--sample-budget", str(args.sample_budget)])
+
+    if args.command == "plan":
+        if not args.shard_plan or not args.shards or args.shards < 1:
+            logger.error("The plan command needs --shard-plan and --shards N")
+            sys.exit(2)
+        write_shard_plan(
+            args.shard_plan, plan_shards(args.shards, selection_args, args.count, logger), args.count
+        )
+        logger.info(f"Shard plan written to {args.shard_plan}")
+        sys.exit(0)
 
     report_file = f"reports/{timestamp}_report.html"
+    if args.shard:
+        try:
+            selection_args = select_shard(
+                args.shard, selection_args, args.count, timestamp, logger, args.shard_plan
+            )
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(2)
+        index, total = parse_shard(args.shard)
+        report_file = f"reports/{timestamp}_shard-{index}-of-{total}_report.html"
+
     cmd_args = (
         [sys.executable, "-m", "pytest"]
         + pytest_args
+        + selection_args
         + ["--count", str(args.count)]
         + ["--html=" + report_file, "--self-contained-html", "--capture=tee-sys"]
     )
@@ -90,6 +842,39 @@ def main():
     else:
         logger.error(f"Test run failed with exit code {exit_code}")
 
+    summary_file = os.path.splitext(report_file)[0] + ".json"
+    # Only pytest's "tests failed" code (1) is retried, not usage or collection errors
+    if (
+        exit_code == 1
+        and RETRY_FAILED
+        and not args.no_retry
+        and os.path.exists(summary_file)
+    ):
+        if retry_failed_cases(
+            summary_file, verbosity_args, args.parallel, args.count, timestamp, logger
+        ):
+            logger.info("Every failed case passed on a retry")
+            if not slo_violated(summary_file):
+                exit_code = 0
+
+    if args.shard:
+        # Shards are stored in the history once merged, as a single run
+        logger.info(f"Shard results fragment written to {summary_file}")
+        sys.exit(exit_code)
+
+    history, run_id = record_run_history(summary_file, report_file, exit_code, logger)
+    if history is not None:
+        comparison = compare_with_baseline(history, run_id, logger)
+        history.close()
+        if (
+            exit_code == 0
+            and args.fail_on_regression
+            and (comparison["regressions"] or comparison["new_failures"])
+        ):
+            exit_code = REGRESSION_EXIT_CODE
+
+    sys.exit(exit_code)
+
 
 if __name__ == "__main__":
     main()
@@ -13,10 +13,15 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.remote.webdriver import WebDriver
 
+from config.config import CHAT_RESET_TIMEOUT, FAST_POLL_INTERVAL, INPUT_STRATEGY
+from utils.element_cache import LocatorCache, clickable, visible
+from utils.text_entry import enter_text
+from utils.tracing import TRACER, TracedWebDriverWait, trace_public_methods
 
+
+@trace_public_methods
 class ChatbotPage:
     """Page Object Model for the Chatbot interface."""
 
@@ -39,24 +44,36 @@ class ChatbotPage:
         By.XPATH,
         "//div[@id='chat-display']/div[contains(@class, 'bot-message')][last()]",
     )
+    # User messages the bot has not answered yet (no bot message after them)
+    UNANSWERED_USER_MESSAGES = (
+        By.XPATH,
+        "//div[@id='chat-display']/div[contains(@class, 'user-message')]"
+        "[not(following-sibling::div[contains(@class, 'bot-message')])]",
+    )
+
+    def __init__(self, driver: WebDriver, input_strategy: str = INPUT_STRATEGY):
+        """
+        Initialize the page with the provided WebDriver.
 
-    def __init__(self, driver: WebDriver):
-        """Initialize the page with the provided WebDriver."""
+        input_strategy selects how messages are entered: "script" (one JS call,
+        default) or "typing" (key-by-key send_keys, more realistic).
+        """
         self.driver: WebDriver = driver
-        self.wait: WebDriverWait = WebDriverWait(driver, 10)
+        self.input_strategy = input_strategy
+        self.wait: WebDriverWait = TracedWebDriverWait(driver, 10)
+        # Cached references to stable nodes (toggle, panel, input, send button)
+        self.elements = LocatorCache(driver)
 
     def open_chat(self) -> "ChatbotPage":
         """Open the chat panel by clicking the toggle button."""
         try:
-            self.wait.until(EC.element_to_be_clickable(self.CHAT_TOGGLE_BUTTON))
-            toggle_button: WebElement = self.driver.find_element(
-                *self.CHAT_TOGGLE_BUTTON
-            )
+            toggle_button = self.elements.get(self.CHAT_TOGGLE_BUTTON)
+            self.wait.until(clickable(toggle_button))
 
             if not self.is_chat_panel_visible():
                 toggle_button.click()
                 # Esperar a que el panel sea visible después de hacer clic
-                self.wait.until(EC.visibility_of_element_located(self.CHAT_PANEL))
+                self.wait.until(visible(self.elements.get(self.CHAT_PANEL)))
 
             return self
         except TimeoutException:
@@ -71,10 +88,8 @@ class ChatbotPage:
     def close_chat(self) -> "ChatbotPage":
         """Close the chat panel."""
         try:
-            self.wait.until(EC.element_to_be_clickable(self.CHAT_TOGGLE_BUTTON))
-            toggle_button: WebElement = self.driver.find_element(
-                *self.CHAT_TOGGLE_BUTTON
-            )
+            toggle_button = self.elements.get(self.CHAT_TOGGLE_BUTTON)
+            self.wait.until(clickable(toggle_button))
 
             if self.is_chat_panel_visible():
                 toggle_button.click()
@@ -94,13 +109,13 @@ class ChatbotPage:
     def send_message(self, message: str) -> "ChatbotPage":
         """Send a message to the chatbot."""
         try:
-            self.wait.until(EC.element_to_be_clickable(self.CHAT_INPUT))
-            chat_input: WebElement = self.driver.find_element(*self.CHAT_INPUT)
+            chat_input = self.elements.get(self.CHAT_INPUT)
+            self.wait.until(clickable(chat_input))
 
-            chat_input.clear()
-            chat_input.send_keys(message)
+            with TRACER.span("send_keys", strategy=self.input_strategy):
+                enter_text(self.driver, chat_input, message, self.input_strategy)
 
-            send_button: WebElement = self.driver.find_element(*self.SEND_BUTTON)
+            send_button = self.elements.get(self.SEND_BUTTON)
             send_button.click()
 
             return self
@@ -115,28 +130,29 @@ class ChatbotPage:
 
     def send_message_with_enter(self, message: str):
         """Send a message using the Enter key."""
-        chat_input = self.driver.find_element(*self.CHAT_INPUT)
+        chat_input = self.elements.get(self.CHAT_INPUT)
 
         try:
-            self.wait.until(EC.element_to_be_clickable(self.CHAT_INPUT))
+            self.wait.until(clickable(chat_input))
         except TimeoutException:
             raise TimeoutException(
                 "El campo de entrada del chat ('chat-input') no se volvió interactivo dentro del tiempo de espera."
             )
 
-        chat_input.clear()
-        chat_input.send_keys(message)
-        chat_input.send_keys(Keys.RETURN)
+        with TRACER.span("send_keys", strategy=self.input_strategy):
+            enter_text(self.driver, chat_input, message, self.input_strategy)
+            chat_input.send_keys(Keys.RETURN)
         return self
 
     def wait_for_bot_response(self):
         """Wait for the bot to respond and return the response text."""
         try:
             bot_msg_cnt = len(self.driver.find_elements(*self.BOT_MESSAGES))
-            self.wait.until(
-                lambda driver: len(driver.find_elements(*self.BOT_MESSAGES))
-                > bot_msg_cnt
-            )
+            with TRACER.span("reply_wait"):
+                self.wait.until(
+                    lambda driver: len(driver.find_elements(*self.BOT_MESSAGES))
+                    > bot_msg_cnt
+                )
             bot_response = self.driver.find_element(*self.LAST_BOT_MESSAGE)
             return bot_response.text
 
@@ -148,7 +164,7 @@ class ChatbotPage:
     def is_chat_panel_visible(self):
         """Check if the chat panel is visible."""
         try:
-            chat_panel: WebElement = self.driver.find_element(*self.CHAT_PANEL)
+            chat_panel = self.elements.get(self.CHAT_PANEL)
             return chat_panel.is_displayed()
         except Exception:
             return False
@@ -166,12 +182,42 @@ class ChatbotPage:
     def is_send_button_enabled(self):
         """Check if the send button is enabled."""
         try:
-            return self.driver.find_element(*self.SEND_BUTTON).is_enabled()
+            return self.elements.get(self.SEND_BUTTON).is_enabled()
         except TimeoutException:
             raise TimeoutException(
                 "El botón de envío ('send-button') no se volvió interactivo dentro del tiempo de espera."
             )
 
+    def reset_conversation(self) -> "ChatbotPage":
+        """Start a fresh conversation without reloading the page.
+
+        Waits until the last user message has a bot reply after it (so a
+        pending reply cannot arrive after the reset and be read as the next
+        one; the welcome message does not count as a reply), then clears the
+        rendered history and the input in a single script call and waits on
+        the DOM instead of reloading, which takes milliseconds instead of the
+        seconds of reset_state().
+        """
+        try:
+            TracedWebDriverWait(
+                self.driver, CHAT_RESET_TIMEOUT, poll_frequency=FAST_POLL_INTERVAL
+            ).until(
+                lambda driver: not driver.find_elements(*self.UNANSWERED_USER_MESSAGES)
+            )
+        except TimeoutException:
+            raise TimeoutException(
+                "La respuesta pendiente del bot no llegó antes de reiniciar la conversación."
+            )
+        self.driver.execute_script(
+            "document.getElementById('chat-display').replaceChildren();"
+            "document.getElementById('chat-input').value = '';"
+        )
+        self.wait.until(
+            lambda driver: not driver.find_elements(*self.BOT_MESSAGES)
+            and not driver.find_elements(*self.USER_MESSAGES)
+        )
+        return self
+
     def reset_state(self):
         """Reset the chat to its initial state.
 
@@ -179,6 +225,7 @@ class ChatbotPage:
         """
         try:
             self.driver.refresh()
+            self.elements.invalidate()
             self.wait.until(EC.presence_of_element_located(self.CHAT_TOGGLE_BUTTON))
             return self
         except Exception as e:
@@ -3,7 +3,7 @@ Page Object Model para la interfaz del chatbot Laraigo.
 Proporciona métodos para interactuar con los elementos específicos del chatbot de Laraigo.
 """
 
-from typing import List
+from typing import List, Optional, Tuple
 from selenium.common.exceptions import (
     TimeoutException,
     NoSuchElementException,
@@ -15,10 +15,101 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.remote.webdriver import WebDriver
-import time
 
-from config.config import PAGE_URL, PAGE_TIMEOUT
+from config.config import (
+    CHAT_RESET_SETTLE,
+    CHAT_RESET_TIMEOUT,
+    FAST_POLL_INTERVAL,
+    INPUT_STRATEGY,
+    PAGE_URL,
+    PAGE_TIMEOUT,
+    PERF_LOG_CAPTURE,
+)
+from utils.diagnostics import install_console_hook
+from utils.element_cache import LocatorCache, clickable, visible
+from utils.perf_log import DevToolsClock, attribute_latency, read_performance_log
+from utils.text_entry import enter_text
+from utils.tracing import TRACER, TracedWebDriverWait, trace_public_methods
+
+# Índice de mensajes en el navegador: un MutationObserver agrega cada nodo nuevo
+# del historial a una lista por rol, de modo que leer "lo nuevo desde el cursor"
+# no vuelve a recorrer la conversación completa.
+_MESSAGE_LOG_SCRIPT = """
+const [selectors, role, cursor] = arguments;
+let log = window.__qaMessageLog;
+if (!log) {
+    log = window.__qaMessageLog = {};
+    for (const key of Object.keys(selectors)) log[key] = [];
+    const seen = new WeakSet();
+    const index = (root) => {
+        for (const [key, selector] of Object.entries(selectors)) {
+            const nodes = root.matches && root.matches(selector)
+                ? [root] : Array.from(root.querySelectorAll(selector));
+            for (const node of nodes) {
+                if (!seen.has(node)) {
+                    seen.add(node);
+                    node.__qaAt = Date.now();
+                    log[key].push(node);
+                }
+            }
+        }
+    };
+    index(document);
+    new MutationObserver((mutations) => {
+        for (const mutation of mutations) {
+            for (const node of mutation.addedNodes) {
+                if (node.nodeType === Node.ELEMENT_NODE) index(node);
+            }
+        }
+    }).observe(document.body, {childList: true, subtree: true});
+}
+if (role === null) {
+    for (const key of Object.keys(log)) log[key].length = 0;
+    return null;
+}
+const nodes = log[role];
+if (cursor === null) {
+    return {texts: [], cursor: nodes.length};
+}
+// Un cursor mayor que el índice viene de antes de una recarga: se lee desde el inicio
+const start = cursor > nodes.length ? 0 : cursor;
+const added = nodes.slice(start);
+return {
+    texts: added.map((node) => node.innerText.trim()),
+    cursor: nodes.length,
+    at: added.length ? added[0].__qaAt : null,
+};
+"""
+
+# Estado "listo" del widget tras refrescar el historial: ningún mensaje de la
+# conversación anterior, ningún mensaje del usuario, input habilitado y el saludo nuevo
+# publicado. settle_ms solo cubre un saludo de varias burbujas (unas decenas de ms).
+_CHAT_READY_SCRIPT = """
+const [messageSelector, userSelector, botSelector, inputSelector, settleMs, mark] = arguments;
+if (mark) {
+    for (const node of document.querySelectorAll(messageSelector)) node.__qaBeforeRefresh = true;
+    window.__qaRefreshState = null;
+    return false;
+}
+for (const node of document.querySelectorAll(messageSelector)) {
+    if (node.__qaBeforeRefresh) return false;
+}
+if (document.querySelectorAll(userSelector).length) return false;
+const input = document.querySelector(inputSelector);
+if (!input || input.disabled || input.offsetParent === null) return false;
+const welcome = document.querySelectorAll(botSelector).length;
+if (!welcome) return false;
+const now = Date.now();
+const state = window.__qaRefreshState;
+if (!state || state.count !== welcome) {
+    window.__qaRefreshState = {count: welcome, since: now};
+    return false;
+}
+return now - state.since >= settleMs;
+"""
 
+
+@trace_public_methods
 class LaraigoPage:
     """Page Object Model para la interfaz del chatbot Laraigo."""
 
@@ -31,6 +122,7 @@ class LaraigoPage:
     CHAT_HISTORY = (By.ID, "chat-history-chatweb")
     BOT_MESSAGES = (By.CSS_SELECTOR, ".chat-message-chatweb-bot p")
     USER_MESSAGES = (By.CSS_SELECTOR, ".chat-message-chatweb-user p")
+    USER_BUBBLES = (By.CSS_SELECTOR, ".chat-message-chatweb-user")
     LAST_BOT_MESSAGE = (By.CSS_SELECTOR, ".lastbot .chat-message-chatweb-bot p")
     LAST_USER_MESSAGE = (By.CSS_SELECTOR, ".lastuser .chat-message-chatweb-user p")
     ATTACHMENTS_BUTTON = (By.ID, "input-attach-button-show")
@@ -42,14 +134,41 @@ class LaraigoPage:
     ATTACHMENT_LOCATION = (By.ID, "input-location-button")
     CHAT_IDLE_MESSAGE = (By.ID, "chat-idle-message")
 
-    def __init__(self, driver: WebDriver, timeout: int = PAGE_TIMEOUT):
-        """Inicializar la página con el WebDriver proporcionado y un timeout personalizable."""
+    def __init__(
+        self,
+        driver: WebDriver,
+        timeout: int = PAGE_TIMEOUT,
+        input_strategy: str = INPUT_STRATEGY,
+        url: str = PAGE_URL,
+    ):
+        """
+        Inicializar la página con el WebDriver proporcionado y un timeout personalizable.
+
+        input_strategy define cómo se escribe el mensaje: "script" (una sola llamada
+        JS, por defecto) o "typing" (send_keys tecla por tecla, más realista).
+        url permite apuntar a otro entorno (ver ENVIRONMENTS en config) en lugar de PAGE_URL.
+        """
         self.driver: WebDriver = driver
-        self.wait: WebDriverWait = WebDriverWait(driver, timeout)
+        self.url = url
+        self.input_strategy = input_strategy
+        self.wait: WebDriverWait = TracedWebDriverWait(driver, timeout)
+        # Espera con sondeo corto para condiciones del DOM que cambian en milisegundos
+        self.fast_wait: WebDriverWait = TracedWebDriverWait(
+            driver, timeout, poll_frequency=FAST_POLL_INTERVAL
+        )
         self.timeout = timeout
+        # Referencias a nodos estables del widget (botones, input, contenedores)
+        self.elements = LocatorCache(driver)
+        # Desglose red/servidor/render por mensaje (con PERF_LOG_CAPTURE)
+        self.latency_breakdowns = []
+        # Reloj de los eventos DevTools, anclado entre lecturas del performance log
+        self.devtools_clock = DevToolsClock()
 
         try:
-            self.driver.get(PAGE_URL)
+            with TRACER.span("LaraigoPage.page_load"):
+                self.driver.get(self.url)
+            # Registrar la consola del widget para el snapshot de fallos
+            install_console_hook(self.driver)
         except WebDriverException as e:
             raise WebDriverException(f"No se pudo cargar la página: {e}")
         except Exception as e:
@@ -69,14 +188,14 @@ class LaraigoPage:
         """Abrir la ventana del chat haciendo clic en el botón de chat."""
         try:
             # Esperar a que el botón de chat esté disponible
-            self.wait.until(EC.element_to_be_clickable(self.CHAT_OPEN_BUTTON))
-            open_button: WebElement = self.driver.find_element(*self.CHAT_OPEN_BUTTON)
+            open_button = self.elements.get(self.CHAT_OPEN_BUTTON)
+            self.wait.until(clickable(open_button))
 
             # Verificar si el chat ya está abierto
             if not self.is_chat_window_visible():
                 open_button.click()
                 # Esperar a que la ventana del chat sea visible
-                self.wait.until(EC.visibility_of_element_located(self.CHAT_WINDOW))
+                self.wait.until(visible(self.elements.get(self.CHAT_WINDOW)))
 
             return self
         except TimeoutException:
@@ -92,9 +211,7 @@ class LaraigoPage:
         """Cerrar la ventana del chat."""
         try:
             if self.is_chat_window_visible():
-                close_button: WebElement = self.driver.find_element(
-                    *self.CHAT_CLOSE_BUTTON
-                )
+                close_button = self.elements.get(self.CHAT_CLOSE_BUTTON)
                 close_button.click()
                 # Esperar a que la ventana del chat no sea visible
                 self.wait.until(EC.invisibility_of_element_located(self.CHAT_WINDOW))
@@ -111,18 +228,57 @@ class LaraigoPage:
         """Refrescar el historial del chat."""
         try:
             if self.is_chat_window_visible():
-                refresh_button: WebElement = self.driver.find_element(
-                    *self.CHAT_REFRESH_BUTTON
-                )
+                refresh_button = self.elements.get(self.CHAT_REFRESH_BUTTON)
+                self._is_chat_ready(mark=True)
                 refresh_button.click()
-                # Esperar un momento para que se refresque
-                time.sleep(1)
+                # Esperar al estado "listo" del widget (saludo incluido) con un timeout
+                # propio: el historial puede no verse nunca vacío si el saludo vuelve rápido
+                TracedWebDriverWait(
+                    self.driver, CHAT_RESET_TIMEOUT, poll_frequency=FAST_POLL_INTERVAL
+                ).until(lambda _: self._is_chat_ready())
+                # La conversación nueva empieza con los cursores en cero; el saludo ya
+                # publicado queda fuera del índice y no se toma como respuesta
+                self._clear_message_log()
             return self
+        except TimeoutException:
+            raise TimeoutException(
+                f"El chat no quedó listo tras refrescar el historial dentro de {CHAT_RESET_TIMEOUT} segundos."
+            )
         except NoSuchElementException:
             raise NoSuchElementException(
                 "No se encontró el botón de actualización del chat."
             )
 
+    def reset_conversation(self) -> "LaraigoPage":
+        """
+        Iniciar una conversación nueva sin recargar la página.
+
+        Usa el control 'chat-history-refresh' del widget ya cargado y espera a que
+        el widget quede listo (sin la conversación anterior, sin mensajes del usuario,
+        input habilitado y el saludo nuevo publicado), por lo que cuesta decenas de
+        milisegundos en lugar de los segundos de una recarga completa con reset_state().
+        """
+        if not self.is_chat_window_visible():
+            self.open_chat()
+        return self.refresh_chat()
+
+    def _is_chat_ready(self, mark: bool = False) -> bool:
+        """
+        Verificar en una sola llamada al navegador si el widget quedó listo tras refrescar.
+
+        Con mark=True marca los mensajes actuales como de la conversación anterior
+        (antes de hacer clic en refrescar).
+        """
+        return self.driver.execute_script(
+            _CHAT_READY_SCRIPT,
+            f"{self.USER_MESSAGES[1]}, {self.BOT_MESSAGES[1]}",
+            self.USER_MESSAGES[1],
+            self.BOT_MESSAGES[1],
+            f"#{self.CHAT_INPUT[1]}",
+            CHAT_RESET_SETTLE * 1000,
+            mark,
+        )
+
     def send_message(self, message: str) -> List[str]:
         """
         Enviar un mensaje al chatbot y esperar su respuesta.
@@ -141,17 +297,25 @@ class LaraigoPage:
                 self.open_chat()
 
             # Esperar a que el campo de entrada esté disponible
-            self.wait.until(EC.element_to_be_clickable(self.CHAT_INPUT))
-            chat_input: WebElement = self.driver.find_element(*self.CHAT_INPUT)
-
-            msg_bot_count = len(self.get_all_bot_messages())
+            chat_input = self.elements.get(self.CHAT_INPUT)
+            self.wait.until(clickable(chat_input))
+
+            bot_cursor = self.message_cursor("bot")
+            user_cursor = self.message_cursor("user")
+            if PERF_LOG_CAPTURE:
+                # Cada lectura vacía el log: se descartan los eventos previos al envío
+                # (y se ancla el reloj DevTools, p. ej. con las requests de la carga)
+                read_performance_log(self.driver, self.devtools_clock)
             # Limpiar el campo y escribir el mensaje
-            chat_input.clear()
-            chat_input.send_keys(message)
-            chat_input.send_keys(Keys.RETURN)
+            with TRACER.span("send_keys", strategy=self.input_strategy):
+                enter_text(self.driver, chat_input, message, self.input_strategy)
+                chat_input.send_keys(Keys.RETURN)
 
             # Esperar a que el mensaje del usuario aparezca en el historial
-            self.wait.until(lambda _: message in self.get_all_user_messages_text())
+            with TRACER.span("echo_wait"):
+                self.wait.until(
+                    lambda _: message in self.read_new_messages(user_cursor, "user")[0]
+                )
         except TimeoutException:
             raise TimeoutException(
                 f"No se pudo enviar el mensaje dentro de {self.timeout} segundos."
@@ -161,23 +325,108 @@ class LaraigoPage:
                 "No se encontraron los elementos necesarios para enviar un mensaje."
             )
 
+        reply = {}
+
+        def _reply_arrived(_):
+            reply.update(self._read_messages(bot_cursor, "bot"))
+            return reply["texts"] or False
+
         try:
-            self.wait.until(lambda _: len(self.get_all_bot_messages()) > msg_bot_count)
-            new_bot_messages = self.get_all_bot_messages()[msg_bot_count:]
-            return [msg.text for msg in new_bot_messages]
+            with TRACER.span("reply_wait"):
+                # Cada sondeo solo transfiere los mensajes posteriores al cursor
+                texts = self.wait.until(_reply_arrived)
         except TimeoutException:
             raise TimeoutException(
                 f"No se recibió una respuesta del bot dentro de {self.timeout} segundos."
             )
-        except NoSuchElementException:
-            raise NoSuchElementException(
-                "No se encontraron los mensajes del bot después de enviar el mensaje."
+        if PERF_LOG_CAPTURE:
+            self._record_latency_breakdown(message, reply.get("at"))
+        return texts
+
+    def _record_latency_breakdown(self, message: str, reply_at: Optional[float]) -> None:
+        """
+        Atribuir la latencia del último mensaje a red, servidor y render.
+
+        Correlaciona el frame o request que llevó el mensaje con la respuesta recibida
+        antes de que el nodo del bot apareciera en el DOM (ver utils/perf_log.py).
+        """
+        events = read_performance_log(self.driver, self.devtools_clock)
+        if events is None:
+            return
+        with TRACER.span("perf_log"):
+            breakdown = attribute_latency(events, message, reply_at)
+        if breakdown is not None:
+            self.latency_breakdowns.append(breakdown)
+            TRACER.annotate("latency_breakdown", self.latency_breakdowns)
+
+    def read_new_messages(self, cursor: Optional[int], role: str = "bot") -> Tuple[List[str], int]:
+        """
+        Leer solo los mensajes agregados al historial después de un cursor.
+
+        El índice vive en el navegador y se mantiene con un MutationObserver, así que
+        el costo de cada lectura depende de los mensajes nuevos y no del largo de la
+        conversación.
+
+        Args:
+            cursor: Posición devuelta por una lectura anterior o por message_cursor();
+                None solo devuelve la posición actual
+            role: "bot", "user" o "user_bubble" (burbujas del usuario, incluidos adjuntos)
+
+        Returns:
+            Tupla con los textos nuevos y el cursor para la siguiente lectura
+        """
+        result = self._read_messages(cursor, role)
+        return result["texts"], result["cursor"]
+
+    def wait_for_new_messages(self, cursor: int, role: str = "bot") -> List[str]:
+        """
+        Esperar a que aparezca al menos un mensaje nuevo después de un cursor.
+
+        Args:
+            cursor: Posición obtenida con message_cursor() antes de la acción
+            role: "bot", "user" o "user_bubble"
+
+        Returns:
+            Lista con los textos de los mensajes nuevos
+        """
+        try:
+            return self.wait.until(
+                lambda _: self.read_new_messages(cursor, role)[0] or False
             )
+        except TimeoutException:
+            raise TimeoutException(
+                f"No aparecieron mensajes nuevos ('{role}') dentro de {self.timeout} segundos."
+            )
+
+    def message_cursor(self, role: str = "bot") -> int:
+        """Obtener la posición actual del historial para un rol (mensajes ya existentes)."""
+        return self.read_new_messages(None, role)[1]
+
+    def _read_messages(self, cursor: Optional[int], role: str) -> dict:
+        """Leer el índice del navegador: textos nuevos, cursor y hora (ms) del primer nodo nuevo."""
+        return self.driver.execute_script(
+            _MESSAGE_LOG_SCRIPT, self._message_selectors(), role, cursor
+        )
+
+    def _message_selectors(self) -> dict:
+        """Selectores CSS de los mensajes por rol para el índice del navegador."""
+        return {
+            "bot": self.BOT_MESSAGES[1],
+            "user": self.USER_MESSAGES[1],
+            # Burbujas completas del usuario: incluyen adjuntos sin texto
+            "user_bubble": self.USER_BUBBLES[1],
+        }
+
+    def _clear_message_log(self) -> None:
+        """Vaciar el índice de mensajes del navegador (tras limpiar el historial)."""
+        self.driver.execute_script(
+            _MESSAGE_LOG_SCRIPT, self._message_selectors(), None, 0
+        )
 
     def is_chat_window_visible(self) -> bool:
         """Verificar si la ventana del chat está visible."""
         try:
-            chat_window: WebElement = self.driver.find_element(*self.CHAT_WINDOW)
+            chat_window = self.elements.get(self.CHAT_WINDOW)
             return chat_window.is_displayed()
         except NoSuchElementException:
             return False
@@ -185,7 +434,7 @@ class LaraigoPage:
     def is_chat_button_visible(self) -> bool:
         """Verificar si el botón del chat está visible."""
         try:
-            chat_button: WebElement = self.driver.find_element(*self.CHAT_OPEN_BUTTON)
+            chat_button = self.elements.get(self.CHAT_OPEN_BUTTON)
             return chat_button.is_displayed()
         except NoSuchElementException:
             return False
@@ -208,6 +457,14 @@ class LaraigoPage:
         elements = self.get_all_user_messages()
         return [element.text for element in elements]
 
+    def get_input_max_length(self) -> Optional[int]:
+        """Obtener el límite de caracteres del campo de entrada (maxlength), o None si no tiene."""
+        try:
+            max_length = self.elements.get(self.CHAT_INPUT).get_attribute("maxlength")
+        except NoSuchElementException:
+            raise NoSuchElementException("No se encontró el campo de entrada del chat.")
+        return int(max_length) if max_length and max_length.isdigit() else None
+
     def get_chat_history(self) -> WebElement:
         """Obtener el elemento que contiene el historial del chat."""
         try:
@@ -219,12 +476,10 @@ class LaraigoPage:
         """Abrir el menú de adjuntos."""
         try:
             if self.is_chat_window_visible():
-                attach_button: WebElement = self.driver.find_element(
-                    *self.ATTACHMENTS_BUTTON
-                )
+                attach_button = self.elements.get(self.ATTACHMENTS_BUTTON)
                 attach_button.click()
                 # Esperar a que el menú de adjuntos sea visible
-                self.wait.until(EC.visibility_of_element_located(self.ATTACHMENTS_MENU))
+                self.wait.until(visible(self.elements.get(self.ATTACHMENTS_MENU)))
             return self
         except TimeoutException:
             raise TimeoutException(
@@ -238,7 +493,7 @@ class LaraigoPage:
         try:
             if self.is_attachments_menu_visible():
                 # Hacer clic en el campo de entrada para cerrar el menú
-                chat_input: WebElement = self.driver.find_element(*self.CHAT_INPUT)
+                chat_input = self.elements.get(self.CHAT_INPUT)
                 chat_input.click()
                 # Esperar a que el menú de adjuntos no sea visible
                 self.wait.until(
@@ -253,9 +508,7 @@ class LaraigoPage:
     def is_attachments_menu_visible(self) -> bool:
         """Verificar si el menú de adjuntos está visible."""
         try:
-            attachments_menu: WebElement = self.driver.find_element(
-                *self.ATTACHMENTS_MENU
-            )
+            attachments_menu = self.elements.get(self.ATTACHMENTS_MENU)
             return attachments_menu.is_displayed()
         except NoSuchElementException:
             return False
@@ -266,7 +519,7 @@ class LaraigoPage:
             if not self.is_attachments_menu_visible():
                 self.open_attachments_menu()
 
-            image_input: WebElement = self.driver.find_element(*self.ATTACHMENT_IMAGE)
+            image_input = self.elements.get(self.ATTACHMENT_IMAGE)
             image_input.send_keys(file_path)
 
             # Cerrar el menú de adjuntos después de subir
@@ -281,7 +534,7 @@ class LaraigoPage:
             if not self.is_attachments_menu_visible():
                 self.open_attachments_menu()
 
-            file_input: WebElement = self.driver.find_element(*self.ATTACHMENT_FILE)
+            file_input = self.elements.get(self.ATTACHMENT_FILE)
             file_input.send_keys(file_path)
 
             # Cerrar el menú de adjuntos después de subir
@@ -296,7 +549,7 @@ class LaraigoPage:
             if not self.is_attachments_menu_visible():
                 self.open_attachments_menu()
 
-            audio_input: WebElement = self.driver.find_element(*self.ATTACHMENT_AUDIO)
+            audio_input = self.elements.get(self.ATTACHMENT_AUDIO)
             audio_input.send_keys(file_path)
 
             # Cerrar el menú de adjuntos después de subir
@@ -311,7 +564,7 @@ class LaraigoPage:
             if not self.is_attachments_menu_visible():
                 self.open_attachments_menu()
 
-            video_input: WebElement = self.driver.find_element(*self.ATTACHMENT_VIDEO)
+            video_input = self.elements.get(self.ATTACHMENT_VIDEO)
             video_input.send_keys(file_path)
 
             # Cerrar el menú de adjuntos después de subir
@@ -326,9 +579,7 @@ class LaraigoPage:
             if not self.is_attachments_menu_visible():
                 self.open_attachments_menu()
 
-            location_button: WebElement = self.driver.find_element(
-                *self.ATTACHMENT_LOCATION
-            )
+            location_button = self.elements.get(self.ATTACHMENT_LOCATION)
             location_button.click()
 
             # No cerramos el menú porque el propio botón ya lo cierra
@@ -341,7 +592,7 @@ class LaraigoPage:
     def is_idle_message_visible(self) -> bool:
         """Verificar si el mensaje de inactividad está visible."""
         try:
-            idle_message: WebElement = self.driver.find_element(*self.CHAT_IDLE_MESSAGE)
+            idle_message = self.elements.get(self.CHAT_IDLE_MESSAGE)
             return idle_message.is_displayed()
         except NoSuchElementException:
             return False
@@ -350,9 +601,7 @@ class LaraigoPage:
         """Ocultar el mensaje de inactividad."""
         try:
             if self.is_idle_message_visible():
-                idle_message: WebElement = self.driver.find_element(
-                    *self.CHAT_IDLE_MESSAGE
-                )
+                idle_message = self.elements.get(self.CHAT_IDLE_MESSAGE)
                 close_button = idle_message.find_element(
                     By.CLASS_NAME, "speech-bubble-times"
                 )
@@ -373,8 +622,11 @@ class LaraigoPage:
         """
         try:
             self.driver.refresh()
+            # La recarga invalida todas las referencias a elementos
+            self.elements.invalidate()
             # Esperar a que la página se cargue completamente después de refrescar
             self.wait.until(EC.presence_of_element_located(self.CHAT_OPEN_BUTTON))
+            install_console_hook(self.driver)
             return self
         except TimeoutException:
             raise TimeoutException(
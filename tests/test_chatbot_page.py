@@ -0,0 +1,73 @@
+"""
+Tests for the simple-web page object's in-chat reset.
+Run against a stand-in driver that keeps the chat display as a list of
+message classes (starting with the welcome message) and delivers the bot
+reply after a few DOM checks, like simple-web's 500-1000 ms timer.
+"""
+
+import pytest
+
+from pages.chatbot_page import ChatbotPage
+
+
+class StandInChatDriver:
+    """Driver exposing the chat display of simple-web to the page locators."""
+
+    def __init__(self, reply_after_checks):
+        self.display = ["bot-message"]
+        self.pending = []
+        self.reply_after_checks = reply_after_checks
+        self.cleared_with_pending = False
+
+    def send(self, text):
+        """Show a user message and schedule its reply."""
+        self.display.append("user-message")
+        self.pending.append(self.reply_after_checks)
+
+    def _tick(self):
+        self.pending = [checks - 1 for checks in self.pending]
+        while self.pending and self.pending[0] <= 0:
+            self.pending.pop(0)
+            self.display.append("bot-message")
+
+    def find_elements(self, by, value):
+        self._tick()
+        if value == ChatbotPage.UNANSWERED_USER_MESSAGES[1]:
+            last_bot = max(
+                (i for i, cls in enumerate(self.display) if cls == "bot-message"), default=-1
+            )
+            return [cls for cls in self.display[last_bot + 1:] if cls == "user-message"]
+        if value == ChatbotPage.BOT_MESSAGES[1]:
+            return [cls for cls in self.display if cls == "bot-message"]
+        if value == ChatbotPage.USER_MESSAGES[1]:
+            return [cls for cls in self.display if cls == "user-message"]
+        raise AssertionError(f"Unexpected locator {value}")
+
+    def execute_script(self, script, *args):
+        self.cleared_with_pending = bool(self.pending)
+        self.display = []
+
+
+@pytest.mark.unit
+def test_reset_waits_for_the_pending_reply_despite_the_welcome():
+    driver = StandInChatDriver(reply_after_checks=5)
+    driver.send("Hola")
+    ChatbotPage(driver).reset_conversation()
+    assert not driver.cleared_with_pending, "The reply would arrive after the reset"
+    assert driver.display == []
+
+
+@pytest.mark.unit
+def test_reset_after_a_previous_reset_waits_without_a_welcome():
+    driver = StandInChatDriver(reply_after_checks=3)
+    driver.display = []
+    driver.send("Hola")
+    ChatbotPage(driver).reset_conversation()
+    assert not driver.cleared_with_pending
+
+
+@pytest.mark.unit
+def test_reset_with_only_the_welcome_clears_right_away():
+    driver = StandInChatDriver(reply_after_checks=3)
+    ChatbotPage(driver).reset_conversation()
+    assert driver.display == []
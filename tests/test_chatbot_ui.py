@@ -98,3 +98,19 @@ def test_multiple_messages_conversation(driver, test_data):
     for m in messages:
         assert m in users
     assert len(page.get_all_bot_messages()) >= len(messages)
+
+@pytest.mark.examples
+def test_reset_conversation_keeps_page_and_drops_pending_reply(driver):
+    page = ChatbotPage(driver)
+    page.open_chat()
+    page.send_message("Hola")
+    # Sin esperar la respuesta: el reinicio debe absorber la respuesta pendiente
+    page.reset_conversation()
+    assert page.is_chat_panel_visible(), "El reinicio no debe recargar la página"
+    assert page.get_all_user_messages() == []
+    time.sleep(1.2)  # Más que el retraso máximo de respuesta de simple-web
+    assert page.get_all_bot_messages() == [], "No debe llegar la respuesta anterior"
+    page.send_message("Mensaje después del reinicio")
+    assert page.wait_for_bot_response(), "Debería haber una respuesta nueva"
+    assert page.get_all_user_messages() == ["Mensaje después del reinicio"]
+    assert len(page.get_all_bot_messages()) == 1
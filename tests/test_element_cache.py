@@ -0,0 +1,102 @@
+"""
+Tests for the element reference cache and the text entry strategies.
+Run against a stand-in driver whose elements go stale on demand, as the
+chat widget's input does when it re-renders after a refresh.
+"""
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+
+from utils.element_cache import LocatorCache
+from utils.text_entry import enter_text
+
+CHAT_INPUT = ("css selector", "#chat-input")
+
+
+class StandInElement:
+    """Element that raises StaleElementReferenceException once detached."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.stale = False
+        self.value = ""
+
+    def _check(self):
+        if self.stale:
+            raise StaleElementReferenceException("element is not attached to the page document")
+
+    def is_displayed(self):
+        self._check()
+        return True
+
+    def clear(self):
+        self._check()
+        self.value = ""
+
+    def send_keys(self, text):
+        self._check()
+        self.value += text
+
+
+class StandInDriver:
+    """Driver that returns a new element on every lookup and runs the value script."""
+
+    def __init__(self):
+        self.elements = []
+
+    def find_element(self, by, value):
+        element = StandInElement(self)
+        self.elements.append(element)
+        return element
+
+    def rerender(self):
+        """Detach every element found so far."""
+        for element in self.elements:
+            element.stale = True
+
+    def execute_script(self, script, element, text):
+        element._check()
+        element.value = text
+
+
+@pytest.mark.unit
+def test_cached_element_is_found_once():
+    """Repeated calls reuse the resolved element instead of finding it again."""
+    driver = StandInDriver()
+    chat_input = LocatorCache(driver).get(CHAT_INPUT)
+    for _ in range(3):
+        assert chat_input.is_displayed()
+    assert len(driver.elements) == 1
+
+
+@pytest.mark.unit
+def test_cached_element_resolves_again_when_stale():
+    """A stale reference is dropped and the call retried on a fresh element."""
+    driver = StandInDriver()
+    chat_input = LocatorCache(driver).get(CHAT_INPUT)
+    chat_input.send_keys("Hola")
+    driver.rerender()
+
+    chat_input.send_keys("Hola")
+    assert len(driver.elements) == 2
+    assert driver.elements[-1].value == "Hola"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("strategy", ["script", "typing"])
+def test_enter_text_survives_a_rerendered_input(strategy):
+    """Both input strategies re-resolve a cached input the widget re-rendered."""
+    driver = StandInDriver()
+    chat_input = LocatorCache(driver).get(CHAT_INPUT)
+    enter_text(driver, chat_input, "Hola", strategy)
+    driver.rerender()
+
+    enter_text(driver, chat_input, "Cuanto cuesta la membresia", strategy)
+    assert driver.elements[-1].value == "Cuanto cuesta la membresia"
+
+
+@pytest.mark.unit
+def test_enter_text_rejects_unknown_strategy():
+    """An unknown strategy is a usage error, not a silent fallback."""
+    with pytest.raises(ValueError):
+        enter_text(StandInDriver(), None, "Hola", "paste")
@@ -0,0 +1,95 @@
+"""
+Tests for the side-by-side environment comparison of corpus results.
+Results are built by hand in the shape run_corpus() returns, so no
+browser session is opened.
+"""
+
+import pytest
+
+from utils.envdiff import compare_environments, render_envdiff_html
+
+
+def result(latencies=(), responses=(), errors=(), category="greeting"):
+    """Build one query entry as returned by run_corpus()."""
+    return {
+        "category": category,
+        "latencies": list(latencies),
+        "responses": list(responses),
+        "errors": list(errors),
+    }
+
+
+@pytest.mark.unit
+def test_slower_candidate_is_flagged():
+    baseline = {"Hola": result([1.0, 1.1, 0.9, 1.0], ["Hola, soy Lara"] * 4)}
+    candidate = {"Hola": result([2.0, 2.1, 1.9, 2.0], ["Hola, soy Lara"] * 4)}
+    comparison = compare_environments(baseline, candidate)
+    row = comparison["queries"][0]
+    assert row["slower"] and row["significant"] and not row["faster"]
+    assert (row["baseline_mean"], row["candidate_mean"], row["ratio"]) == (1.0, 2.0, 2.0)
+    assert (comparison["slower"], comparison["faster"], comparison["text_changes"]) == (1, 0, 0)
+
+
+@pytest.mark.unit
+def test_significant_but_small_slowdown_is_not_flagged():
+    baseline = {"Hola": result([1.0, 1.01, 0.99, 1.0])}
+    candidate = {"Hola": result([1.1, 1.11, 1.09, 1.1])}
+    row = compare_environments(baseline, candidate, min_ratio=1.2)["queries"][0]
+    assert row["significant"] and not row["slower"]
+
+
+@pytest.mark.unit
+def test_faster_candidate_and_single_sample_baseline():
+    baseline = {
+        "Hola": result([2.0, 2.1, 1.9]),
+        "Precio": result([1.0]),
+    }
+    candidate = {
+        "Hola": result([1.0, 1.1, 0.9]),
+        "Precio": result([9.0]),
+    }
+    comparison = compare_environments(baseline, candidate)
+    hola, precio = comparison["queries"]
+    assert hola["faster"] and comparison["faster"] == 1
+    # A single baseline latency has no variance to test against
+    assert precio["t"] is None and not precio["significant"]
+    assert precio["ratio"] == 9.0
+
+
+@pytest.mark.unit
+def test_text_changes_compare_the_most_frequent_reply():
+    baseline = {"Hola": result([1.0], ["Hola", "Hola", "Buenas"])}
+    candidate = {"Hola": result([1.0], ["Buenas", "Buenas", "Hola"])}
+    row = compare_environments(baseline, candidate)["queries"][0]
+    assert row["text_changed"]
+    assert row["diff"][:2] == ["--- baseline", "+++ candidate"]
+    assert "-Hola" in row["diff"] and "+Buenas" in row["diff"]
+
+    same = compare_environments(baseline, {"Hola": result([1.0], ["Hola", "Buenas", "Hola"])})
+    assert same["text_changes"] == 0 and same["queries"][0]["diff"] == []
+
+
+@pytest.mark.unit
+def test_new_errors_and_queries_missing_from_one_side():
+    baseline = {"Hola": result([1.0], ["Hola"])}
+    candidate = {
+        "Hola": result(errors=["timeout"]),
+        "Precio": result([1.0], ["100"], category="membership"),
+    }
+    comparison = compare_environments(baseline, candidate)
+    assert [row["query"] for row in comparison["queries"]] == ["Hola", "Precio"]
+    hola, precio = comparison["queries"]
+    assert (hola["baseline_errors"], hola["candidate_errors"]) == (0, 1)
+    assert hola["delta_s"] is None and not hola["slower"]
+    assert not hola["text_changed"]
+    assert precio["category"] == "membership"
+    assert comparison["new_errors"] == 1
+
+
+@pytest.mark.unit
+def test_render_envdiff_html_escapes_queries_and_diffs():
+    baseline = {"<b>Hola</b>": result([1.0], ["<i>a</i>"])}
+    candidate = {"<b>Hola</b>": result([1.0], ["<i>b</i>"])}
+    page = render_envdiff_html(compare_environments(baseline, candidate), "PROD vs TEST")
+    assert "&lt;b&gt;Hola&lt;/b&gt;" in page and "-&lt;i&gt;a&lt;/i&gt;" in page
+    assert "1 queries: 1 text changes" in page
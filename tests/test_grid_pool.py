@@ -0,0 +1,164 @@
+"""
+Tests for the remote grid session pool.
+Run against a stand-in grid node (a minimal W3C WebDriver + /status server)
+started in-process, so they need neither a browser nor a real Selenium Grid.
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from utils.grid_pool import GridPool, grid_node_stats
+
+NODE_URI = "http://standin-node-1:5555"
+
+
+class StandInGrid:
+    """Grid with one node and a fixed number of slots, served over HTTP."""
+
+    def __init__(self, slots):
+        self.slots = [None] * slots
+        self.created = 0
+        self.lock = threading.Lock()
+        grid = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, value, status=200):
+                body = json.dumps({"value": value}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/status":
+                    self._reply(grid.status())
+                else:
+                    self._reply(None)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path == "/session":
+                    session_id = grid.start_session()
+                    if session_id is None:
+                        self._reply(
+                            {"error": "session not created", "message": "No free slots", "stacktrace": ""},
+                            500,
+                        )
+                    else:
+                        self._reply({"sessionId": session_id, "capabilities": {"browserName": "chrome"}})
+                else:
+                    self._reply(None)
+
+            def do_DELETE(self):
+                parts = self.path.strip("/").split("/")
+                if len(parts) == 2 and parts[0] == "session":
+                    grid.end_session(parts[1])
+                self._reply(None)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def status(self):
+        with self.lock:
+            slots = [{"session": {"sessionId": s} if s else None} for s in self.slots]
+        return {"ready": True, "nodes": [{"uri": NODE_URI, "availability": "UP", "slots": slots}]}
+
+    def start_session(self):
+        with self.lock:
+            if None not in self.slots:
+                return None
+            session_id = uuid.uuid4().hex
+            self.slots[self.slots.index(None)] = session_id
+            self.created += 1
+            return session_id
+
+    def end_session(self, session_id):
+        with self.lock:
+            if session_id in self.slots:
+                self.slots[self.slots.index(session_id)] = None
+
+    def busy(self):
+        with self.lock:
+            return sum(1 for s in self.slots if s)
+
+
+@pytest.fixture
+def standin_grid(request):
+    """Start a stand-in grid node with the number of slots given by the test param."""
+    grid = StandInGrid(getattr(request, "param", 1))
+    grid.thread.start()
+    yield grid
+    grid.server.shutdown()
+    grid.server.server_close()
+
+
+@pytest.mark.grid
+def test_pool_queues_until_grid_has_capacity(standin_grid):
+    """A lease waits while the only grid slot is busy and proceeds once it is released."""
+    pool = GridPool(standin_grid.url, max_sessions=2, queue_timeout=10, reuse_sessions=False, poll_interval=0.1)
+    first = pool.acquire()
+    assert pool.lease_info(first)["node"] == NODE_URI
+
+    leased = {}
+    waiter = threading.Thread(target=lambda: leased.update(driver=pool.acquire()))
+    waiter.start()
+    time.sleep(0.5)
+    assert "driver" not in leased, "The second lease should wait for a free grid slot"
+
+    pool.release(first)
+    waiter.join(timeout=10)
+    second = leased["driver"]
+    info = pool.lease_info(second)
+    assert info["queue_ms"] >= 400
+    assert not info["reused"]
+
+    pool.release(second)
+    pool.close()
+    assert standin_grid.busy() == 0
+
+
+@pytest.mark.grid
+@pytest.mark.parametrize("standin_grid", [2], indirect=True)
+def test_pool_reuses_released_sessions(standin_grid):
+    """Released sessions are cleaned and leased again instead of creating new ones."""
+    pool = GridPool(standin_grid.url, max_sessions=2, queue_timeout=10, reuse_sessions=True)
+    records = []
+    for _ in range(3):
+        driver = pool.acquire()
+        records.append(dict(pool.lease_info(driver), commands=4, command_ms=8.0))
+        pool.release(driver)
+
+    assert standin_grid.created == 1
+    assert [r["reused"] for r in records] == [False, True, True]
+
+    stats = grid_node_stats(records)
+    assert stats[NODE_URI]["tests"] == 3
+    assert stats[NODE_URI]["reused"] == 2
+    assert stats[NODE_URI]["mean_command_ms"] == 2.0
+
+    pool.close()
+    assert standin_grid.busy() == 0
+
+
+@pytest.mark.grid
+def test_pool_times_out_when_grid_stays_saturated(standin_grid):
+    """A lease fails after the queue timeout if no slot frees up."""
+    holder = GridPool(standin_grid.url, reuse_sessions=False)
+    held = holder.acquire()
+
+    pool = GridPool(standin_grid.url, queue_timeout=0.6, poll_interval=0.1)
+    with pytest.raises(TimeoutException):
+        pool.acquire()
+
+    holder.release(held)
@@ -0,0 +1,124 @@
+"""
+Tests for the SQLite run history: regression detection and flake statistics.
+Each test works on a fresh database in a temporary directory.
+"""
+
+import math
+
+import pytest
+
+from utils.history import RunHistory, normalize_test_id, welch_t
+
+CASE = "tests/test_laraigo_responses.py::test_greeting[Hola]"
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / "history.sqlite"))
+    yield history
+    history.close()
+
+
+def record(history, results, page_url="https://test.laraigo", kind="suite"):
+    """Store a run of test id -> (status, response_time[, attempts])."""
+    summary = {
+        test_id: {
+            "status": values[0],
+            "response_time": values[1],
+            "attempts": values[2] if len(values) > 2 else 1,
+            "error": None if values[0] == "passed" else "boom",
+        }
+        for test_id, values in results.items()
+    }
+    return history.record_run(summary, page_url=page_url, kind=kind)
+
+
+@pytest.mark.unit
+def test_normalize_test_id_folds_repeat_suffixes():
+    assert normalize_test_id("t.py::test_x[Hola-2-5]") == "t.py::test_x[Hola]"
+    assert normalize_test_id("t.py::test_x[1-3]") == "t.py::test_x"
+    assert normalize_test_id(CASE) == CASE
+
+
+@pytest.mark.unit
+def test_welch_t_sign_and_degenerate_baseline():
+    """Slower samples give a positive t; a constant baseline gives inf or 0."""
+    baseline = [1.0, 1.1, 0.9, 1.05, 0.95]
+    assert welch_t([2.0, 2.1, 1.9], baseline) > 10
+    assert welch_t([0.5], baseline) < 0
+    assert welch_t([2.0], [1.0, 1.0]) == math.inf
+    assert welch_t([0.5], [1.0, 1.0]) == 0.0
+
+
+@pytest.mark.unit
+def test_compare_reports_latency_regression_and_new_failure(history):
+    other = "tests/test_laraigo_responses.py::test_membership[Precio]"
+    for latency in (1.0, 1.1, 0.9, 1.05, 0.95):
+        record(history, {CASE: ("passed", latency), other: ("passed", 1.0)})
+    run_id = record(history, {CASE: ("passed", 2.5), other: ("failed", None)})
+
+    comparison = history.compare(run_id, window=10, t_threshold=3.0, min_ratio=1.2)
+    assert [r["test"] for r in comparison["regressions"]] == [CASE]
+    assert comparison["regressions"][0]["ratio"] == pytest.approx(2.5, rel=0.01)
+    assert comparison["new_failures"] == [{"test": other, "error": "boom"}]
+
+
+@pytest.mark.unit
+def test_compare_ignores_small_shifts_and_other_environments(history):
+    for latency in (1.0, 1.01, 0.99, 1.0, 1.0):
+        record(history, {CASE: ("passed", latency)})
+        record(history, {CASE: ("passed", 0.1)}, page_url="https://prod.laraigo")
+    # Statistically significant but below min_ratio
+    run_id = record(history, {CASE: ("passed", 1.1)})
+    assert history.compare(run_id, min_ratio=1.2)["regressions"] == []
+
+
+@pytest.mark.unit
+def test_compare_needs_enough_baseline_samples(history):
+    for latency in (1.0, 1.0):
+        record(history, {CASE: ("passed", latency)})
+    run_id = record(history, {CASE: ("passed", 5.0)})
+    assert history.compare(run_id, min_samples=5)["regressions"] == []
+
+
+@pytest.mark.unit
+def test_flake_stats_and_quarantine(history):
+    stable = "tests/test_laraigo_responses.py::test_membership[Precio]"
+    for run in range(6):
+        # CASE needs a retry to pass every other run
+        attempts = 2 if run % 2 else 1
+        record(history, {CASE: ("passed", 1.0 + run, attempts), stable: ("passed", 1.0)})
+    record(history, {CASE: ("skipped", None), stable: ("failed", None)})
+
+    stats = history.flake_stats(window=20)
+    assert stats[CASE]["runs"] == 6, "Skipped results do not count as runs"
+    assert stats[CASE]["flaky"] == 3
+    assert stats[CASE]["flake_rate"] == 0.5
+    assert stats[CASE]["retry_latency"] == 4.0
+    assert stats[stable]["fail_rate"] == round(1 / 7, 3)
+
+    assert set(history.quarantined(window=20, min_runs=5, min_flake_rate=0.3)) == {CASE}
+    assert history.quarantined(window=20, min_runs=7, min_flake_rate=0.3) == {}
+
+
+@pytest.mark.unit
+def test_run_count_and_flake_stats_are_per_kind(history):
+    record(history, {CASE: ("passed", 1.0)})
+    record(history, {"monitor::greeting[Hola]": ("failed", None)}, kind="monitor")
+    assert history.run_count() == 1
+    assert history.run_count(kind="monitor") == 1
+    assert set(history.flake_stats(kind="monitor")) == {"monitor::greeting[Hola]"}
+
+
+@pytest.mark.unit
+def test_durations_ignore_monitor_runs(history):
+    """Monitor intervals must not push the suite runs out of the duration window."""
+    for duration in (10.0, 12.0, 14.0):
+        history.record_run({CASE: {"status": "passed", "duration": duration}})
+    for _ in range(5):
+        history.record_run(
+            {"monitor::greeting[Hola]": {"status": "passed", "duration": 1.0}}, kind="monitor"
+        )
+
+    assert history.durations(window=3) == {CASE: 12.0}
+    assert history.durations(window=3, kind="monitor") == {"monitor::greeting[Hola]": 1.0}
@@ -0,0 +1,104 @@
+"""
+Benchmarks for the Laraigo chatbot interface.
+Measure how latency scales with the size (and character set) of what the user sends.
+Run with: pytest -m benchmark (or python main.py --suite benchmark)
+"""
+
+import os
+import pytest
+import time
+from pages.laraigo_page import LaraigoPage
+from utils.benchmarks import CHARSETS, generate_message
+from utils.media_fixtures import media_fixture
+from utils.tracing import TRACER
+from config.config import (
+    MEDIA_FIXTURE_DIR,
+    MESSAGE_SIZE_LENGTHS,
+    UPLOAD_BENCHMARK_SIZES_KB,
+)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("size_kb", UPLOAD_BENCHMARK_SIZES_KB)
+@pytest.mark.parametrize("media_type", ["image", "file", "audio", "video"])
+def test_upload_throughput(driver, media_type, size_kb, test_data):
+    """
+    Benchmark: Subida de adjuntos por tamaño
+    Objetivo: Medir cuánto tarda en aparecer la burbuja del adjunto y el acuse del bot
+    para archivos generados de distintos tamaños y tipos.
+    Resultado Esperado: La burbuja y el acuse aparecen; la curva throughput vs tamaño
+    queda en el resumen de la ejecución.
+    """
+    file_path = media_fixture(media_type, size_kb * 1024, MEDIA_FIXTURE_DIR)
+    size_bytes = os.path.getsize(file_path)
+
+    page = LaraigoPage(driver)
+    page.open_chat()
+    page.open_attachments_menu()
+
+    bubble_cursor = page.message_cursor("user_bubble")
+    bot_cursor = page.message_cursor("bot")
+
+    start_time = time.time()
+    getattr(page, f"upload_{media_type}")(file_path)
+    with TRACER.span("attachment_wait"):
+        page.wait_for_new_messages(bubble_cursor, "user_bubble")
+    bubble_time = time.time() - start_time
+
+    with TRACER.span("ack_wait"):
+        bot_response = page.wait_for_new_messages(bot_cursor, "bot")
+    ack_time = time.time() - start_time
+
+    TRACER.annotate(
+        "upload",
+        {
+            "media_type": media_type,
+            "size_bytes": size_bytes,
+            "bubble_s": round(bubble_time, 3),
+            "ack_s": round(ack_time, 3),
+        },
+    )
+    test_data(
+        sent_message=os.path.basename(file_path),
+        response_text=bot_response,
+        response_time=ack_time,
+    )
+
+    assert bot_response, f"El bot no respondió al adjunto {os.path.basename(file_path)}"
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("length", MESSAGE_SIZE_LENGTHS + ["max"])
+@pytest.mark.parametrize("charset", list(CHARSETS))
+def test_message_size_latency(driver, charset, length, test_data):
+    """
+    Benchmark: Latencia según largo y juego de caracteres del mensaje
+    Objetivo: Enviar mensajes generados desde 1 carácter hasta el límite del campo
+    de entrada, con acentos, emoji y escrituras mezcladas.
+    Resultado Esperado: El bot responde; la curva latencia vs largo y los saltos
+    de latencia quedan en el resumen de la ejecución.
+    """
+    page = LaraigoPage(driver)
+    page.open_chat()
+
+    # El largo se mide en unidades UTF-16, igual que maxlength en el navegador
+    limit = page.get_input_max_length()
+    if length == "max":
+        if limit is None:
+            pytest.skip("El campo de entrada no declara maxlength")
+        length = limit
+    elif limit is not None and length > limit:
+        pytest.skip(f"El largo {length} supera el límite del campo ({limit})")
+
+    message = generate_message(length, charset)
+    start_time = time.time()
+    bot_response = page.send_message(message)
+    response_time = time.time() - start_time
+
+    TRACER.annotate(
+        "message_size",
+        {"charset": charset, "length": length, "latency_s": round(response_time, 3)},
+    )
+    test_data(sent_message=message, response_text=bot_response, response_time=response_time)
+
+    assert bot_response, f"El bot no respondió a un mensaje de {length} caracteres ({charset})"
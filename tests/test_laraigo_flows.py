@@ -0,0 +1,49 @@
+"""
+Conversation flow tests for the Laraigo chatbot interface.
+Each test runs the YAML flows of one browser session (flows/*.yaml) turn by turn.
+Run with: pytest -m flows (or python main.py flows to run them without pytest)
+"""
+
+import pytest
+from pages.laraigo_page import LaraigoPage
+from utils.flow_runner import flow_groups, load_flows, run_flow
+from utils.tracing import TRACER
+from config.config import FLOW_DIR, FLOW_MAX_LATENCY, MEDIA_FIXTURE_DIR
+
+FLOW_GROUPS = flow_groups(load_flows(FLOW_DIR))
+
+
+@pytest.mark.laraigo
+@pytest.mark.flows
+@pytest.mark.parametrize(
+    "flows", [group for _, group in FLOW_GROUPS], ids=[name for name, _ in FLOW_GROUPS]
+)
+def test_conversation_flow(driver, flows, test_data):
+    """
+    Test Flujo: Conversación de varios turnos definida en YAML
+    Objetivo: Ejecutar cada turno (mensaje o adjunto) del guion y validar la intención
+    esperada de la respuesta y la latencia máxima del turno.
+    Resultado Esperado: Todos los turnos reciben una respuesta con la intención y dentro
+    del tiempo definidos; los tiempos por turno quedan en el campo flows del resumen.
+    """
+    page = LaraigoPage(driver)
+    page.open_chat()
+
+    results = [run_flow(page, flow, FLOW_MAX_LATENCY, MEDIA_FIXTURE_DIR) for flow in flows]
+    TRACER.annotate("flows", results)
+
+    # Latencia de una sola respuesta (la del último turno); las de cada turno van en "flows"
+    last_turn = results[-1]["turns"][-1]
+    test_data(
+        sent_message=last_turn["input"],
+        response_text=last_turn["response"],
+        response_time=last_turn["latency_s"],
+    )
+
+    failures = [
+        f"{r['name']} turno {t['turn']} ({t['input']}): {'; '.join(t['failures'])}"
+        for r in results
+        for t in r["turns"]
+        if t["failures"]
+    ]
+    assert not failures, "Turnos con fallas:\n" + "\n".join(failures)
@@ -6,21 +6,12 @@ Tests the accuracy, relevance, and response time of chatbot responses.
 import pytest
 import time
 from pages.laraigo_page import LaraigoPage
+from utils.corpus import CORPUS
 
 
 @pytest.mark.laraigo
-@pytest.mark.parametrize(
-    "greeting",
-    [
-        "Hola Buenos dias",
-        "Hola que tal",
-        "Buenas noches",
-        "Buenas tardes",
-        "Hola muy buenos dias",
-        "Hola como estas",
-        "Hola",
-    ],
-)
+@pytest.mark.slo(p95=8.0, max=15.0)
+@pytest.mark.parametrize("greeting", CORPUS["greeting"]["queries"])
 def test_greeting_responses(driver, greeting, test_data):
     """
     Test Case 1: Saludos y Frases de Cortesía
@@ -53,18 +44,8 @@ def test_greeting_responses(driver, greeting, test_data):
 
 
 @pytest.mark.laraigo
-@pytest.mark.parametrize(
-    "query",
-    [
-        "Cuanto tiempo dura la membresia",
-        "Que beneficios tiene la membresia",
-        "Que descuentos tengo con la membresia",
-        "Tengo descuentos en las entradas con la membresia?",
-        "Cuanto cuesta la membresia",
-        "Como adquiero la membresia",
-        "Como cancelo la membresia?",
-    ],
-)
+@pytest.mark.slo(p95=8.0, max=15.0)
+@pytest.mark.parametrize("query", CORPUS["membership"]["queries"])
 def test_membership_inquiry_responses(driver, query, test_data):
     """
     Test Case 2: Consultas sobre la Membresía
@@ -98,17 +79,8 @@ def test_membership_inquiry_responses(driver, query, test_data):
 
 
 @pytest.mark.laraigo
-@pytest.mark.parametrize(
-    "query",
-    [
-        "Quien ganara la final",
-        "Como me llamo",
-        "Cuando se fundo lima",
-        "Cual es el precio de la entrada",
-        "Cuantos años tengo",
-        "Quien ganara el mundial",
-    ],
-)
+@pytest.mark.slo(p95=8.0, max=15.0)
+@pytest.mark.parametrize("query", CORPUS["out_of_scope"]["queries"])
 def test_out_of_scope_responses(driver, query, test_data):
     """
     Test Case 3: Preguntas Fuera de Alcance (General Knowledge & Personal Info)
@@ -0,0 +1,71 @@
+"""
+Soak tests for the Laraigo chatbot interface.
+Holds one long conversation in a single session and checks that latency and
+browser memory do not degrade as the history grows.
+Run with: pytest -m soak (or python main.py --suite soak)
+"""
+
+import pytest
+import statistics
+import time
+from pages.laraigo_page import LaraigoPage
+from utils.corpus import CORPUS, corpus_messages
+from utils.soak import SoakMonitor
+from utils.tracing import TRACER
+from config.config import (
+    SOAK_LATENCY_GROWTH_RATIO,
+    SOAK_MEMORY_SLOPE_MB,
+    SOAK_MESSAGE_INTERVAL,
+    SOAK_MESSAGES,
+    SOAK_SAMPLE_EVERY,
+)
+
+
+@pytest.mark.soak
+def test_long_conversation_soak(driver, test_data):
+    """
+    Test Soak: Conversación larga en una sola sesión
+    Objetivo: Enviar miles de mensajes del corpus a ritmo fijo en la misma sesión
+    de LaraigoPage, midiendo latencia por turno, nodos del DOM, heap de JS y RSS.
+    Resultado Esperado: Ni la latencia ni la memoria crecen con el largo de la conversación.
+    """
+    page = LaraigoPage(driver)
+    page.open_chat()
+    monitor = SoakMonitor(driver, SOAK_SAMPLE_EVERY)
+
+    unexpected = []
+    message = bot_response = None
+    for turn, (category, message) in enumerate(corpus_messages(SOAK_MESSAGES), 1):
+        turn_start = time.time()
+        bot_response = page.send_message(message)
+        latency = time.time() - turn_start
+        monitor.record_turn(latency)
+
+        if not any(
+            msg_text.startswith(CORPUS[category]["expected"]) for msg_text in bot_response
+        ):
+            unexpected.append({"turn": turn, "message": message, "response": bot_response})
+
+        # Mantener un ritmo fijo de envío independiente de la latencia del bot
+        time.sleep(max(0.0, SOAK_MESSAGE_INTERVAL - (time.time() - turn_start)))
+
+    result = monitor.analyze(SOAK_LATENCY_GROWTH_RATIO, SOAK_MEMORY_SLOPE_MB)
+    result["unexpected_responses"] = len(unexpected)
+    TRACER.annotate("soak", result)
+    # Latencia típica de una respuesta (mediana por turno), no el tiempo de toda la sesión
+    test_data(
+        sent_message=message,
+        response_text=bot_response,
+        response_time=statistics.median(monitor.latencies) if monitor.latencies else None,
+    )
+
+    assert not result["latency_degraded"], (
+        f"La latencia crece con la conversación: {result['latency']}"
+    )
+    assert not result["memory_degraded"], (
+        f"La memoria del navegador crece con la conversación: {result['trends']}"
+    )
+    assert not unexpected, (
+        f"{len(unexpected)} de {result['turns']} respuestas no coinciden con su categoría. "
+        f"Primeras: {unexpected[:5]}"
+    )
@@ -230,3 +230,32 @@ def test_idle_message_visibility(driver):
         assert (
             not laraigo_page.is_idle_message_visible()
         ), "El mensaje de inactividad debería estar oculto después de ocultarlo"
+
+
+@pytest.mark.laraigo_ui
+def test_reset_conversation_without_reload(driver):
+    """Test que verifica el reinicio rápido de la conversación sin recargar la página."""
+    laraigo_page = LaraigoPage(driver)
+    laraigo_page.open_chat()
+    laraigo_page.send_message("Mensaje antes del reinicio rápido")
+
+    laraigo_page.reset_conversation()
+
+    # El widget sigue cargado y abierto, pero sin mensajes
+    assert (
+        laraigo_page.is_chat_window_visible()
+    ), "La ventana de chat debería seguir visible tras el reinicio rápido"
+    assert (
+        len(laraigo_page.get_all_user_messages_text()) == 0
+    ), "No debería haber mensajes del usuario tras el reinicio rápido"
+    assert (
+        len(laraigo_page.get_all_bot_messages_text()) == 0
+    ), "No debería haber mensajes del bot tras el reinicio rápido"
+
+    # La nueva conversación funciona con normalidad
+    msg_after_reset = "Hola"
+    response = laraigo_page.send_message(msg_after_reset)
+    assert response, "Debería haber una respuesta del bot tras el reinicio rápido"
+    assert laraigo_page.get_all_user_messages_text() == [
+        msg_after_reset
+    ], "Solo debería existir el mensaje enviado después del reinicio rápido"
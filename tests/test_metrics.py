@@ -0,0 +1,100 @@
+"""
+Tests for the metrics registry and its OpenMetrics / Prometheus text output.
+"""
+
+import urllib.request
+
+import pytest
+
+from utils.metrics import MetricsRegistry, create_registry, observe_test
+
+
+@pytest.fixture
+def registry():
+    registry = MetricsRegistry("qa")
+    registry.counter("tests", "Finished tests")
+    registry.gauge("up", "Harness is running")
+    registry.histogram("latency_seconds", "Reply latency", [2.0, 0.5])
+    return registry
+
+
+@pytest.mark.unit
+def test_counter_naming_per_format(registry):
+    registry.inc("tests", {"outcome": "passed"})
+    registry.inc("tests", {"outcome": "passed"}, value=2)
+
+    openmetrics = registry.render(openmetrics=True).splitlines()
+    assert "# TYPE qa_tests counter" in openmetrics
+    assert 'qa_tests_total{outcome="passed"} 3' in openmetrics
+    assert openmetrics[-1] == "# EOF"
+
+    prometheus = registry.render(openmetrics=False).splitlines()
+    assert "# HELP qa_tests_total Finished tests" in prometheus
+    assert "# TYPE qa_tests_total counter" in prometheus
+    assert 'qa_tests_total{outcome="passed"} 3' in prometheus
+    assert "# EOF" not in prometheus
+
+
+@pytest.mark.unit
+def test_histogram_buckets_are_cumulative(registry):
+    for value in (0.2, 1.0, 3.0):
+        registry.observe("latency_seconds", {"test": "greeting"}, value)
+    lines = registry.render().splitlines()
+    assert 'qa_latency_seconds_bucket{test="greeting",le="0.5"} 1' in lines
+    assert 'qa_latency_seconds_bucket{test="greeting",le="2.0"} 2' in lines
+    assert 'qa_latency_seconds_bucket{test="greeting",le="+Inf"} 3' in lines
+    assert 'qa_latency_seconds_count{test="greeting"} 3' in lines
+    assert 'qa_latency_seconds_sum{test="greeting"} 4.2' in lines
+
+
+@pytest.mark.unit
+def test_gauges_and_label_escaping(registry):
+    registry.set("up", None, 1)
+    registry.set("up", {"case": 'say "hi"\\\n'}, 0.5)
+    lines = registry.render().splitlines()
+    assert "qa_up 1" in lines
+    assert 'qa_up{case="say \\"hi\\"\\\\\\n"} 0.5' in lines
+
+
+@pytest.mark.unit
+def test_write_textfile_uses_prometheus_format(registry, tmp_path):
+    registry.inc("tests", {"outcome": "failed"})
+    path = tmp_path / "textfile" / "chatbot_qa.prom"
+    registry.write_textfile(str(path))
+    assert path.read_text(encoding="utf-8") == registry.render(openmetrics=False)
+    assert [p.name for p in path.parent.iterdir()] == ["chatbot_qa.prom"]
+
+
+@pytest.mark.unit
+def test_serve_negotiates_the_format(registry):
+    registry.inc("tests", {"outcome": "passed"})
+    url = registry.serve(0)
+    try:
+        request = urllib.request.Request(
+            url, headers={"Accept": "application/openmetrics-text; version=1.0.0"}
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+            assert response.read().decode().endswith("# EOF\n")
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "# TYPE qa_tests_total counter" in response.read().decode()
+    finally:
+        registry.stop()
+
+
+@pytest.mark.unit
+def test_observe_test_folds_repeats_into_the_case():
+    registry = create_registry((1.0, 5.0), (1.0, 10.0))
+    data = {
+        "response_time": 0.8,
+        "browser_startup_s": 2.0,
+        "latency_phases": {"LaraigoPage.page_load": 1500.0},
+    }
+    for test_id in ("t.py::test_greeting[Hola-1-2]", "t.py::test_greeting[Hola-2-2]"):
+        observe_test(registry, test_id, data, "passed", "chrome")
+    lines = registry.render().splitlines()
+    assert 'chatbot_qa_tests_total{outcome="passed",test="test_greeting"} 2' in lines
+    assert 'chatbot_qa_reply_latency_seconds_count{case="Hola",test="test_greeting"} 2' in lines
+    assert 'chatbot_qa_browser_startup_seconds_bucket{browser="chrome",le="10.0"} 2' in lines
+    assert 'chatbot_qa_page_load_seconds_bucket{le="1.0"} 0' in lines
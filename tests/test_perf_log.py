@@ -0,0 +1,202 @@
+"""
+Tests for the performance-log latency attribution.
+Built from synthetic DevTools events, so they need no browser.
+"""
+
+import json
+
+import pytest
+
+from utils.perf_log import (
+    DevToolsClock,
+    attribute_latency,
+    read_performance_log,
+    summarize_breakdowns,
+)
+
+API = "https://api.laraigo.test"
+
+
+def request(request_id, timestamp, url, post_data=None, kind="XHR"):
+    params = {"requestId": request_id, "type": kind, "request": {"url": url}}
+    if post_data is not None:
+        params["request"]["postData"] = post_data
+    return {"method": "Network.requestWillBeSent", "params": params, "timestamp": timestamp}
+
+
+def response(request_id, timestamp):
+    return {"method": "Network.responseReceived", "params": {"requestId": request_id}, "timestamp": timestamp}
+
+
+def frame(method, timestamp, payload=""):
+    return {
+        "method": method,
+        "params": {"requestId": "ws-1", "response": {"payloadData": payload}},
+        "timestamp": timestamp,
+    }
+
+
+@pytest.mark.unit
+def test_websocket_reply_is_split_into_network_server_and_render():
+    """The first frame back is the acknowledgement, the last one before the DOM node the reply."""
+    events = [
+        frame("Network.webSocketFrameSent", 1000, '{"text": "Hola"}'),
+        frame("Network.webSocketFrameReceived", 1040),
+        frame("Network.webSocketFrameReceived", 1800),
+    ]
+    breakdown = attribute_latency(events, "Hola", 1850)
+    assert breakdown == {
+        "transport": "websocket",
+        "network_ms": 40,
+        "server_ms": 760,
+        "render_ms": 50,
+        "total_ms": 850,
+    }
+
+
+@pytest.mark.unit
+def test_message_without_outbound_event_is_not_attributed():
+    """No breakdown when no sent payload carries the message."""
+    events = [frame("Network.webSocketFrameSent", 1000, '{"text": "Otra cosa"}')]
+    assert attribute_latency(events, "Hola", 1500) is None
+
+
+@pytest.mark.unit
+def test_http_reply_ignores_requests_to_other_hosts_and_earlier_requests():
+    """Analytics on another host and polls sent before the message are not taken as the reply."""
+    events = [
+        request("poll-0", 900, f"{API}/poll"),
+        request("send", 1000, f"{API}/send", post_data='{"text": "Hola"}'),
+        response("send", 1030),
+        request("poll-1", 1100, f"{API}/poll"),
+        response("poll-1", 1700),
+        request("analytics", 1750, "https://analytics.test/collect"),
+        response("poll-0", 1780),
+        response("analytics", 1790),
+    ]
+    breakdown = attribute_latency(events, "Hola", 1800)
+    assert breakdown["transport"] == "http"
+    assert breakdown["network_ms"] == 30
+    assert breakdown["server_ms"] == 670
+    assert breakdown["render_ms"] == 100
+
+
+@pytest.mark.unit
+def test_http_reply_prefers_the_outbound_endpoint():
+    """A later request to the endpoint of the message wins over other endpoints of the host."""
+    events = [
+        request("send", 1000, f"{API}/messages", post_data='{"text": "Hola"}'),
+        request("reply", 1010, f"{API}/messages?wait=1"),
+        request("config", 1020, f"{API}/config"),
+        response("reply", 1500),
+        response("config", 1600),
+    ]
+    assert attribute_latency(events, "Hola", 1650)["server_ms"] == 500
+
+
+@pytest.mark.unit
+def test_http_reply_from_several_other_endpoints_is_ambiguous():
+    """Responses from two other endpoints of the host cannot be told apart."""
+    events = [
+        request("send", 1000, f"{API}/send", post_data='{"text": "Hola"}'),
+        request("poll", 1100, f"{API}/poll"),
+        request("presence", 1200, f"{API}/presence"),
+        response("poll", 1500),
+        response("presence", 1600),
+    ]
+    assert attribute_latency(events, "Hola", 1650) is None
+
+
+class StandInLogDriver:
+    """Driver whose performance log returns the given entries once."""
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def execute(self, command, params):
+        entries, self.entries = self.entries, []
+        return {"value": entries}
+
+
+def log_entry(logged_at, method, **params):
+    """Performance log entry stamped by the driver at logged_at (its own clock)."""
+    message = {"message": {"method": method, "params": params}}
+    return {"timestamp": logged_at, "message": json.dumps(message)}
+
+
+@pytest.mark.unit
+def test_event_times_come_from_the_devtools_clock_not_the_log_entry():
+    """The reply frame is logged after reply_at (pulled late, driver clock ahead) and still counts."""
+    # Browser monotonic clock 50.000 s == browser epoch 1_700_000_000_000 ms
+    anchor = 1_700_000_000.0
+    clock = DevToolsClock()
+    page_load = log_entry(
+        9_000, "Network.requestWillBeSent", requestId="doc", timestamp=50.0, wallTime=anchor
+    )
+    read_performance_log(StandInLogDriver([page_load]), clock)
+    reply_at = anchor * 1000 + 1_850
+    events = read_performance_log(
+        StandInLogDriver(
+            [
+                log_entry(
+                    reply_at + 5_000,
+                    "Network.webSocketFrameSent",
+                    requestId="ws-1",
+                    timestamp=51.0,
+                    response={"payloadData": '{"text": "Hola"}'},
+                ),
+                log_entry(
+                    reply_at + 5_000,
+                    "Network.webSocketFrameReceived",
+                    requestId="ws-1",
+                    timestamp=51.04,
+                ),
+                log_entry(
+                    reply_at + 5_001,
+                    "Network.webSocketFrameReceived",
+                    requestId="ws-1",
+                    timestamp=51.8,
+                ),
+            ]
+        ),
+        clock,
+    )
+    breakdown = attribute_latency(events, "Hola", reply_at)
+    assert breakdown == {
+        "transport": "websocket",
+        "network_ms": 40,
+        "server_ms": 760,
+        "render_ms": 50,
+        "total_ms": 850,
+    }
+
+
+@pytest.mark.unit
+def test_events_before_any_wall_time_anchor_are_not_attributed():
+    """Without a wallTime anchor the monotonic times cannot be compared with reply_at."""
+    sent = log_entry(
+        1_000,
+        "Network.webSocketFrameSent",
+        requestId="ws-1",
+        timestamp=51.0,
+        response={"payloadData": "Hola"},
+    )
+    driver = StandInLogDriver([sent])
+    events = read_performance_log(driver, DevToolsClock())
+    assert events == []
+    assert attribute_latency(events, "Hola", 1_500) is None
+
+
+@pytest.mark.unit
+def test_summarize_breakdowns():
+    """Mean and max per component, skipping missing values."""
+    summary = summarize_breakdowns(
+        [
+            {"network_ms": 40, "server_ms": 700, "render_ms": 50, "total_ms": 790},
+            {"network_ms": None, "server_ms": 900, "render_ms": 30, "total_ms": 930},
+        ]
+    )
+    assert summary["messages"] == 2
+    assert summary["network_ms"] == {"mean": 40, "max": 40}
+    assert summary["server_ms"] == {"mean": 800, "max": 900}
+    assert summarize_breakdowns([]) is None
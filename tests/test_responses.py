@@ -0,0 +1,79 @@
+"""
+Tests for response interning and the grouping of tests by bot reply.
+"""
+
+import pytest
+
+from utils.responses import (
+    ResponseInterner,
+    group_by_response,
+    normalize_response,
+    response_fingerprint,
+    response_groups_html,
+)
+
+GREETING = ["Hola, soy Lara", "¿En qué te ayudo?"]
+
+
+@pytest.mark.unit
+def test_bubble_lists_and_joined_text_share_a_fingerprint():
+    assert normalize_response(GREETING) == "Hola, soy Lara\n¿En qué te ayudo?"
+    assert response_fingerprint(GREETING) == response_fingerprint("\n".join(GREETING))
+    assert response_fingerprint(GREETING) != response_fingerprint("Hola, soy Lara")
+    assert len(response_fingerprint(GREETING)) == 12
+
+
+@pytest.mark.unit
+def test_interner_keeps_one_copy_per_reply():
+    interner = ResponseInterner()
+    fingerprint, new = interner.intern(GREETING)
+    assert new
+    assert interner.intern(tuple(GREETING)) == (fingerprint, False)
+    assert interner.texts == {fingerprint: normalize_response(GREETING)}
+
+    interner.update({fingerprint: "other copy", "abc": "Adiós"})
+    assert interner.texts[fingerprint] == normalize_response(GREETING)
+    assert interner.texts["abc"] == "Adiós"
+
+
+@pytest.mark.unit
+def test_group_by_response_counts_and_latency():
+    greeting = response_fingerprint(GREETING)
+    summary = {
+        "t::greeting[Hola-1-2]": {
+            "response_id": greeting, "status": "passed", "response_time": 1.0, "sent_message": "Hola",
+        },
+        "t::greeting[Hola-2-2]": {
+            "response_id": greeting, "status": "failed", "response_time": 3.0, "sent_message": "Hola",
+        },
+        "t::greeting[Buenas]": {
+            "response_id": greeting, "status": "error", "sent_message": "Buenas",
+        },
+        "t::price": {"response_id": "ffffffffffff", "status": "passed"},
+        "t::skipped": {"status": "skipped"},
+    }
+    groups = group_by_response(summary, {greeting: normalize_response(GREETING)})
+
+    assert [g["fingerprint"] for g in groups] == [greeting, "ffffffffffff"]
+    first, second = groups
+    assert (first["tests"], first["passed"], first["failed"], first["sent_messages"]) == (3, 1, 2, 2)
+    assert first["latency"] == {"mean": 2.0, "p50": 2.0, "p95": 2.9, "max": 3.0}
+    assert first["text"] == normalize_response(GREETING)
+    assert first["test_ids"] == list(summary)[:3]
+    assert second["latency"] is None and second["text"] is None
+
+
+@pytest.mark.unit
+def test_groups_of_equal_size_are_ordered_by_fingerprint():
+    summary = {"t::b": {"response_id": "bbb"}, "t::a": {"response_id": "aaa"}}
+    assert [g["fingerprint"] for g in group_by_response(summary, {})] == ["aaa", "bbb"]
+
+
+@pytest.mark.unit
+def test_response_groups_html_shows_each_reply_once():
+    summary = {
+        f"t::greeting[{i}]": {"response_id": "abc", "status": "passed"} for i in range(3)
+    }
+    page = response_groups_html(group_by_response(summary, {"abc": "<b>Hola</b>"}))
+    assert page.count("&lt;b&gt;Hola&lt;/b&gt;") == 1
+    assert response_groups_html([]) == "<p>No bot responses recorded.</p>"
@@ -0,0 +1,73 @@
+"""
+Tests for the stratified, rotating sample of cases.
+"""
+
+import pytest
+
+from utils.sampling import allocate_budget, case_weights, stratified_sample
+
+CASES = {
+    **{f"greeting-{i}": "greeting" for i in range(8)},
+    **{f"membership-{i}": "membership" for i in range(12)},
+    **{f"out_of_scope-{i}": "out_of_scope" for i in range(3)},
+}
+
+
+@pytest.mark.unit
+def test_allocate_budget_is_proportional_with_one_per_category():
+    assert allocate_budget({"a": 10, "b": 10}, 4) == {"a": 2, "b": 2}
+    assert allocate_budget({"a": 90, "b": 9, "c": 1}, 10) == {"a": 8, "b": 1, "c": 1}
+    allocation = allocate_budget({"a": 8, "b": 12, "c": 3}, 8)
+    assert sum(allocation.values()) == 8 and min(allocation.values()) >= 1
+
+
+@pytest.mark.unit
+def test_allocate_budget_is_capped_by_category_sizes():
+    assert allocate_budget({"a": 2, "b": 1}, 10) == {"a": 2, "b": 1}
+    # Too small a budget for one case per category still picks exactly budget cases
+    assert sorted(allocate_budget({"a": 5, "b": 5, "c": 5}, 2).values()) == [0, 1, 1]
+
+
+@pytest.mark.unit
+def test_case_weights_favour_failing_and_slow_cases():
+    stats = {
+        "a": {"fail_rate": 0.5, "mean_latency": 1.0},
+        "b": {"fail_rate": 0.0, "mean_latency": 3.0},
+        "c": {"fail_rate": 0.0, "mean_latency": 1.0},
+    }
+    weights = case_weights(["a", "b", "c", "new"], stats, failure_weight=4.0, slow_weight=2.0)
+    assert weights == {"a": 3.0, "b": 5.0, "c": 1.0, "new": 1.0}
+
+
+@pytest.mark.unit
+def test_sample_is_deterministic_and_keeps_case_order():
+    first = stratified_sample(CASES, budget=8, cycle=3)
+    assert first == stratified_sample(dict(CASES), budget=8, cycle=3)
+    assert first == [key for key in CASES if key in first]
+    assert {CASES[key] for key in first} == {"greeting", "membership", "out_of_scope"}
+
+
+@pytest.mark.unit
+def test_every_case_runs_within_the_rotation():
+    rotation_cycles = 4
+    for start in (0, 5):
+        picked = set()
+        for cycle in range(start, start + rotation_cycles):
+            sample = stratified_sample(CASES, budget=6, cycle=cycle, rotation_cycles=rotation_cycles)
+            assert len(sample) >= 6
+            picked.update(sample)
+        assert picked == set(CASES)
+
+
+@pytest.mark.unit
+def test_history_weights_bias_the_sample():
+    cases = {f"q{i}": "greeting" for i in range(20)}
+    stats = {"q7": {"fail_rate": 1.0, "mean_latency": 1.0}}
+    hits = sum(
+        "q7" in stratified_sample(
+            cases, budget=5, cycle=cycle, rotation_cycles=20, stats=stats, failure_weight=50.0
+        )
+        for cycle in range(40)
+    )
+    # Unweighted, q7 would be picked in about a quarter of the cycles
+    assert hits >= 30
@@ -0,0 +1,98 @@
+"""
+Tests for the longest-first xdist scheduler.
+Workers are replaced by a stand-in node that records the test indices it
+is sent, so no subprocesses are started.
+"""
+
+import pytest
+
+from utils.scheduling import LongestFirstScheduling, estimate_durations
+
+
+class FakeConfig:
+    """Stand-in for pytest.Config exposing the xdist options the scheduler reads."""
+
+    def __init__(self, workers):
+        self.options = {"tx": [f"{workers}*popen"], "maxschedchunk": None}
+
+    def getvalue(self, name):
+        return self.options[name]
+
+    getoption = getvalue
+
+
+class FakeGateway:
+    """Stand-in for the execnet gateway xdist names workers by."""
+
+    def __init__(self, name):
+        self.id = name
+
+
+class FakeNode:
+    """Stand-in for an xdist WorkerController."""
+
+    def __init__(self, name):
+        self.gateway = FakeGateway(name)
+        self.sent = []
+        self.shutting_down = False
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def make_scheduler(collection, durations, workers=2):
+    scheduler = LongestFirstScheduling(FakeConfig(workers), durations=durations)
+    nodes = [FakeNode(f"gw{index}") for index in range(workers)]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, collection)
+    return scheduler, nodes
+
+
+@pytest.mark.unit
+def test_estimate_durations_falls_back_to_median_then_default():
+    known = {"t.py::test_a[x]": 10.0, "t.py::test_b": 2.0, "t.py::test_c": 4.0}
+    estimates = estimate_durations(["t.py::test_a[x-2-3]", "t.py::test_new"], known, 30.0)
+    assert estimates == {"t.py::test_a[x-2-3]": 10.0, "t.py::test_new": 4.0}
+    assert estimate_durations(["t.py::test_new"], {}, 30.0) == {"t.py::test_new": 30.0}
+
+
+@pytest.mark.unit
+def test_schedule_sends_longest_tests_first():
+    collection = ["t::a", "t::b", "t::c", "t::d", "t::e", "t::f"]
+    durations = {"t::a": 1.0, "t::b": 9.0, "t::c": 5.0, "t::d": 7.0, "t::f": 3.0}
+    scheduler, (first, second) = make_scheduler(collection, durations)
+
+    scheduler.schedule()
+    # Two tests queued per node, dealt round-robin from the longest down;
+    # t::e has no history and gets the median (5.0), after t::c by collection order
+    assert [collection[i] for i in first.sent] == ["t::b", "t::c"]
+    assert [collection[i] for i in second.sent] == ["t::d", "t::e"]
+    assert [collection[i] for i in scheduler.pending] == ["t::f", "t::a"]
+
+
+@pytest.mark.unit
+def test_finished_node_is_topped_up_then_shut_down():
+    collection = ["t::a", "t::b", "t::c", "t::d", "t::e"]
+    durations = {"t::a": 5.0, "t::b": 4.0, "t::c": 3.0, "t::d": 2.0, "t::e": 1.0}
+    scheduler, (first, second) = make_scheduler(collection, durations)
+    scheduler.schedule()
+
+    scheduler.mark_test_complete(first, first.sent[0])
+    assert [collection[i] for i in first.sent] == ["t::a", "t::c", "t::e"]
+    assert not scheduler.pending
+
+    scheduler.mark_test_complete(second, second.sent[0])
+    assert second.shutting_down
+    assert not first.shutting_down
+
+
+@pytest.mark.unit
+def test_short_collection_shuts_nodes_down_after_initial_round():
+    scheduler, nodes = make_scheduler(["t::a", "t::b"], {})
+    scheduler.schedule()
+    assert sorted(index for node in nodes for index in node.sent) == [0, 1]
+    assert all(node.shutting_down for node in nodes)
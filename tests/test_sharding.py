@@ -0,0 +1,89 @@
+"""
+Tests for cross-machine sharding: balanced partitions, the shared shard
+plan and the merge of per-shard summary fragments.
+"""
+
+import json
+
+import pytest
+
+from utils.sharding import (
+    load_shard_plan,
+    merge_fragments,
+    parse_shard,
+    partition_tests,
+    render_summary_html,
+    write_shard_plan,
+)
+
+TESTS = ["t::a", "t::b", "t::c", "t::d", "t::e", "t::f"]
+ESTIMATES = {"t::a": 8.0, "t::b": 1.0, "t::c": 5.0, "t::d": 4.0, "t::e": 3.0, "t::f": 3.0}
+
+
+@pytest.mark.unit
+def test_parse_shard_accepts_index_over_total():
+    assert parse_shard("2/4") == (2, 4)
+    assert parse_shard("1/1") == (1, 1)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value", ["0/4", "5/4", "1/0", "2", "a/b", "1/2/3"])
+def test_parse_shard_rejects_invalid_specs(value):
+    with pytest.raises(ValueError, match="Invalid shard"):
+        parse_shard(value)
+
+
+@pytest.mark.unit
+def test_partition_is_balanced_complete_and_in_collection_order():
+    bins = partition_tests(TESTS, ESTIMATES, 2)
+    assert bins == [(["t::a", "t::b", "t::e"], 12.0), (["t::c", "t::d", "t::f"], 12.0)]
+    assert partition_tests(list(TESTS), dict(ESTIMATES), 2) == bins
+
+
+@pytest.mark.unit
+def test_partition_with_more_shards_than_tests_leaves_empty_shards():
+    bins = partition_tests(["t::a"], {"t::a": 1.0}, 3)
+    assert bins == [(["t::a"], 1.0), ([], 0.0), ([], 0.0)]
+
+
+@pytest.mark.unit
+def test_shard_plan_round_trip_and_mismatch(tmp_path):
+    path = str(tmp_path / "plans" / "shards.json")
+    bins = partition_tests(TESTS, ESTIMATES, 2)
+    write_shard_plan(path, bins, count=3)
+
+    assert load_shard_plan(path, total=2, count=3) == bins
+    with pytest.raises(ValueError, match="not 3 shards"):
+        load_shard_plan(path, total=3, count=3)
+    with pytest.raises(ValueError, match="--count 1"):
+        load_shard_plan(path, total=2, count=1)
+
+
+@pytest.mark.unit
+def test_merge_fragments_tags_each_test_with_its_shard(tmp_path):
+    paths = []
+    for index, fragment in enumerate(
+        [{"t::a": {"status": "passed"}}, {"t::b": {"status": "failed", "fragment": "rerun"}}],
+        start=1,
+    ):
+        path = tmp_path / f"summary_shard{index}.json"
+        path.write_text(json.dumps(fragment), encoding="utf-8")
+        paths.append(str(path))
+
+    merged = merge_fragments(paths)
+    assert merged == {
+        "t::a": {"status": "passed", "fragment": "summary_shard1.json"},
+        "t::b": {"status": "failed", "fragment": "rerun"},
+    }
+
+
+@pytest.mark.unit
+def test_render_summary_html_counts_and_escapes():
+    summary = {
+        "t::a[<b>]": {"status": "passed", "response_time": 0.5, "response_text": "Hola"},
+        "t::b": {"status": "failed", "error": "<boom>"},
+    }
+    page = render_summary_html(summary, "Merged")
+    assert "2 tests: 1 failed, 1 passed" in page
+    assert "t::a[&lt;b&gt;]" in page and "&lt;boom&gt;" in page
+    assert summary["t::a[<b>]"]["response_id"] in page
@@ -0,0 +1,90 @@
+"""
+Tests for the latency SLO evaluation over the collected test data.
+"""
+
+import pytest
+
+from utils.slo import evaluate_slos, measure, percentile, validate_objectives
+
+GROUP = "tests/test_laraigo_responses.py::test_greeting"
+
+
+def case_data(latencies, slo, group=GROUP):
+    """Build conftest-like test data, one case per latency (None = no latency)."""
+    return {
+        f"{group}[{index}]": {"response_time": latency, "slo": slo, "slo_group": group}
+        for index, latency in enumerate(latencies)
+    }
+
+
+@pytest.mark.unit
+def test_percentile_interpolates_between_ranks():
+    values = [4.0, 1.0, 3.0, 2.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 2.5
+    assert percentile(values, 100) == 4.0
+    assert measure(values, "p95") == pytest.approx(3.85)
+    assert measure(values, "mean") == 2.5
+    assert measure(values, "max") == 4.0
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "objectives, message",
+    [
+        ({}, "at least one objective"),
+        ({"p100": 1.0}, "Unknown SLO objective"),
+        ({"median": 1.0}, "Unknown SLO objective"),
+        ({"p95": 0}, "positive number of seconds"),
+        ({"max": "2"}, "positive number of seconds"),
+        ({"p95": 1.0, "min_samples": 0}, "min_samples"),
+        ({"p95": 1.0, "min_samples": 2.5}, "min_samples"),
+    ],
+)
+def test_validate_objectives_rejects_bad_markers(objectives, message):
+    with pytest.raises(ValueError, match=message):
+        validate_objectives(objectives)
+
+
+@pytest.mark.unit
+def test_validate_objectives_accepts_valid_markers():
+    validate_objectives({"p95": 2.0, "p99.9": 3, "max": 5.0, "mean": 1.0, "min_samples": 3})
+
+
+@pytest.mark.unit
+def test_evaluate_slos_passes_and_fails_per_objective():
+    results = evaluate_slos(case_data([1.0, 1.5, 2.0, None], {"p50": 2.0, "max": 1.8}))
+    group = results[GROUP]
+    assert group["samples"] == 3
+    assert group["missing"] == 1
+    assert group["objectives"]["p50"] == {"target": 2.0, "measured": 1.5, "passed": True}
+    assert group["objectives"]["max"] == {"target": 1.8, "measured": 2.0, "passed": False}
+    assert (group["status"], group["passed"]) == ("failed", False)
+
+
+@pytest.mark.unit
+def test_evaluate_slos_without_latencies_has_no_data():
+    group = evaluate_slos(case_data([None, None], {"p95": 2.0}))[GROUP]
+    assert group["samples"] == 0
+    assert group["objectives"]["p95"] == {"target": 2.0, "measured": None, "passed": None}
+    assert (group["status"], group["passed"]) == ("no data", None)
+
+
+@pytest.mark.unit
+def test_evaluate_slos_min_samples_fails_groups_short_of_data():
+    assert evaluate_slos(case_data([None], {"p95": 2.0, "min_samples": 1}))[GROUP]["status"] == "failed"
+    short = evaluate_slos(case_data([1.0, None], {"p95": 2.0, "min_samples": 2}))[GROUP]
+    assert short["objectives"]["min_samples"] == {"target": 2, "measured": 1, "passed": False}
+    enough = evaluate_slos(case_data([1.0, 1.2], {"p95": 2.0, "min_samples": 2}))[GROUP]
+    assert (enough["status"], enough["passed"]) == ("passed", True)
+
+
+@pytest.mark.unit
+def test_evaluate_slos_groups_by_function_and_skips_unmarked_tests():
+    data = case_data([1.0], {"max": 2.0})
+    data.update(case_data([3.0], {"max": 2.0}, group="t.py::test_other"))
+    data["t.py::test_plain"] = {"response_time": 9.0}
+    results = evaluate_slos(data)
+    assert set(results) == {GROUP, "t.py::test_other"}
+    assert results[GROUP]["passed"] is True
+    assert results["t.py::test_other"]["passed"] is False
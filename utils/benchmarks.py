@@ -0,0 +1,141 @@
+"""
+Benchmark curves for chatbot QA testing.
+Generates benchmark inputs and aggregates the per-test measurements collected
+in the test data into curves (one point per size) that are printed and
+attached to the report.
+"""
+
+import statistics
+
+from utils.resource_sampler import linear_fit
+
+
+def throughput_curves(records):
+    """
+    Build a throughput-vs-size curve per media type from upload measurements.
+
+    Repeated measurements of the same type and size (e.g. --count) are
+    reduced to their median.
+
+    Args:
+        records (list): Dicts with media_type, size_bytes, bubble_s and ack_s
+
+    Returns:
+        dict: media type -> list of points sorted by size, each with size_kb,
+            samples, bubble_s, ack_s and throughput_kb_s (size / bubble time)
+    """
+    grouped = {}
+    for record in records:
+        key = (record["media_type"], record["size_bytes"])
+        grouped.setdefault(key, []).append(record)
+
+    curves = {}
+    for (media_type, size_bytes), group in sorted(grouped.items()):
+        bubble = statistics.median(r["bubble_s"] for r in group)
+        acks = [r["ack_s"] for r in group if r.get("ack_s") is not None]
+        curves.setdefault(media_type, []).append(
+            {
+                "size_kb": round(size_bytes / 1024, 1),
+                "samples": len(group),
+                "bubble_s": round(bubble, 3),
+                "ack_s": round(statistics.median(acks), 3) if acks else None,
+                "throughput_kb_s": round(size_bytes / 1024 / bubble, 1) if bubble else None,
+            }
+        )
+    return curves
+
+
+# Character pools per charset; words are joined with single spaces because the
+# chat renders collapsed whitespace and the echo check compares rendered text
+CHARSETS = {
+    "ascii": "abcdefghijklmnopqrstuvwxyz",
+    "accents": "áéíóúñüÁÉÍÓÚÑ¿¡",
+    "emoji": "😀😂😍👍🙏⚽🎉🔥💙🤖",
+    "mixed": "aeñüжщ中文字عربي😀⚽",
+}
+
+
+def _utf16_length(text):
+    """Length as counted by the browser (maxlength counts UTF-16 code units)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def generate_message(length, charset="ascii"):
+    """
+    Generate a deterministic message of the given browser length.
+
+    Args:
+        length (int): Target length in UTF-16 code units (what maxlength limits)
+        charset (str): Key of CHARSETS
+
+    Returns:
+        str: Message without leading, trailing or repeated spaces
+    """
+    pool = CHARSETS[charset]
+    message = ""
+    i = 0
+    while _utf16_length(message) < length:
+        remaining = length - _utf16_length(message)
+        if remaining > 1 and message and i % 7 == 6 and not message.endswith(" "):
+            message += " "
+        else:
+            char = pool[i % len(pool)]
+            # A surrogate pair does not fit in the last code unit; use a BMP letter
+            message += char if _utf16_length(char) <= remaining else "a"
+        i += 1
+    return message
+
+
+def latency_curve(records, jump_ratio=1.5, min_jump_s=0.25):
+    """
+    Fit reply latency against message length per charset and find jumps.
+
+    A jump is a step between consecutive measured lengths where the median
+    latency grows by at least jump_ratio and by at least min_jump_s seconds.
+
+    Args:
+        records (list): Dicts with charset, length and latency_s
+        jump_ratio (float): Minimum latency ratio between consecutive lengths
+        min_jump_s (float): Minimum absolute latency increase in seconds
+
+    Returns:
+        dict: charset -> points (length, samples, latency_s), linear fit
+            (slope_ms_per_char, intercept_s) and jumps
+    """
+    grouped = {}
+    for record in records:
+        grouped.setdefault(record["charset"], {}).setdefault(record["length"], []).append(
+            record["latency_s"]
+        )
+
+    curves = {}
+    for charset, by_length in sorted(grouped.items()):
+        points = [
+            {"length": length, "samples": len(values), "latency_s": round(statistics.median(values), 3)}
+            for length, values in sorted(by_length.items())
+        ]
+        fit = None
+        if len(points) >= 2:
+            slope, intercept = linear_fit(
+                [p["length"] for p in points], [p["latency_s"] for p in points]
+            )
+            fit = {"slope_ms_per_char": round(slope * 1000, 4), "intercept_s": round(intercept, 3)}
+
+        jumps = []
+        for before, after in zip(points, points[1:]):
+            increase = after["latency_s"] - before["latency_s"]
+            if (
+                before["latency_s"] > 0
+                and after["latency_s"] / before["latency_s"] >= jump_ratio
+                and increase >= min_jump_s
+            ):
+                jumps.append(
+                    {
+                        "from_length": before["length"],
+                        "to_length": after["length"],
+                        "from_s": before["latency_s"],
+                        "to_s": after["latency_s"],
+                    }
+                )
+        curves[charset] = {"points": points, "fit": fit, "jumps": jumps}
+    return curves
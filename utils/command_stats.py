@@ -0,0 +1,249 @@
+"""
+WebDriver command instrumentation for chatbot QA testing.
+Counts and times every round trip between the test process and the driver
+so chatty page-object methods and call sites can be identified.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Helpers in utils (tracing wrappers, element cache) are attributed to their caller
+_HELPERS_DIR = os.path.join(PROJECT_ROOT, "utils")
+
+
+def _is_project_frame(filename):
+    """Check if a frame belongs to the project code (pages, tests, conftest)."""
+    return (
+        filename.startswith(PROJECT_ROOT)
+        and not filename.startswith(_HELPERS_DIR)
+        and "site-packages" not in filename
+    )
+
+
+def _caller_info():
+    """
+    Find the project code that issued the current WebDriver command.
+
+    Returns:
+        tuple: (call_site, method) where call_site is "file:line" of the nearest
+            project frame and method is the nearest named page-object method
+    """
+    frame = sys._getframe(2)
+    call_site = None
+    method = None
+    while frame is not None:
+        code = frame.f_code
+        if _is_project_frame(code.co_filename):
+            if call_site is None:
+                call_site = f"{os.path.relpath(code.co_filename, PROJECT_ROOT)}:{frame.f_lineno}"
+            if not code.co_name.startswith("<"):
+                owner = frame.f_locals.get("self")
+                method = (
+                    f"{type(owner).__name__}.{code.co_name}"
+                    if owner is not None
+                    else code.co_name
+                )
+                break
+        frame = frame.f_back
+    return call_site or "<external>", method or "<external>"
+
+
+class CommandRecorder:
+    """
+    Records WebDriver commands issued through instrumented executors.
+    The conftest hooks reset it at the start of every test and collect the
+    per-test summary when the test call ends.
+
+    Each thread records into its own state, so drivers used from worker
+    threads (flows, monitor sessions) do not mix their commands. Memory is
+    bounded in long tests: only running totals and the last keep_last
+    commands (for the failure snapshot) are kept.
+    """
+
+    def __init__(self, top_n=10, keep_last=20):
+        """
+        Initialize the recorder.
+
+        Args:
+            top_n (int): Number of call sites kept in summaries
+            keep_last (int): Latest command entries kept for diagnostics
+        """
+        self.top_n = top_n
+        self.keep_last = keep_last
+        self._local = threading.local()
+
+    def _state(self):
+        """Return the recording state of the current thread."""
+        state = getattr(self._local, "state", None)
+        if state is None:
+            state = self._local.state = _new_state(self.keep_last)
+        return state
+
+    @property
+    def commands(self):
+        """Latest command entries recorded by the current thread (at most keep_last)."""
+        return list(self._state()["recent"])
+
+    def install(self, driver):
+        """
+        Wrap the command executor of a driver so every command is recorded.
+
+        Args:
+            driver (WebDriver): Driver to instrument
+
+        Returns:
+            WebDriver: The same driver
+        """
+        executor = driver.command_executor
+        if getattr(executor, "_command_recorder", None) is self:
+            return driver
+        original_execute = executor.execute
+
+        def execute(command, params):
+            # Measure the payload before execute() strips path parameters from it
+            request_bytes = len(json.dumps(params, default=str)) if params else 0
+            start = time.perf_counter()
+            response = None
+            try:
+                response = original_execute(command, params)
+                return response
+            finally:
+                latency = time.perf_counter() - start
+                call_site, method = _caller_info()
+                self.record(
+                    {
+                        "command": command,
+                        "latency_ms": round(latency * 1000, 3),
+                        "request_bytes": request_bytes,
+                        "response_bytes": (
+                            len(json.dumps(response, default=str)) if response else 0
+                        ),
+                        "call_site": call_site,
+                        "method": method,
+                    }
+                )
+
+        executor.execute = execute
+        executor._command_recorder = self
+        return driver
+
+    def record(self, entry):
+        """Add a single command entry to the current thread's totals."""
+        _add_entry(self._state(), entry)
+
+    def reset(self):
+        """Discard the current thread's commands (called at the start of every test)."""
+        self._local.state = _new_state(self.keep_last)
+
+    def summary(self, commands=None):
+        """
+        Summarize recorded commands.
+
+        Args:
+            commands (list, optional): Entries to summarize; defaults to every
+                command of the current test in the current thread
+
+        Returns:
+            dict: Totals plus counts per command, per method and per call site
+        """
+        if commands is None:
+            state = self._state()
+        else:
+            state = _new_state(0)
+            for entry in commands:
+                _add_entry(state, entry)
+        if not state["count"]:
+            return None
+
+        by_command, by_method = (
+            {name: dict(row, total_ms=round(row["total_ms"], 2)) for name, row in table.items()}
+            for table in (state["by_command"], state["by_method"])
+        )
+        return {
+            "count": state["count"],
+            "total_ms": round(state["total_ms"], 2),
+            "request_bytes": state["request_bytes"],
+            "response_bytes": state["response_bytes"],
+            "by_command": dict(
+                sorted(by_command.items(), key=lambda i: i[1]["count"], reverse=True)
+            ),
+            "by_method": dict(
+                sorted(by_method.items(), key=lambda i: i[1]["count"], reverse=True)
+            ),
+            "call_sites": dict(state["call_sites"]),
+            "top_call_sites": state["call_sites"].most_common(self.top_n),
+        }
+
+
+def _new_state(keep_last):
+    """Empty running totals of a recorder thread."""
+    return {
+        "recent": deque(maxlen=keep_last),
+        "count": 0,
+        "total_ms": 0.0,
+        "request_bytes": 0,
+        "response_bytes": 0,
+        "by_command": {},
+        "by_method": {},
+        "call_sites": Counter(),
+    }
+
+
+def _add_entry(state, entry):
+    """Add a command entry to running totals."""
+    state["recent"].append(entry)
+    state["count"] += 1
+    state["total_ms"] += entry["latency_ms"]
+    state["request_bytes"] += entry["request_bytes"]
+    state["response_bytes"] += entry["response_bytes"]
+    for table, key in ((state["by_command"], entry["command"]), (state["by_method"], entry["method"])):
+        row = table.setdefault(key, {"count": 0, "total_ms": 0.0})
+        row["count"] += 1
+        row["total_ms"] += entry["latency_ms"]
+    state["call_sites"][entry["call_site"]] += 1
+
+
+def merge_command_summaries(summaries, top_n=10):
+    """
+    Combine per-test command summaries into a run-level summary.
+
+    Args:
+        summaries (list): Summaries as returned by CommandRecorder.summary()
+        top_n (int): Number of call sites to keep
+
+    Returns:
+        dict: Same shape as a single summary, or None if there is nothing to merge
+    """
+    summaries = [s for s in summaries if s]
+    if not summaries:
+        return None
+
+    merged = {"count": 0, "total_ms": 0.0, "request_bytes": 0, "response_bytes": 0}
+    by_command = {}
+    by_method = {}
+    call_sites = Counter()
+    for summary in summaries:
+        for key in ("count", "total_ms", "request_bytes", "response_bytes"):
+            merged[key] += summary[key]
+        for table, source in ((by_command, summary["by_command"]), (by_method, summary["by_method"])):
+            for name, row in source.items():
+                target = table.setdefault(name, {"count": 0, "total_ms": 0.0})
+                target["count"] += row["count"]
+                target["total_ms"] = round(target["total_ms"] + row["total_ms"], 2)
+        call_sites.update(summary["call_sites"])
+
+    merged["total_ms"] = round(merged["total_ms"], 2)
+    merged["by_command"] = dict(
+        sorted(by_command.items(), key=lambda i: i[1]["count"], reverse=True)
+    )
+    merged["by_method"] = dict(
+        sorted(by_method.items(), key=lambda i: i[1]["count"], reverse=True)
+    )
+    merged["call_sites"] = dict(call_sites)
+    merged["top_call_sites"] = call_sites.most_common(top_n)
+    return merged
@@ -0,0 +1,70 @@
+"""
+Message corpus for the Laraigo chatbot tests.
+Groups the user messages by category together with the prefix every bot
+reply of that category is expected to start with.
+"""
+
+CORPUS = {
+    "greeting": {
+        "expected": "Hola Blanquiazul",
+        "queries": [
+            "Hola Buenos dias",
+            "Hola que tal",
+            "Buenas noches",
+            "Buenas tardes",
+            "Hola muy buenos dias",
+            "Hola como estas",
+            "Hola",
+        ],
+    },
+    "membership": {
+        "expected": "Gracias por contactarte",
+        "queries": [
+            "Cuanto tiempo dura la membresia",
+            "Que beneficios tiene la membresia",
+            "Que descuentos tengo con la membresia",
+            "Tengo descuentos en las entradas con la membresia?",
+            "Cuanto cuesta la membresia",
+            "Como adquiero la membresia",
+            "Como cancelo la membresia?",
+        ],
+    },
+    "out_of_scope": {
+        "expected": "Lo lamento",
+        "queries": [
+            "Quien ganara la final",
+            "Como me llamo",
+            "Cuando se fundo lima",
+            "Cual es el precio de la entrada",
+            "Cuantos años tengo",
+            "Quien ganara el mundial",
+        ],
+    },
+}
+
+
+def corpus_messages(count, categories=None):
+    """
+    Build a message sequence that cycles through the corpus.
+
+    Categories are interleaved (one query of each in turn) so a long
+    conversation mixes intents the way a real user does.
+
+    Args:
+        count (int): Number of messages
+        categories (list, optional): Categories to use; defaults to all of them
+
+    Returns:
+        list: (category, query) tuples
+    """
+    categories = list(categories or CORPUS)
+    messages = []
+    turn = 0
+    while len(messages) < count:
+        for category in categories:
+            queries = CORPUS[category]["queries"]
+            messages.append((category, queries[turn % len(queries)]))
+            if len(messages) == count:
+                break
+        turn += 1
+    return messages
@@ -0,0 +1,200 @@
+"""
+Failure diagnostics for chatbot QA testing.
+Captures a compressed snapshot of the chat history subtree, the console log
+of the widget and the last WebDriver commands of a failed test. It costs a
+fraction of a full-page screenshot and can be read inline in the report.
+"""
+
+import gzip
+import html
+import json
+import os
+import time
+from datetime import datetime
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+# Browsers whose driver returns the console through the "browser" log type
+# (enabled with the loggingPrefs capability in driver_factory)
+_BROWSER_LOG_BROWSERS = ("chrome", "chrome-headless-shell", "msedge", "microsoftedge")
+
+# Keep console.* calls and uncaught errors for browsers without a browser log
+CONSOLE_HOOK_SCRIPT = """
+if (!window.__qaConsole) {
+    const entries = window.__qaConsole = [];
+    const keep = (level, args) => {
+        entries.push({
+            level: level,
+            message: Array.from(args).map((a) => {
+                try { return typeof a === "string" ? a : JSON.stringify(a); }
+                catch (e) { return String(a); }
+            }).join(" "),
+            timestamp: Date.now(),
+        });
+        if (entries.length > 200) entries.shift();
+    };
+    for (const level of ["error", "warn", "info", "log"]) {
+        const original = console[level];
+        console[level] = function () { keep(level.toUpperCase(), arguments); return original.apply(this, arguments); };
+    }
+    window.addEventListener("error", (e) => keep("SEVERE", [e.message + " (" + e.filename + ":" + e.lineno + ")"]));
+    window.addEventListener("unhandledrejection", (e) => keep("SEVERE", ["Unhandled rejection: " + e.reason]));
+}
+"""
+
+# Serialize the chat history (or the widget, or the body) marking hidden
+# elements, since visibility is what most widget assertions depend on
+_SNAPSHOT_SCRIPT = """
+const [selectors] = arguments;
+let root = null;
+for (const selector of selectors) {
+    root = document.querySelector(selector);
+    if (root) break;
+}
+root = root || document.body;
+const clone = root.cloneNode(true);
+const originals = [root, ...root.querySelectorAll("*")];
+const copies = [clone, ...clone.querySelectorAll("*")];
+originals.forEach((node, i) => {
+    const style = window.getComputedStyle(node);
+    if (style.display === "none" || style.visibility === "hidden" || style.opacity === "0") {
+        copies[i].setAttribute("data-qa-hidden", "true");
+    }
+});
+for (const node of clone.querySelectorAll("script")) node.remove();
+for (const node of clone.querySelectorAll("[src^='data:']")) {
+    node.setAttribute("src", node.getAttribute("src").slice(0, 64) + "...");
+}
+return {
+    url: location.href,
+    title: document.title,
+    root: root.id ? "#" + root.id : root.tagName.toLowerCase(),
+    html: clone.outerHTML,
+    console: window.__qaConsole || null,
+};
+"""
+
+# Chat history first, then the whole widget
+SNAPSHOT_ROOTS = ("#chat-history-chatweb", "#chat-window", "#chatbot-messages")
+
+
+def install_console_hook(driver):
+    """
+    Install the console hook on the current page when the browser has no browser log.
+
+    Args:
+        driver (WebDriver): Driver whose current page is hooked
+    """
+    browser = (driver.capabilities or {}).get("browserName", "").lower()
+    if browser in _BROWSER_LOG_BROWSERS:
+        return
+    try:
+        driver.execute_script(CONSOLE_HOOK_SCRIPT)
+    except WebDriverException:
+        pass
+
+
+def _browser_log(driver):
+    """Return the browser log entries, or None if the driver does not provide them."""
+    try:
+        # execute() also covers remote drivers, which have no get_log()
+        return driver.execute(Command.GET_LOG, {"type": "browser"})["value"]
+    except WebDriverException:
+        return None
+
+
+def capture_snapshot(driver, commands, last_commands, directory, name):
+    """
+    Capture and store a compressed diagnostics snapshot.
+
+    Args:
+        driver (WebDriver): Driver of the failed test
+        commands (list): WebDriver command entries recorded for the test
+        last_commands (int): Number of trailing commands kept
+        directory (str): Directory for the snapshot file
+        name (str): Base name of the file
+
+    Returns:
+        dict: path, bytes (compressed), raw_bytes, capture_ms and the snapshot
+            itself, or None if the page could not be read
+    """
+    start = time.perf_counter()
+    try:
+        page = driver.execute_script(_SNAPSHOT_SCRIPT, list(SNAPSHOT_ROOTS))
+    except WebDriverException as e:
+        print(f"Failed to capture DOM snapshot: {e}")
+        return None
+
+    console = _browser_log(driver)
+    page_console = page.pop("console")
+    snapshot = dict(
+        page,
+        console=console if console is not None else page_console or [],
+        console_source="browser_log" if console is not None else "hook",
+        commands=list(commands[-last_commands:]) if last_commands else [],
+    )
+    raw = json.dumps(snapshot, ensure_ascii=False).encode("utf-8")
+    compressed = gzip.compress(raw)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(directory, f"{timestamp}_{name}.snapshot.json.gz")
+    try:
+        with open(path, "wb") as f:
+            f.write(compressed)
+    except OSError as e:
+        print(f"Failed to write DOM snapshot: {e}")
+        path = None
+
+    return {
+        "path": path,
+        "bytes": len(compressed),
+        "raw_bytes": len(raw),
+        "capture_ms": round((time.perf_counter() - start) * 1000, 2),
+        "snapshot": snapshot,
+    }
+
+
+def load_snapshot(path):
+    """Read a snapshot file written by capture_snapshot()."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def snapshot_html(capture):
+    """
+    Render a snapshot as collapsible report sections.
+
+    Args:
+        capture (dict): Result of capture_snapshot()
+
+    Returns:
+        str: HTML fragment with the DOM, console and command sections
+    """
+    snapshot = capture["snapshot"]
+    console_rows = "".join(
+        f'<tr><td style="padding:4px;">{html.escape(str(e.get("level", "")))}</td>'
+        f'<td style="padding:4px; white-space:pre-wrap;">{html.escape(str(e.get("message", "")))}</td></tr>'
+        for e in snapshot["console"]
+    )
+    command_rows = "".join(
+        f'<tr><td style="padding:4px;">{html.escape(c["command"])}</td>'
+        f'<td style="padding:4px;">{c["latency_ms"]}</td>'
+        f'<td style="padding:4px;">{html.escape(c["method"])}</td>'
+        f'<td style="padding:4px;">{html.escape(c["call_site"])}</td></tr>'
+        for c in snapshot["commands"]
+    )
+    return (
+        '<div class="test-data"><h3>Failure Snapshot</h3>'
+        f'<p>{html.escape(snapshot["url"])} &middot; {capture["bytes"]} bytes compressed '
+        f'({capture["raw_bytes"]} raw) &middot; captured in {capture["capture_ms"]} ms</p>'
+        f'<details><summary>DOM ({html.escape(snapshot["root"])}, hidden elements marked data-qa-hidden)</summary>'
+        f'<pre>{html.escape(snapshot["html"])}</pre></details>'
+        f'<details><summary>Console ({len(snapshot["console"])} entries, {snapshot["console_source"]})</summary>'
+        '<table style="width:100%; border-collapse: collapse;">'
+        f"<tr><th>Level</th><th>Message</th></tr>{console_rows}</table></details>"
+        f'<details><summary>Last {len(snapshot["commands"])} WebDriver commands</summary>'
+        '<table style="width:100%; border-collapse: collapse;">'
+        f"<tr><th>Command</th><th>Latency (ms)</th><th>Method</th><th>Call site</th></tr>{command_rows}</table></details>"
+        "</div>"
+    )
@@ -0,0 +1,93 @@
+"""
+WebDriver factory for chatbot QA testing.
+Creates local browser sessions for the pytest fixtures and for the runner
+commands that drive the chatbot outside of pytest.
+"""
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.firefox.service import Service as FirefoxService
+from selenium.webdriver.edge.service import Service as EdgeService
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.firefox import GeckoDriverManager
+from webdriver_manager.microsoft import EdgeChromiumDriverManager
+
+from config.config import BROWSER_TYPE, HEADLESS, PERF_LOG_CAPTURE
+
+
+def _logging_prefs():
+    """Log types kept by Chromium drivers: console always, DevTools events when opted in."""
+    prefs = {"browser": "ALL"}
+    if PERF_LOG_CAPTURE:
+        prefs["performance"] = "ALL"
+    return prefs
+
+
+def browser_options(browser_type=BROWSER_TYPE, headless=HEADLESS):
+    """
+    Build the browser options used for local and remote sessions.
+
+    Args:
+        browser_type (str): "chrome", "firefox" or "edge"
+        headless (bool): Run the browser without a window
+
+    Returns:
+        ArgOptions: Options for the browser
+    """
+    if browser_type.lower() == "chrome":
+        options = webdriver.ChromeOptions()
+        if headless:
+            options.add_argument("--headless")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        # Add additional options to improve headless stability
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-infobars")
+        # Keep console messages for the failure snapshot (utils/diagnostics)
+        options.set_capability("goog:loggingPrefs", _logging_prefs())
+        return options
+
+    elif browser_type.lower() == "firefox":
+        options = webdriver.FirefoxOptions()
+        if headless:
+            options.add_argument("--headless")
+        return options
+
+    elif browser_type.lower() == "edge":
+        options = webdriver.EdgeOptions()
+        if headless:
+            options.add_argument("--headless")
+        options.set_capability("ms:loggingPrefs", _logging_prefs())
+        return options
+
+    else:
+        raise ValueError(f"Unsupported browser type: {browser_type}")
+
+
+def create_driver(browser_type=BROWSER_TYPE, headless=HEADLESS):
+    """
+    Create a local WebDriver.
+
+    Args:
+        browser_type (str): "chrome", "firefox" or "edge"
+        headless (bool): Run the browser without a window
+
+    Returns:
+        WebDriver: New driver session
+    """
+    options = browser_options(browser_type, headless)
+    if browser_type.lower() == "chrome":
+        return webdriver.Chrome(
+            service=Service(ChromeDriverManager().install()), options=options
+        )
+
+    elif browser_type.lower() == "firefox":
+        return webdriver.Firefox(
+            service=FirefoxService(GeckoDriverManager().install()), options=options
+        )
+
+    else:
+        return webdriver.Edge(
+            service=EdgeService(EdgeChromiumDriverManager().install()), options=options
+        )
@@ -0,0 +1,142 @@
+"""
+Element reference cache for the page objects.
+Keeps resolved WebElements of stable nodes (inputs, buttons, containers) so
+page objects do not re-find them on every call, and transparently re-resolves
+them when the browser reports a stale reference.
+"""
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+
+class CachedElement:
+    """
+    Proxy to the WebElement of a locator.
+    Attribute access and method calls are forwarded to the cached element; on
+    StaleElementReferenceException the locator is resolved again and the
+    operation retried once.
+    """
+
+    def __init__(self, cache, locator):
+        """
+        Initialize the proxy.
+
+        Args:
+            cache (LocatorCache): Cache that resolves the locator
+            locator (tuple): (By, value) locator of the element
+        """
+        self._cache = cache
+        self._locator = locator
+
+    def __getattr__(self, name):
+        """Forward attributes (e.g. text) and methods (e.g. click) to the element."""
+        value = self.apply(lambda element: getattr(element, name))
+        if not callable(value):
+            return value
+
+        def method(*args, **kwargs):
+            return self.apply(lambda element: getattr(element, name)(*args, **kwargs))
+
+        return method
+
+    def apply(self, operation):
+        """
+        Run an operation on the WebElement, re-resolving it once if it went stale.
+
+        Use it where the raw WebElement is needed, e.g. as an execute_script argument.
+
+        Args:
+            operation (callable): Function of the WebElement
+
+        Returns:
+            Result of the operation
+        """
+        try:
+            return operation(self._cache.resolve(self._locator))
+        except StaleElementReferenceException:
+            self._cache.invalidate(self._locator)
+            return operation(self._cache.resolve(self._locator))
+
+    def __repr__(self):
+        return f"CachedElement({self._locator!r})"
+
+
+class LocatorCache:
+    """Cache of resolved WebElements keyed by locator."""
+
+    def __init__(self, driver):
+        """
+        Initialize an empty cache.
+
+        Args:
+            driver (WebDriver): Driver used to resolve locators
+        """
+        self.driver = driver
+        self._elements = {}
+
+    def get(self, locator):
+        """
+        Return a proxy for the element of a locator.
+        The element is resolved lazily on first use, so a missing element
+        raises NoSuchElementException at that point, as find_element would.
+
+        Args:
+            locator (tuple): (By, value) locator
+
+        Returns:
+            CachedElement: Proxy to the element
+        """
+        return CachedElement(self, locator)
+
+    def resolve(self, locator):
+        """Return the cached WebElement of a locator, finding it if needed."""
+        element = self._elements.get(locator)
+        if element is None:
+            element = self.driver.find_element(*locator)
+            self._elements[locator] = element
+        return element
+
+    def invalidate(self, locator=None):
+        """
+        Drop cached elements (all of them, e.g. after navigation, or one locator).
+
+        Args:
+            locator (tuple, optional): Locator to drop; None drops everything
+        """
+        if locator is None:
+            self._elements.clear()
+        else:
+            self._elements.pop(locator, None)
+
+
+def clickable(element):
+    """
+    Wait condition equivalent to EC.element_to_be_clickable for a cached element.
+
+    Args:
+        element (CachedElement): Element to check
+
+    Returns:
+        callable: Condition returning the element once it is visible and enabled
+    """
+
+    def _predicate(_):
+        return element if element.is_displayed() and element.is_enabled() else False
+
+    return _predicate
+
+
+def visible(element):
+    """
+    Wait condition equivalent to EC.visibility_of_element_located for a cached element.
+
+    Args:
+        element (CachedElement): Element to check
+
+    Returns:
+        callable: Condition returning the element once it is displayed
+    """
+
+    def _predicate(_):
+        return element if element.is_displayed() else False
+
+    return _predicate
@@ -0,0 +1,190 @@
+"""
+Side-by-side environment comparison for chatbot QA testing.
+Sends the same corpus to two Laraigo environments (e.g. PROD and TEST) and
+compares response texts and per-query latencies, so a promotion can be gated
+on performance.
+"""
+
+import difflib
+import html
+import math
+import statistics
+import time
+from collections import Counter
+
+from selenium.common.exceptions import WebDriverException
+
+from pages.laraigo_page import LaraigoPage
+from utils.driver_factory import create_driver
+from utils.history import welch_t
+from utils.tracing import TRACER
+
+
+def run_corpus(url, messages, repeats=1):
+    """
+    Send every message of a corpus to one environment in a single session.
+
+    Each query starts a fresh conversation (reset_conversation), so replies
+    do not depend on the previous turns.
+
+    Args:
+        url (str): Page URL of the environment
+        messages (list): (category, query) tuples
+        repeats (int): Times the whole corpus is sent
+
+    Returns:
+        dict: query -> latencies (seconds), responses (joined reply texts) and errors
+    """
+    results = {
+        query: {"category": category, "latencies": [], "responses": [], "errors": []}
+        for category, query in messages
+    }
+    driver = create_driver()
+    try:
+        page = LaraigoPage(driver, url=url)
+        page.open_chat()
+        for _ in range(repeats):
+            for _, query in messages:
+                # Keep the span tree of this thread bounded outside of pytest
+                TRACER.reset(query)
+                try:
+                    page.reset_conversation()
+                    start_time = time.time()
+                    response = page.send_message(query)
+                    results[query]["latencies"].append(time.time() - start_time)
+                    results[query]["responses"].append("\n".join(response))
+                except WebDriverException as e:
+                    results[query]["errors"].append(e.msg or str(e))
+    finally:
+        driver.quit()
+    return results
+
+
+def compare_environments(baseline, candidate, t_threshold=3.0, min_ratio=1.2):
+    """
+    Compare the corpus results of a candidate environment against a baseline.
+
+    The reference text of a query is its most frequent reply in each
+    environment. A latency change is significant when the Welch t statistic
+    exceeds t_threshold; it counts as a slowdown when the candidate is also
+    at least min_ratio times slower.
+
+    Args:
+        baseline (dict): Results of run_corpus() for the baseline (e.g. PROD)
+        candidate (dict): Results of run_corpus() for the candidate (e.g. TEST)
+        t_threshold (float): Minimum |t| for a significant latency change
+        min_ratio (float): Minimum candidate/baseline mean ratio for a slowdown
+
+    Returns:
+        dict: Per-query rows plus text_changes, slower, faster and new_errors counts
+    """
+    rows = []
+    for query in list(dict.fromkeys(list(baseline) + list(candidate))):
+        base = baseline.get(query, {"latencies": [], "responses": [], "errors": []})
+        cand = candidate.get(query, {"latencies": [], "responses": [], "errors": []})
+
+        base_text = Counter(base["responses"]).most_common(1)[0][0] if base["responses"] else None
+        cand_text = Counter(cand["responses"]).most_common(1)[0][0] if cand["responses"] else None
+        text_changed = base_text is not None and cand_text is not None and base_text != cand_text
+        diff = (
+            list(
+                difflib.unified_diff(
+                    base_text.splitlines(),
+                    cand_text.splitlines(),
+                    "baseline",
+                    "candidate",
+                    lineterm="",
+                )
+            )
+            if text_changed
+            else []
+        )
+
+        row = {
+            "query": query,
+            "category": base.get("category") or cand.get("category"),
+            "text_changed": text_changed,
+            "diff": diff,
+            "baseline_errors": len(base["errors"]),
+            "candidate_errors": len(cand["errors"]),
+            "baseline_mean": None,
+            "candidate_mean": None,
+            "delta_s": None,
+            "ratio": None,
+            "t": None,
+            "significant": False,
+            "slower": False,
+            "faster": False,
+        }
+        if base["latencies"] and cand["latencies"]:
+            base_mean = statistics.fmean(base["latencies"])
+            cand_mean = statistics.fmean(cand["latencies"])
+            ratio = cand_mean / base_mean if base_mean else math.inf
+            row.update(
+                baseline_mean=round(base_mean, 3),
+                candidate_mean=round(cand_mean, 3),
+                delta_s=round(cand_mean - base_mean, 3),
+                ratio=round(ratio, 2),
+            )
+            if len(base["latencies"]) >= 2:
+                t_value = welch_t(cand["latencies"], base["latencies"])
+                significant = abs(t_value) >= t_threshold
+                row.update(
+                    t=round(t_value, 2) if math.isfinite(t_value) else None,
+                    significant=significant,
+                    slower=significant and t_value > 0 and ratio >= min_ratio,
+                    faster=significant and t_value < 0,
+                )
+        rows.append(row)
+
+    return {
+        "queries": rows,
+        "text_changes": sum(r["text_changed"] for r in rows),
+        "slower": sum(r["slower"] for r in rows),
+        "faster": sum(r["faster"] for r in rows),
+        "new_errors": sum(
+            1 for r in rows if r["candidate_errors"] and not r["baseline_errors"]
+        ),
+    }
+
+
+def render_envdiff_html(comparison, title):
+    """
+    Render an environment comparison as a standalone HTML report.
+
+    Args:
+        comparison (dict): Result of compare_environments()
+        title (str): Report title
+
+    Returns:
+        str: HTML document
+    """
+    rows = ""
+    for row in comparison["queries"]:
+        color = "#e74c3c" if row["slower"] else "#2ecc71" if row["faster"] else "#333"
+        diff = html.escape("\n".join(row["diff"])) if row["diff"] else ""
+        rows += (
+            "<tr>"
+            f'<td style="padding:6px; border:1px solid #ddd;">{html.escape(row["query"])}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{row["baseline_mean"]}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{row["candidate_mean"]}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd; color:{color}; font-weight:bold;">{row["delta_s"]} (x{row["ratio"]})</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{row["t"]}{" *" if row["significant"] else ""}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{row["baseline_errors"]} / {row["candidate_errors"]}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;"><pre style="margin:0; white-space:pre-wrap;">{diff}</pre></td>'
+            "</tr>"
+        )
+
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{html.escape(title)}</title></head>
+<body style="font-family: Helvetica, Arial, sans-serif; margin: 20px;">
+<h1>{html.escape(title)}</h1>
+<p>{len(comparison["queries"])} queries: {comparison["text_changes"]} text changes, {comparison["slower"]} significantly slower, {comparison["faster"]} significantly faster, {comparison["new_errors"]} new errors</p>
+<table style="width:100%; border-collapse: collapse;">
+<tr><th>Query</th><th>Baseline mean (s)</th><th>Candidate mean (s)</th><th>Delta (s)</th><th>Welch t</th><th>Errors (base / cand)</th><th>Response diff</th></tr>
+{rows}
+</table>
+</body>
+</html>
+"""
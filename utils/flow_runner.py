@@ -0,0 +1,311 @@
+"""
+Conversation flows for chatbot QA testing.
+Loads multi-turn conversation scripts written in YAML (flows/*.yaml), runs
+them through LaraigoPage and reports the timing of every turn. Flows that
+do not share a browser session are run in parallel.
+
+A flow looks like:
+
+    name: saludo_y_membresia
+    description: Saludo seguido de una consulta de membresía
+    session: cliente_frecuente   # optional, flows with the same session run in order in one browser
+    max_latency: 10.0            # optional default for every turn (seconds)
+    turns:
+      - say: Hola
+        expect: greeting         # CORPUS category (or list of them), or "any"
+        max_latency: 8.0
+      - say: Cuanto cuesta la membresia
+        expect: membership
+      - upload: image            # image, file, audio or video (generated with media_fixture)
+        size_kb: 100
+        expect_text: Recibimos   # optional prefix every reply must start with (any of them)
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import yaml
+from selenium.common.exceptions import WebDriverException
+
+from pages.laraigo_page import LaraigoPage
+from utils.corpus import CORPUS
+from utils.driver_factory import create_driver
+from utils.media_fixtures import MEDIA_EXTENSIONS, media_fixture
+from utils.tracing import TRACER
+
+_TURN_KEYS = {"say", "upload", "size_kb", "expect", "expect_text", "max_latency"}
+_FLOW_KEYS = {"name", "description", "session", "max_latency", "turns"}
+
+
+def validate_flow(flow, source="<flow>"):
+    """
+    Check the structure of a flow and normalize its turns.
+
+    Args:
+        flow (dict): Parsed flow document
+        source (str): File name used in error messages
+
+    Returns:
+        dict: The flow with expect as a list of intents on every turn
+
+    Raises:
+        ValueError: If the flow is malformed or names an unknown intent or media type
+    """
+    if not isinstance(flow, dict) or not flow.get("name"):
+        raise ValueError(f"{source}: a flow needs a name")
+    unknown = set(flow) - _FLOW_KEYS
+    if unknown:
+        raise ValueError(f"{source}: unknown flow keys {sorted(unknown)}")
+    turns = flow.get("turns")
+    if not isinstance(turns, list) or not turns:
+        raise ValueError(f"{source}: flow '{flow['name']}' needs at least one turn")
+
+    for index, turn in enumerate(turns, 1):
+        where = f"{source}: turn {index}"
+        if not isinstance(turn, dict):
+            raise ValueError(f"{where} must be a mapping")
+        unknown = set(turn) - _TURN_KEYS
+        if unknown:
+            raise ValueError(f"{where} has unknown keys {sorted(unknown)}")
+        if ("say" in turn) == ("upload" in turn):
+            raise ValueError(f"{where} needs exactly one of 'say' or 'upload'")
+        if "upload" in turn and turn["upload"] not in MEDIA_EXTENSIONS:
+            raise ValueError(
+                f"{where} uploads '{turn['upload']}', expected one of {sorted(MEDIA_EXTENSIONS)}"
+            )
+        expect = turn.get("expect", "any")
+        expect = [expect] if isinstance(expect, str) else list(expect)
+        for intent in expect:
+            if intent != "any" and intent not in CORPUS:
+                raise ValueError(
+                    f"{where} expects unknown intent '{intent}', expected any or one of {sorted(CORPUS)}"
+                )
+        turn["expect"] = expect
+        max_latency = turn.get("max_latency", flow.get("max_latency"))
+        if max_latency is not None and (
+            not isinstance(max_latency, (int, float)) or max_latency <= 0
+        ):
+            raise ValueError(f"{where} max_latency must be a positive number of seconds")
+    return flow
+
+
+def load_flows(directory):
+    """
+    Load and validate every flow in a directory.
+
+    Args:
+        directory (str): Directory with *.yaml / *.yml flow files
+
+    Returns:
+        list: Flows sorted by file name
+
+    Raises:
+        ValueError: If a flow is invalid or two flows share a name
+    """
+    flows = []
+    paths = sorted(glob.glob(os.path.join(directory, "*.yaml")) + glob.glob(os.path.join(directory, "*.yml")))
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            flows.append(validate_flow(yaml.safe_load(f), os.path.basename(path)))
+
+    names = [flow["name"] for flow in flows]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicated flow names: {duplicates}")
+    return flows
+
+
+def flow_groups(flows):
+    """
+    Group flows by browser session.
+
+    Returns:
+        list: (session name, flows in file order); flows without a session form their own group
+    """
+    groups = {}
+    for flow in flows:
+        groups.setdefault(flow.get("session") or flow["name"], []).append(flow)
+    return list(groups.items())
+
+
+def _check_turn(turn, response, latency, max_latency):
+    """Return the failures of a turn given the bot reply and its latency."""
+    failures = []
+    intents = [i for i in turn["expect"] if i != "any"]
+    if intents and not any(
+        text.startswith(CORPUS[intent]["expected"]) for intent in intents for text in response
+    ):
+        failures.append(f"expected intent {intents}, got {response}")
+    if turn.get("expect_text") and not any(
+        text.startswith(turn["expect_text"]) for text in response
+    ):
+        failures.append(f"no reply starts with '{turn['expect_text']}'")
+    if latency > max_latency:
+        failures.append(f"latency {latency:.2f}s over {max_latency}s")
+    return failures
+
+
+def run_flow(page, flow, default_max_latency, media_dir):
+    """
+    Run the turns of a flow on an open chat.
+
+    A turn without a reply ends the flow; later turns are reported as skipped.
+
+    Args:
+        page (LaraigoPage): Page with the chat open
+        flow (dict): Validated flow
+        default_max_latency (float): Max latency of turns that do not set one
+        media_dir (str): Directory for generated attachments
+
+    Returns:
+        dict: name, passed, duration_s and per-turn input, latency_s, response and failures
+    """
+    turns = []
+    start_time = time.time()
+    for index, turn in enumerate(flow["turns"], 1):
+        max_latency = turn.get("max_latency", flow.get("max_latency", default_max_latency))
+        result = {
+            "turn": index,
+            "action": "say" if "say" in turn else "upload",
+            "input": turn.get("say") or turn.get("upload"),
+            "max_latency": max_latency,
+            "latency_s": None,
+            "response": None,
+            "failures": [],
+        }
+        turns.append(result)
+        if any(t["failures"] and t["latency_s"] is None for t in turns[:-1]):
+            result["failures"].append("skipped: a previous turn got no reply")
+            continue
+
+        try:
+            with TRACER.span("flow_turn", flow=flow["name"], turn=index):
+                if "say" in turn:
+                    turn_start = time.time()
+                    response = page.send_message(turn["say"])
+                else:
+                    file_path = media_fixture(turn["upload"], turn.get("size_kb", 10) * 1024, media_dir)
+                    page.open_attachments_menu()
+                    bot_cursor = page.message_cursor("bot")
+                    turn_start = time.time()
+                    getattr(page, f"upload_{turn['upload']}")(file_path)
+                    response = page.wait_for_new_messages(bot_cursor, "bot")
+                latency = time.time() - turn_start
+        except WebDriverException as e:
+            result["failures"].append(f"no reply: {e.msg or e}")
+            continue
+
+        result.update(latency_s=round(latency, 3), response=response)
+        result["failures"] = _check_turn(turn, response, latency, max_latency)
+
+    return {
+        "name": flow["name"],
+        "session": flow.get("session"),
+        "passed": not any(t["failures"] for t in turns),
+        "duration_s": round(time.time() - start_time, 3),
+        "turns": turns,
+    }
+
+
+def run_flow_group(url, flows, default_max_latency, media_dir):
+    """
+    Run the flows of one session group in a new browser, one after the other.
+
+    Returns:
+        list: Results of run_flow(), one per flow
+    """
+    results = []
+    driver = create_driver()
+    try:
+        page = LaraigoPage(driver, url=url)
+        page.open_chat()
+        for flow in flows:
+            # Keep the span tree of this thread bounded outside of pytest
+            TRACER.reset(flow["name"])
+            results.append(run_flow(page, flow, default_max_latency, media_dir))
+    except WebDriverException as e:
+        done = {r["name"] for r in results}
+        results.extend(
+            {
+                "name": flow["name"],
+                "session": flow.get("session"),
+                "passed": False,
+                "duration_s": 0.0,
+                "error": e.msg or str(e),
+                "turns": [],
+            }
+            for flow in flows
+            if flow["name"] not in done
+        )
+    finally:
+        driver.quit()
+    return results
+
+
+def run_flows(flows, url, workers, default_max_latency, media_dir, on_result=None):
+    """
+    Run flows in parallel, one browser per session group.
+
+    Args:
+        flows (list): Validated flows
+        url (str): Page URL of the environment
+        workers (int): Session groups run at once
+        default_max_latency (float): Max latency of turns that do not set one
+        media_dir (str): Directory for generated attachments
+        on_result (callable, optional): Called with each flow result as it finishes
+
+    Returns:
+        list: Flow results in completion order
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = {
+            executor.submit(run_flow_group, url, group, default_max_latency, media_dir)
+            for _, group in flow_groups(flows)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for result in future.result():
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+    return results
+
+
+def turn_timings(results):
+    """
+    Aggregate turn latencies by flow and turn across results (e.g. repeats).
+
+    Args:
+        results (list): Flow results
+
+    Returns:
+        dict: flow -> list of {turn, input, samples, mean_s, max_s, failures}
+    """
+    table = {}
+    for result in results:
+        for turn in result["turns"]:
+            rows = table.setdefault(result["name"], {})
+            row = rows.setdefault(
+                turn["turn"],
+                {"turn": turn["turn"], "input": turn["input"], "latencies": [], "failures": 0},
+            )
+            if turn["latency_s"] is not None:
+                row["latencies"].append(turn["latency_s"])
+            row["failures"] += bool(turn["failures"])
+
+    timings = {}
+    for name, rows in table.items():
+        timings[name] = []
+        for row in sorted(rows.values(), key=lambda r: r["turn"]):
+            latencies = row.pop("latencies")
+            row.update(
+                samples=len(latencies),
+                mean_s=round(sum(latencies) / len(latencies), 3) if latencies else None,
+                max_s=max(latencies) if latencies else None,
+            )
+            timings[name].append(row)
+    return timings
@@ -0,0 +1,249 @@
+"""
+Remote WebDriver pool for chatbot QA testing.
+Leases browser sessions from a Selenium Grid compatible endpoint, queues
+requests while the grid is saturated and reports which node served every
+session so latency can be broken down per node.
+"""
+
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from utils.driver_factory import browser_options
+
+
+def grid_status(url, timeout=5):
+    """
+    Fetch the /status document of a grid.
+
+    Args:
+        url (str): Grid URL (e.g. http://localhost:4444)
+        timeout (float): Request timeout in seconds
+
+    Returns:
+        dict: The "value" of the status response, or None if it is unavailable
+    """
+    try:
+        with urllib.request.urlopen(f"{url.rstrip('/')}/status", timeout=timeout) as response:
+            return json.load(response).get("value")
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def free_slots(status):
+    """
+    Count the idle slots of the nodes that are up.
+
+    Args:
+        status (dict): Grid status as returned by grid_status()
+
+    Returns:
+        int: Free slots, or None if the status does not list nodes
+    """
+    if not status or "nodes" not in status:
+        return None
+    return sum(
+        1
+        for node in status["nodes"]
+        if node.get("availability", "UP") == "UP"
+        for slot in node.get("slots", [])
+        if not slot.get("session")
+    )
+
+
+def node_of_session(status, session_id):
+    """Return the URI of the node running a session, or None if it is not listed."""
+    for node in (status or {}).get("nodes", []):
+        for slot in node.get("slots", []):
+            session = slot.get("session") or {}
+            if session.get("sessionId") == session_id:
+                return node.get("uri")
+    return None
+
+
+class GridPool:
+    """
+    Pool of remote sessions leased from a grid.
+
+    At most max_sessions sessions are leased at once per process; further
+    acquire() calls wait for a release. Before creating a session the pool
+    also waits until the grid reports a free slot, so other processes
+    sharing the grid are queued too instead of failing.
+    """
+
+    def __init__(
+        self,
+        url,
+        max_sessions=5,
+        queue_timeout=300.0,
+        reuse_sessions=True,
+        browser_type="chrome",
+        headless=True,
+        poll_interval=0.5,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            url (str): Grid URL
+            max_sessions (int): Sessions leased at once by this process
+            queue_timeout (float): Seconds to wait for a session before failing
+            reuse_sessions (bool): Keep released sessions for the next lease
+            browser_type (str): Browser requested from the grid
+            headless (bool): Request headless browsers
+            poll_interval (float): Initial seconds between grid status polls
+        """
+        self.url = url
+        self.max_sessions = max_sessions
+        self.queue_timeout = queue_timeout
+        self.reuse_sessions = reuse_sessions
+        self.browser_type = browser_type
+        self.headless = headless
+        self.poll_interval = poll_interval
+        self._slots = threading.BoundedSemaphore(max_sessions)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._leases = {}
+
+    def acquire(self):
+        """
+        Lease a session, waiting while the pool or the grid is saturated.
+
+        Returns:
+            WebDriver: Remote driver; lease details are available via lease_info()
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise TimeoutException(
+                f"No grid session became available within {self.queue_timeout} seconds"
+            )
+        try:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            reused = driver is not None
+            create_ms = 0.0
+            if driver is None:
+                self._wait_for_capacity(start + self.queue_timeout)
+                created = time.perf_counter()
+                driver = webdriver.Remote(
+                    command_executor=self.url,
+                    options=browser_options(self.browser_type, self.headless),
+                )
+                create_ms = (time.perf_counter() - created) * 1000
+                node = node_of_session(grid_status(self.url), driver.session_id)
+            else:
+                node = self._leases.get(driver.session_id, {}).get("node")
+            queue_ms = (time.perf_counter() - start) * 1000 - create_ms
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._leases[driver.session_id] = {
+                "node": node or self.url,
+                "queue_ms": round(queue_ms, 2),
+                "create_ms": round(create_ms, 2),
+                "reused": reused,
+            }
+        return driver
+
+    def _wait_for_capacity(self, deadline):
+        """Poll the grid status until a slot is free, backing off up to 5 seconds."""
+        interval = self.poll_interval
+        while True:
+            slots = free_slots(grid_status(self.url))
+            # Grids without slot details queue new sessions themselves
+            if slots is None or slots > 0:
+                return
+            if time.perf_counter() + interval > deadline:
+                raise TimeoutException(
+                    f"Grid at {self.url} stayed saturated for {self.queue_timeout} seconds"
+                )
+            time.sleep(interval)
+            interval = min(interval * 2, 5.0)
+
+    def lease_info(self, driver):
+        """Return node, queue_ms, create_ms and reused for a leased driver."""
+        with self._lock:
+            return dict(self._leases.get(driver.session_id, {}))
+
+    def release(self, driver):
+        """
+        Return a leased session to the pool.
+
+        Reused sessions are cleaned (storage, cookies, page) first; a session
+        that cannot be cleaned is closed instead.
+
+        Args:
+            driver (WebDriver): Driver obtained from acquire()
+        """
+        try:
+            if self.reuse_sessions:
+                try:
+                    driver.execute_script(
+                        "window.localStorage.clear(); window.sessionStorage.clear();"
+                    )
+                    driver.delete_all_cookies()
+                    driver.get("about:blank")
+                    with self._lock:
+                        self._idle.append(driver)
+                    return
+                except WebDriverException:
+                    pass
+            with self._lock:
+                self._leases.pop(driver.session_id, None)
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Quit every idle session kept for reuse."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+
+
+def grid_node_stats(records):
+    """
+    Aggregate per-test lease records by grid node.
+
+    Args:
+        records (list): Dicts with node, queue_ms, create_ms, reused and,
+            when instrumented, commands and command_ms of the test
+
+    Returns:
+        dict: node -> tests, reused, mean/max queue_ms, mean create_ms,
+            commands and mean_command_ms
+    """
+    by_node = {}
+    for record in records:
+        by_node.setdefault(record["node"], []).append(record)
+
+    stats = {}
+    for node, group in sorted(by_node.items()):
+        created = [r["create_ms"] for r in group if not r["reused"]]
+        commands = sum(r.get("commands") or 0 for r in group)
+        command_ms = sum(r.get("command_ms") or 0.0 for r in group)
+        stats[node] = {
+            "tests": len(group),
+            "reused": sum(1 for r in group if r["reused"]),
+            "queue_ms_mean": round(statistics.fmean(r["queue_ms"] for r in group), 2),
+            "queue_ms_max": round(max(r["queue_ms"] for r in group), 2),
+            "create_ms_mean": round(statistics.fmean(created), 2) if created else None,
+            "commands": commands,
+            "mean_command_ms": round(command_ms / commands, 2) if commands else None,
+        }
+    return stats
@@ -0,0 +1,391 @@
+"""
+Run history for chatbot QA testing.
+Persists per-test results of every run in a local SQLite database and
+compares new runs against a rolling baseline to detect latency regressions
+and new failures.
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime
+
+# pytest-repeat appends "-<step>-<count>" to the parameter id (or "[<step>-<count>]")
+_REPEAT_SUFFIX = re.compile(r"(\[\d+-\d+\]$)|(-\d+-\d+(?=\]$))")
+
+
+def normalize_test_id(test_id):
+    """
+    Normalize a pytest node id so repeated runs of the same case share a key.
+
+    Args:
+        test_id (str): pytest node id
+
+    Returns:
+        str: Node id without the pytest-repeat suffix
+    """
+    return _REPEAT_SUFFIX.sub("", test_id)
+
+
+def git_revision(cwd=None):
+    """Return the current git revision, or None if it cannot be determined."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def welch_t(sample, baseline):
+    """
+    Welch's t statistic of sample mean vs baseline mean.
+
+    With a single sample value it degrades to a prediction-interval test of
+    that value against the baseline distribution.
+
+    Args:
+        sample (list): Values from the current run
+        baseline (list): Values from the baseline runs (at least two)
+
+    Returns:
+        float: t statistic (positive when the sample is slower)
+    """
+    mean_s = statistics.fmean(sample)
+    mean_b = statistics.fmean(baseline)
+    var_b = statistics.variance(baseline)
+    if len(sample) > 1:
+        var_term = statistics.variance(sample) / len(sample) + var_b / len(baseline)
+    else:
+        var_term = var_b * (1 + 1 / len(baseline))
+    if var_term <= 0:
+        return math.inf if mean_s > mean_b else 0.0
+    return (mean_s - mean_b) / math.sqrt(var_term)
+
+
+class RunHistory:
+    """SQLite store of test runs and their per-test results."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT NOT NULL,
+        kind TEXT NOT NULL DEFAULT 'suite',
+        page_url TEXT,
+        git_revision TEXT,
+        exit_code INTEGER,
+        report_path TEXT
+    );
+    CREATE TABLE IF NOT EXISTS results (
+        run_id INTEGER NOT NULL REFERENCES runs(id),
+        test_id TEXT NOT NULL,
+        test_key TEXT NOT NULL,
+        status TEXT,
+        duration REAL,
+        response_time REAL,
+        latency_phases TEXT,
+        sent_message TEXT,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE INDEX IF NOT EXISTS idx_results_key ON results(test_key, run_id);
+    """
+
+    def __init__(self, db_path):
+        """
+        Open (and create if needed) the history database.
+
+        Args:
+            db_path (str): Path of the SQLite file
+        """
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(self.SCHEMA)
+        # Databases created before retries were tracked lack the attempts column
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(results)")}
+        if "attempts" not in columns:
+            with self.conn:
+                self.conn.execute(
+                    "ALTER TABLE results ADD COLUMN attempts INTEGER NOT NULL DEFAULT 1"
+                )
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    def record_run(
+        self,
+        summary,
+        page_url=None,
+        git_rev=None,
+        exit_code=None,
+        report_path=None,
+        kind="suite",
+        started_at=None,
+    ):
+        """
+        Store a run and its per-test results.
+
+        Args:
+            summary (dict): Summary JSON written by conftest (test id -> data)
+            page_url (str, optional): Environment under test
+            git_rev (str, optional): Git revision of the harness
+            exit_code (int, optional): pytest exit code
+            report_path (str, optional): HTML report of the run
+            kind (str): Type of run ("suite", "monitor", ...)
+            started_at (str, optional): ISO timestamp, defaults to now
+
+        Returns:
+            int: Id of the new run
+        """
+        started_at = started_at or datetime.now().isoformat(timespec="seconds")
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started_at, kind, page_url, git_revision, exit_code, report_path) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (started_at, kind, page_url, git_rev, exit_code, report_path),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO results (run_id, test_id, test_key, status, duration, response_time, "
+                "latency_phases, sent_message, error, attempts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        test_id,
+                        normalize_test_id(test_id),
+                        data.get("status"),
+                        data.get("duration"),
+                        data.get("response_time"),
+                        json.dumps(data.get("latency_phases"))
+                        if data.get("latency_phases")
+                        else None,
+                        data.get("sent_message"),
+                        data.get("error"),
+                        data.get("attempts") or 1,
+                    )
+                    for test_id, data in summary.items()
+                ],
+            )
+        return run_id
+
+    def latest_run_id(self, kind="suite"):
+        """Return the id of the most recent run of a kind, or None."""
+        row = self.conn.execute(
+            "SELECT MAX(id) AS id FROM runs WHERE kind = ?", (kind,)
+        ).fetchone()
+        return row["id"]
+
+    def run_count(self, kind="suite"):
+        """Return the number of stored runs of a kind."""
+        return self.conn.execute(
+            "SELECT COUNT(*) AS runs FROM runs WHERE kind = ?", (kind,)
+        ).fetchone()["runs"]
+
+    def results(self, run_id):
+        """Return the results of a run grouped by test key."""
+        grouped = {}
+        for row in self.conn.execute(
+            "SELECT * FROM results WHERE run_id = ?", (run_id,)
+        ):
+            grouped.setdefault(row["test_key"], []).append(dict(row))
+        return grouped
+
+    def baseline(self, run_id, window, kind="suite"):
+        """
+        Return results of the rolling baseline before a run, grouped by test key.
+
+        Args:
+            run_id (int): Run being evaluated (excluded from the baseline)
+            window (int): Number of previous runs in the baseline
+            kind (str): Type of runs considered
+
+        Returns:
+            dict: test key -> list of result rows
+        """
+        # Only runs against the same environment are comparable
+        run_ids = [
+            row["id"]
+            for row in self.conn.execute(
+                "SELECT id FROM runs WHERE id < ? AND kind = ? AND page_url IS "
+                "(SELECT page_url FROM runs WHERE id = ?) ORDER BY id DESC LIMIT ?",
+                (run_id, kind, run_id, window),
+            )
+        ]
+        if not run_ids:
+            return {}
+        placeholders = ",".join("?" for _ in run_ids)
+        grouped = {}
+        for row in self.conn.execute(
+            f"SELECT * FROM results WHERE run_id IN ({placeholders})", run_ids
+        ):
+            grouped.setdefault(row["test_key"], []).append(dict(row))
+        return grouped
+
+    def durations(self, window=10, kind="suite"):
+        """
+        Median duration per test key over the most recent runs.
+
+        Args:
+            window (int): Number of recent runs considered
+            kind (str): Type of runs considered (monitor runs would otherwise
+                push the suite runs out of the window)
+
+        Returns:
+            dict: test key -> median duration in seconds
+        """
+        rows = self.conn.execute(
+            "SELECT test_key, duration FROM results WHERE duration IS NOT NULL AND run_id IN "
+            "(SELECT id FROM runs WHERE kind = ? ORDER BY id DESC LIMIT ?)",
+            (kind, window),
+        )
+        values = {}
+        for row in rows:
+            values.setdefault(row["test_key"], []).append(row["duration"])
+        return {key: statistics.median(v) for key, v in values.items()}
+
+    def flake_stats(self, window=20, kind="suite"):
+        """
+        Flakiness of every test key over the most recent runs.
+
+        A flaky result is one that failed first and passed on a retry. Skipped
+        results (e.g. quarantined cases) do not count as runs.
+
+        Args:
+            window (int): Number of recent runs considered
+            kind (str): Type of runs considered
+
+        Returns:
+            dict: test key -> runs, flaky, failed, flake_rate, fail_rate,
+                mean_latency and retry_latency (mean response time of the passing retries)
+        """
+        rows = self.conn.execute(
+            "SELECT test_key, status, attempts, response_time FROM results "
+            "WHERE status IN ('passed', 'failed', 'error') AND run_id IN "
+            "(SELECT id FROM runs WHERE kind = ? ORDER BY id DESC LIMIT ?)",
+            (kind, window),
+        )
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(row["test_key"], []).append(row)
+
+        stats = {}
+        for key, results in grouped.items():
+            flaky = [r for r in results if r["status"] == "passed" and r["attempts"] > 1]
+            failed = sum(1 for r in results if r["status"] != "passed")
+            latencies = [r["response_time"] for r in results if r["response_time"] is not None]
+            retry_latencies = [r["response_time"] for r in flaky if r["response_time"] is not None]
+            stats[key] = {
+                "runs": len(results),
+                "flaky": len(flaky),
+                "failed": failed,
+                "flake_rate": round(len(flaky) / len(results), 3),
+                "fail_rate": round(failed / len(results), 3),
+                "mean_latency": round(statistics.fmean(latencies), 3) if latencies else None,
+                "retry_latency": (
+                    round(statistics.fmean(retry_latencies), 3) if retry_latencies else None
+                ),
+            }
+        return stats
+
+    def quarantined(self, window=20, min_runs=5, min_flake_rate=0.3, kind="suite"):
+        """
+        Test keys flaky often enough to be quarantined.
+
+        Args:
+            window (int): Number of recent runs considered
+            min_runs (int): Runs a test needs before it can be quarantined
+            min_flake_rate (float): Share of runs that needed a retry to pass
+            kind (str): Type of runs considered
+
+        Returns:
+            dict: test key -> flake statistics, for quarantined keys only
+        """
+        return {
+            key: stats
+            for key, stats in self.flake_stats(window, kind).items()
+            if stats["runs"] >= min_runs and stats["flake_rate"] >= min_flake_rate
+        }
+
+    def compare(
+        self,
+        run_id,
+        window=10,
+        metric="response_time",
+        t_threshold=3.0,
+        min_ratio=1.2,
+        min_samples=5,
+        kind="suite",
+    ):
+        """
+        Compare a run against the rolling baseline of previous runs.
+
+        A latency regression needs both a t statistic above the threshold and
+        a mean at least min_ratio times the baseline mean, so tiny but very
+        stable shifts are not reported. A new failure is a test that failed in
+        this run and passed in every baseline run where it appeared.
+
+        Args:
+            run_id (int): Run to evaluate
+            window (int): Number of previous runs in the baseline
+            metric (str): Result column compared ("response_time" or "duration")
+            t_threshold (float): Minimum Welch t statistic for a regression
+            min_ratio (float): Minimum current/baseline mean ratio for a regression
+            min_samples (int): Minimum baseline samples needed to evaluate latency
+            kind (str): Type of runs compared
+
+        Returns:
+            dict: "regressions" and "new_failures" lists
+        """
+        current = self.results(run_id)
+        baseline = self.baseline(run_id, window, kind)
+
+        regressions = []
+        new_failures = []
+        for key, rows in current.items():
+            previous = baseline.get(key, [])
+
+            failed_now = any(r["status"] in ("failed", "error") for r in rows)
+            if failed_now and previous and all(p["status"] == "passed" for p in previous):
+                new_failures.append(
+                    {"test": key, "error": next((r["error"] for r in rows if r["error"]), None)}
+                )
+
+            sample = [r[metric] for r in rows if r["status"] == "passed" and r[metric] is not None]
+            reference = [
+                p[metric] for p in previous if p["status"] == "passed" and p[metric] is not None
+            ]
+            if not sample or len(reference) < max(min_samples, 2):
+                continue
+
+            t_value = welch_t(sample, reference)
+            baseline_mean = statistics.fmean(reference)
+            current_mean = statistics.fmean(sample)
+            ratio = current_mean / baseline_mean if baseline_mean else math.inf
+            if t_value >= t_threshold and ratio >= min_ratio:
+                regressions.append(
+                    {
+                        "test": key,
+                        "metric": metric,
+                        "baseline_mean": round(baseline_mean, 3),
+                        "current_mean": round(current_mean, 3),
+                        "ratio": round(ratio, 2),
+                        "t": round(t_value, 2) if math.isfinite(t_value) else None,
+                        "baseline_samples": len(reference),
+                    }
+                )
+
+        return {"run_id": run_id, "regressions": regressions, "new_failures": new_failures}
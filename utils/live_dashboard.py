@@ -0,0 +1,208 @@
+"""
+Live run dashboard for chatbot QA testing.
+Aggregates test progress on the pytest controller (the xdist workers only
+ship the reports they already send) and serves it as a small local web page
+that refreshes itself while the run is in progress.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.slo import percentile
+
+_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Chatbot QA - live run</title></head>
+<body style="font-family: Helvetica, Arial, sans-serif; margin: 20px;">
+<h1>Chatbot QA - live run</h1>
+<p id="totals">Waiting for data...</p>
+<h3>Bot latency per category (rolling window)</h3>
+<table id="latency" style="border-collapse: collapse;"></table>
+<h3>In-flight sessions</h3>
+<ul id="inflight"></ul>
+<h3>Recent failures</h3>
+<ul id="failures"></ul>
+<script>
+const cell = (text) => { const td = document.createElement("td"); td.style.padding = "4px 10px"; td.textContent = text; return td; };
+async function refresh() {
+    try {
+        const data = await (await fetch("data.json", {cache: "no-store"})).json();
+        document.getElementById("totals").textContent =
+            `${data.completed} done (${data.passed} passed, ${data.failed} failed, ${data.skipped} skipped) in ` +
+            `${data.elapsed_s}s - ${data.tests_per_min} tests/min over the last minute, ${data.in_flight.length} in flight`;
+        const table = document.getElementById("latency");
+        table.replaceChildren();
+        const header = document.createElement("tr");
+        for (const name of ["Category", "n", "p50 (s)", "p95 (s)", "max (s)"]) header.appendChild(cell(name));
+        table.appendChild(header);
+        for (const [category, row] of Object.entries(data.latency)) {
+            const tr = document.createElement("tr");
+            for (const value of [category, row.samples, row.p50, row.p95, row.max]) tr.appendChild(cell(value));
+            table.appendChild(tr);
+        }
+        document.getElementById("inflight").replaceChildren(...data.in_flight.map((t) => {
+            const li = document.createElement("li"); li.textContent = `${t.test} (${t.running_s}s)`; return li;
+        }));
+        document.getElementById("failures").replaceChildren(...data.recent_failures.map((f) => {
+            const li = document.createElement("li"); li.textContent = `${f.test}: ${f.error}`; return li;
+        }));
+    } catch (e) {
+        document.getElementById("totals").textContent = "Run finished or dashboard stopped";
+    }
+}
+refresh();
+setInterval(refresh, 2000);
+</script>
+</body>
+</html>
+"""
+
+
+def category_of(test_id):
+    """Category of a test for the latency table: its test function name."""
+    return test_id.split("[")[0].split("::")[-1]
+
+
+class LiveDashboard:
+    """
+    Progress and rolling latency of a running session.
+
+    The conftest hooks call test_started() and test_finished() on the
+    controller; serve() exposes snapshot() over HTTP from a daemon thread.
+    """
+
+    def __init__(self, window=200, recent_failures=10):
+        """
+        Initialize the dashboard.
+
+        Args:
+            window (int): Latencies kept per category for the rolling percentiles
+            recent_failures (int): Failures listed on the page
+        """
+        self.window = window
+        self.started_at = time.time()
+        self.counts = {"passed": 0, "failed": 0, "skipped": 0}
+        self.in_flight = {}
+        self.latencies = {}
+        self.finished_at = deque()
+        self.failures = deque(maxlen=recent_failures)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def test_started(self, test_id):
+        """Record a test that started on any worker."""
+        with self._lock:
+            self.in_flight[test_id] = time.time()
+
+    def test_finished(self, test_id, outcome, response_time=None, error=None):
+        """
+        Record the outcome of a finished test.
+
+        Args:
+            test_id (str): pytest node id
+            outcome (str): "passed", "failed" or "skipped"
+            response_time (float, optional): Bot latency of the test in seconds
+            error (str, optional): Failure message
+        """
+        now = time.time()
+        with self._lock:
+            self.in_flight.pop(test_id, None)
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+            self.finished_at.append(now)
+            # Only the last minute is needed for the throughput
+            while self.finished_at and self.finished_at[0] < now - 60:
+                self.finished_at.popleft()
+            if response_time is not None:
+                self.latencies.setdefault(
+                    category_of(test_id), deque(maxlen=self.window)
+                ).append(response_time)
+            if outcome == "failed":
+                self.failures.appendleft({"test": test_id, "error": (error or "")[:300]})
+
+    def snapshot(self):
+        """
+        Current state of the run.
+
+        Returns:
+            dict: Totals, tests_per_min, in-flight tests, rolling latency per
+                category (p50, p95, max) and recent failures
+        """
+        now = time.time()
+        with self._lock:
+            latency = {
+                category: {
+                    "samples": len(values),
+                    "p50": round(percentile(values, 50), 3),
+                    "p95": round(percentile(values, 95), 3),
+                    "max": round(max(values), 3),
+                }
+                for category, values in sorted(self.latencies.items())
+            }
+            return {
+                "elapsed_s": round(now - self.started_at, 1),
+                "completed": sum(self.counts.values()),
+                "passed": self.counts["passed"],
+                "failed": self.counts["failed"],
+                "skipped": self.counts["skipped"],
+                "tests_per_min": sum(1 for t in self.finished_at if t >= now - 60),
+                "in_flight": [
+                    {"test": test_id, "running_s": round(now - started, 1)}
+                    for test_id, started in sorted(self.in_flight.items(), key=lambda i: i[1])
+                ],
+                "latency": latency,
+                "recent_failures": list(self.failures),
+            }
+
+    def status_line(self):
+        """One-line summary for the terminal."""
+        data = self.snapshot()
+        p95 = ", ".join(f"{c} p95={r['p95']}s" for c, r in data["latency"].items())
+        return (
+            f"[live] {data['completed']} done ({data['failed']} failed), "
+            f"{data['tests_per_min']} tests/min, {len(data['in_flight'])} in flight"
+            + (f" | {p95}" if p95 else "")
+        )
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Serve the dashboard page and its data.json from a daemon thread.
+
+        Args:
+            port (int): Local port (0 picks a free one)
+            host (str): Interface to bind
+
+        Returns:
+            str: URL of the dashboard
+        """
+        dashboard = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.startswith("/data.json"):
+                    body = json.dumps(dashboard.snapshot()).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    body = _PAGE.encode("utf-8")
+                    content_type = "text/html; charset=utf-8"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}/"
+
+    def stop(self):
+        """Stop the HTTP server if it is running."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
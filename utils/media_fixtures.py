@@ -0,0 +1,156 @@
+"""
+Generated media fixtures for attachment tests.
+Builds valid image (PNG), audio (WAV), video (uncompressed AVI) and document
+files of an approximate target size, caching them by type and size so
+repeated runs reuse the same files.
+"""
+
+import os
+import random
+import struct
+import tempfile
+import zlib
+
+MEDIA_EXTENSIONS = {"image": "png", "audio": "wav", "video": "avi", "file": "txt"}
+
+DEFAULT_MEDIA_DIR = os.path.join(tempfile.gettempdir(), "chatbot-qa-media")
+
+
+def _noise(size, seed):
+    """Deterministic incompressible bytes, so the file size is what gets uploaded."""
+    return random.Random(seed).randbytes(size)
+
+
+def _png(size):
+    """PNG with random RGB pixels stored without compression."""
+    width = 256
+    row = 1 + width * 3  # filter byte + pixels
+    height = max(1, (size - 100) // row)
+    pixels = _noise(width * 3 * height, size)
+    raw = b"".join(
+        b"\x00" + pixels[y * width * 3:(y + 1) * width * 3] for y in range(height)
+    )
+
+    def chunk(kind, data):
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(raw, 0))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _wav(size):
+    """16-bit mono 8 kHz PCM WAV filled with noise."""
+    data = _noise(max(2, (size - 44) // 2 * 2), size)
+    return (
+        b"RIFF"
+        + struct.pack("<I", 36 + len(data))
+        + b"WAVEfmt "
+        + struct.pack("<IHHIIHH", 16, 1, 1, 8000, 16000, 2, 16)
+        + b"data"
+        + struct.pack("<I", len(data))
+        + data
+    )
+
+
+def _avi(size):
+    """Uncompressed 24-bit AVI at 10 fps with noise frames (smaller frames for small files)."""
+    fps = 10
+    for width, height in ((160, 120), (64, 48), (16, 12)):
+        frame_size = width * height * 3
+        if size >= frame_size + 400:
+            break
+    frames = max(1, size // (frame_size + 24))
+    noise = _noise(frame_size * frames, size)
+
+    def chunk(kind, data):
+        padding = b"\x00" if len(data) % 2 else b""
+        return kind + struct.pack("<I", len(data)) + data + padding
+
+    def riff_list(kind, data):
+        return b"LIST" + struct.pack("<I", len(data) + 4) + kind + data
+
+    avih = struct.pack(
+        "<IIIIIIIIII4I",
+        1000000 // fps, frame_size * fps, 0, 0x10, frames, 0, 1, frame_size,
+        width, height, 0, 0, 0, 0,
+    )
+    strh = struct.pack(
+        "<4s4sIHHIIIIIIIIhhhh",
+        b"vids", b"DIB ", 0, 0, 0, 0, 1, fps, 0, frames, frame_size,
+        0xFFFFFFFF, 0, 0, 0, width, height,
+    )
+    strf = struct.pack(
+        "<IiiHHIIiiII", 40, width, height, 1, 24, 0, frame_size, 0, 0, 0, 0
+    )
+    header = riff_list(
+        b"hdrl",
+        chunk(b"avih", avih) + riff_list(b"strl", chunk(b"strh", strh) + chunk(b"strf", strf)),
+    )
+
+    movi = b""
+    index = b""
+    for i in range(frames):
+        index += struct.pack("<4sIII", b"00db", 0x10, 4 + len(movi), frame_size)
+        movi += chunk(b"00db", noise[i * frame_size:(i + 1) * frame_size])
+    body = b"AVI " + header + riff_list(b"movi", movi) + chunk(b"idx1", index)
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _text(size):
+    """Plain-text document of printable characters."""
+    alphabet = "abcdefghijklmnopqrstuvwxyz0123456789 "
+    rng = random.Random(size)
+    lines = []
+    written = 0
+    while written < size:
+        line = "".join(rng.choice(alphabet) for _ in range(79)) + "\n"
+        lines.append(line)
+        written += len(line)
+    return "".join(lines)[:size].encode("ascii")
+
+
+_BUILDERS = {"image": _png, "audio": _wav, "video": _avi, "file": _text}
+
+
+def media_fixture(media_type, size_bytes, directory=DEFAULT_MEDIA_DIR):
+    """
+    Return the path of a generated media file, creating it if needed.
+
+    Files are cached by type and target size; the content is deterministic,
+    so a cached file is identical to a freshly generated one.
+
+    Args:
+        media_type (str): "image", "audio", "video" or "file"
+        size_bytes (int): Approximate size of the file
+        directory (str): Cache directory
+
+    Returns:
+        str: Absolute path of the file
+    """
+    if media_type not in _BUILDERS:
+        raise ValueError(
+            f"Unknown media type '{media_type}', expected one of {sorted(_BUILDERS)}"
+        )
+    if not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    path = os.path.abspath(
+        os.path.join(directory, f"{media_type}_{size_bytes}.{MEDIA_EXTENSIONS[media_type]}")
+    )
+    if not os.path.exists(path):
+        # Write to a temporary name first so parallel workers never read a partial file
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "wb") as f:
+            f.write(_BUILDERS[media_type](size_bytes))
+        os.replace(partial, path)
+    return path
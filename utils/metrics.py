@@ -0,0 +1,266 @@
+"""
+Metrics export for chatbot QA testing.
+Keeps counters, gauges and fixed-bucket histograms of the run (reply latency
+per query, test outcomes, browser startup and page load times) and exposes
+them in OpenMetrics text format, as a file for the node-exporter textfile
+collector or from a local scrape endpoint.
+"""
+
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.history import normalize_test_id
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    """Escape a label value."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, extra=()):
+    """Render a label set (sorted by name) followed by extra pairs."""
+    pairs = sorted(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    """Render a sample value."""
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe metric families with a bounded number of series.
+
+    Memory grows only with the distinct label sets (tests, cases, browsers),
+    never with the number of observations.
+    """
+
+    def __init__(self, prefix="chatbot_qa"):
+        """
+        Initialize the registry.
+
+        Args:
+            prefix (str): Prefix of every metric name
+        """
+        self.prefix = prefix
+        self.families = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _declare(self, kind, name, help_text, buckets=None):
+        self.families[name] = {
+            "kind": kind,
+            "help": help_text,
+            "buckets": tuple(sorted(buckets)) if buckets else None,
+            "series": {},
+        }
+
+    def counter(self, name, help_text):
+        """Declare a counter (exposed as <prefix>_<name>_total)."""
+        self._declare("counter", name, help_text)
+
+    def gauge(self, name, help_text):
+        """Declare a gauge."""
+        self._declare("gauge", name, help_text)
+
+    def histogram(self, name, help_text, buckets):
+        """Declare a histogram with the given upper bounds (seconds)."""
+        self._declare("histogram", name, help_text, buckets)
+
+    def _series(self, name, labels, initial):
+        key = tuple(sorted((labels or {}).items()))
+        series = self.families[name]["series"]
+        if key not in series:
+            series[key] = initial()
+        return key, series
+
+    def inc(self, name, labels=None, value=1):
+        """Increase a counter."""
+        with self._lock:
+            key, series = self._series(name, labels, lambda: 0)
+            series[key] += value
+
+    def set(self, name, labels=None, value=0):
+        """Set a gauge."""
+        with self._lock:
+            key, series = self._series(name, labels, lambda: 0)
+            series[key] = value
+
+    def observe(self, name, labels=None, value=0.0):
+        """Add an observation to a histogram."""
+        family = self.families[name]
+        with self._lock:
+            key, series = self._series(
+                name,
+                labels,
+                lambda: {"buckets": [0] * len(family["buckets"]), "count": 0, "sum": 0.0},
+            )
+            histogram = series[key]
+            for index, bound in enumerate(family["buckets"]):
+                if value <= bound:
+                    histogram["buckets"][index] += 1
+            histogram["count"] += 1
+            histogram["sum"] += value
+
+    def render(self, openmetrics=True):
+        """
+        Render every family.
+
+        Args:
+            openmetrics (bool): OpenMetrics 1.0 text (counter families without the
+                _total suffix, final # EOF) or Prometheus text 0.0.4, the format
+                the node-exporter textfile collector parses
+
+        Returns:
+            str: Exposition text
+        """
+        lines = []
+        with self._lock:
+            for name, family in self.families.items():
+                metric = f"{self.prefix}_{name}"
+                kind = family["kind"]
+                declared = metric if openmetrics or kind != "counter" else f"{metric}_total"
+                lines.append(f"# HELP {declared} {family['help']}")
+                lines.append(f"# TYPE {declared} {kind}")
+                for key, value in sorted(family["series"].items()):
+                    if kind == "counter":
+                        lines.append(f"{metric}_total{_labels(key)} {_number(value)}")
+                    elif kind == "gauge":
+                        lines.append(f"{metric}{_labels(key)} {_number(value)}")
+                    else:
+                        bounds = family["buckets"] + (math.inf,)
+                        counts = value["buckets"] + [value["count"]]
+                        for bound, count in zip(bounds, counts):
+                            lines.append(
+                                f"{metric}_bucket{_labels(key, [('le', _number(float(bound)))])} {count}"
+                            )
+                        lines.append(f"{metric}_count{_labels(key)} {value['count']}")
+                        lines.append(f"{metric}_sum{_labels(key)} {_number(round(value['sum'], 6))}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """
+        Write the metrics atomically for the node-exporter textfile collector.
+
+        Args:
+            path (str): Target .prom file (its directory is created if needed)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render(openmetrics=False))
+        # The collector must never read a half-written file
+        os.replace(temp_path, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Serve the metrics on /metrics from a daemon thread.
+
+        Args:
+            port (int): Local port (0 picks a free one)
+            host (str): Interface to bind
+
+        Returns:
+            str: URL of the endpoint
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = registry.render(openmetrics=openmetrics).encode("utf-8")
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self._server.server_address[1]}/metrics"
+
+    def stop(self):
+        """Stop the scrape endpoint if it is running."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def create_registry(latency_buckets, startup_buckets, prefix="chatbot_qa"):
+    """
+    Create a registry with the metric families of the harness.
+
+    Args:
+        latency_buckets (tuple): Histogram bounds of bot reply latency (seconds)
+        startup_buckets (tuple): Histogram bounds of browser startup and page load (seconds)
+        prefix (str): Prefix of every metric name
+
+    Returns:
+        MetricsRegistry: Registry with reply_latency_seconds, tests, browser_startup_seconds,
+            page_load_seconds and last_result_timestamp_seconds
+    """
+    registry = MetricsRegistry(prefix)
+    registry.histogram(
+        "reply_latency_seconds", "Bot reply latency per test case", latency_buckets
+    )
+    registry.counter("tests", "Finished tests by outcome")
+    registry.histogram(
+        "browser_startup_seconds", "Time to start or lease a browser session", startup_buckets
+    )
+    registry.histogram(
+        "page_load_seconds", "Time to load the chat page and open the widget", startup_buckets
+    )
+    registry.gauge(
+        "last_result_timestamp_seconds", "Unix time of the last finished test"
+    )
+    return registry
+
+
+def observe_test(registry, test_id, data, outcome, browser):
+    """
+    Record a finished test in a registry created by create_registry().
+
+    Args:
+        registry (MetricsRegistry): Registry of the run
+        test_id (str): pytest node id (repeat suffixes are folded into the case)
+        data (dict): Test data of the test (response_time, browser_startup_s, latency_phases)
+        outcome (str): "passed", "failed" or "skipped"
+        browser (str): Browser label of the startup time
+    """
+    node_id = normalize_test_id(test_id)
+    test = node_id.split("[")[0].split("::")[-1]
+    case = node_id[node_id.index("[") + 1:-1] if "[" in node_id else ""
+
+    registry.inc("tests", {"test": test, "outcome": outcome})
+    registry.set("last_result_timestamp_seconds", None, round(time.time(), 3))
+    if data.get("response_time") is not None:
+        registry.observe(
+            "reply_latency_seconds", {"test": test, "case": case}, data["response_time"]
+        )
+    if data.get("browser_startup_s") is not None:
+        registry.observe("browser_startup_seconds", {"browser": browser}, data["browser_startup_s"])
+    page_load_ms = (data.get("latency_phases") or {}).get("LaraigoPage.page_load")
+    if page_load_ms is not None:
+        registry.observe("page_load_seconds", None, page_load_ms / 1000)
@@ -0,0 +1,359 @@
+"""
+Synthetic monitoring for chatbot QA testing.
+Keeps warm browsers with the chat open across intervals and sends a sample
+of the corpus on each of them, so a health probe costs a few messages
+instead of driver installs, browser launches and a full suite run.
+
+Memory stays bounded over days of uptime: sessions are recycled after a
+number of messages, alert windows are fixed-size deques and the metrics
+only grow with the corpus queries.
+"""
+
+import json
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from pages.laraigo_page import LaraigoPage
+from utils.corpus import CORPUS
+from utils.driver_factory import create_driver
+from utils.sampling import stratified_sample
+from utils.slo import percentile
+from utils.tracing import TRACER
+
+
+def monitor_key(category, query):
+    """Test id of a monitored query in the history and metrics."""
+    return f"monitor::{category}[{query}]"
+
+
+def sample_corpus(budget, cycle=0, rotation_cycles=4, stats=None, failure_weight=4.0, slow_weight=2.0):
+    """
+    Pick the corpus queries of one monitor interval.
+
+    The sample is stratified by category and weighted toward the queries
+    that failed or were slow in recent monitor runs (see stratified_sample()).
+
+    Args:
+        budget (int): Queries to send
+        cycle (int): Number of the interval
+        rotation_cycles (int): Every query is sent at least once every this many intervals
+        stats (dict, optional): monitor key -> fail_rate and mean_latency
+        failure_weight (float): Extra weight of an always-failing query
+        slow_weight (float): Extra weight per multiple of the category median latency
+
+    Returns:
+        list: (category, query) tuples
+    """
+    cases = {
+        monitor_key(category, query): (category, query)
+        for category, data in CORPUS.items()
+        for query in data["queries"]
+    }
+    selected = stratified_sample(
+        {key: category for key, (category, _) in cases.items()},
+        budget,
+        cycle,
+        rotation_cycles,
+        stats,
+        failure_weight,
+        slow_weight,
+    )
+    return [cases[key] for key in selected]
+
+
+def _failed(category, query, error, status="failed"):
+    """Result of a query without a reply ("skipped" when it was never sent)."""
+    return {
+        "category": category,
+        "query": query,
+        "status": status,
+        "response_time": None,
+        "response": None,
+        "error": error,
+    }
+
+
+class MonitorSession:
+    """A warm browser with the chat open, recycled after max_messages."""
+
+    def __init__(self, url, max_messages):
+        self.url = url
+        self.max_messages = max_messages
+        self.driver = None
+        self.page = None
+        self.messages = 0
+        self.broken = False
+        self.startup_s = None
+        self.page_load_s = None
+
+    def ensure(self):
+        """
+        Start the browser, or restart it when broken or used up.
+
+        Returns:
+            bool: True if a new browser was started
+        """
+        if self.driver is not None and not self.broken and self.messages < self.max_messages:
+            return False
+        self.close()
+        start_time = time.perf_counter()
+        driver = create_driver()
+        self.startup_s = round(time.perf_counter() - start_time, 3)
+        try:
+            page = LaraigoPage(driver, url=self.url)
+            page.open_chat()
+        except WebDriverException:
+            driver.quit()
+            raise
+        self.page_load_s = round(time.perf_counter() - start_time - self.startup_s, 3)
+        self.driver, self.page = driver, page
+        self.messages = 0
+        self.broken = False
+        return True
+
+    def send(self, category, query):
+        """
+        Send one query in a fresh conversation and check the reply prefix.
+
+        Returns:
+            dict: category, query, status, response_time, response and error
+        """
+        result = _failed(category, query, None)
+        # Keep the span tree of this thread bounded outside of pytest
+        TRACER.reset(query)
+        try:
+            self.page.reset_conversation()
+            # Spans and breakdowns of the previous query are not needed anymore
+            self.page.latency_breakdowns.clear()
+            start_time = time.time()
+            response = self.page.send_message(query)
+            result["response_time"] = round(time.time() - start_time, 3)
+        except TimeoutException as e:
+            # A slow reply fails the query, the browser itself is still usable
+            result["error"] = e.msg or str(e)
+            return result
+        except WebDriverException as e:
+            self.broken = True
+            result["error"] = e.msg or str(e)
+            return result
+        finally:
+            self.messages += 1
+
+        result["response"] = "\n".join(response)
+        expected = CORPUS[category]["expected"]
+        if any(text.startswith(expected) for text in response):
+            result["status"] = "passed"
+        else:
+            result["error"] = f"expected a reply starting with '{expected}', got {response}"
+        return result
+
+    def close(self):
+        """Quit the browser if it is running."""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+        self.driver = self.page = None
+
+
+class AlertEvaluator:
+    """
+    Threshold alerts over a rolling window of results per category.
+
+    An alert fires once when a threshold is breached and resolves once
+    when it is back within bounds.
+    """
+
+    def __init__(self, max_p95, max_failure_rate, window, min_samples):
+        """
+        Initialize the evaluator.
+
+        Args:
+            max_p95 (float): Highest acceptable p95 reply latency (seconds)
+            max_failure_rate (float): Highest acceptable share of failed queries
+            window (int): Latest results per category considered
+            min_samples (int): Results needed before a category is judged
+        """
+        self.max_p95 = max_p95
+        self.max_failure_rate = max_failure_rate
+        self.window = window
+        self.min_samples = min_samples
+        self.results = {}
+        self.active = {}
+
+    def add(self, result):
+        """Add a query result to the window of its category."""
+        self.results.setdefault(result["category"], deque(maxlen=self.window)).append(
+            (result["response_time"], result["status"] == "passed")
+        )
+
+    def evaluate(self):
+        """
+        Check every category against the thresholds.
+
+        Returns:
+            list: Alert transitions (category, alert, value, threshold and
+                state "firing" or "resolved")
+        """
+        transitions = []
+        for category, window in sorted(self.results.items()):
+            if len(window) < self.min_samples:
+                continue
+            latencies = [latency for latency, _ in window if latency is not None]
+            values = {
+                "failure_rate": (
+                    round(sum(not passed for _, passed in window) / len(window), 3),
+                    self.max_failure_rate,
+                ),
+                "latency_p95": (
+                    round(percentile(latencies, 95), 3) if latencies else None,
+                    self.max_p95,
+                ),
+            }
+            for alert, (value, threshold) in values.items():
+                breached = value is not None and value > threshold
+                key = (category, alert)
+                was_firing = key in self.active
+                if breached:
+                    self.active[key] = value
+                else:
+                    self.active.pop(key, None)
+                if breached == was_firing:
+                    continue
+                transitions.append(
+                    {
+                        "category": category,
+                        "alert": alert,
+                        "value": value,
+                        "threshold": threshold,
+                        "state": "firing" if breached else "resolved",
+                    }
+                )
+        return transitions
+
+
+def post_alert(webhook_url, alert, timeout=10):
+    """
+    Post an alert transition as JSON to a webhook.
+
+    Raises:
+        OSError: If the webhook cannot be reached
+    """
+    request = urllib.request.Request(
+        webhook_url,
+        data=json.dumps(alert).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=timeout):
+        pass
+
+
+class SyntheticMonitor:
+    """
+    Warm sessions that answer a corpus sample on every interval.
+
+    Each interval is split across the sessions, which run in parallel.
+    """
+
+    def __init__(self, url, sessions, session_max_messages):
+        """
+        Initialize the monitor.
+
+        Args:
+            url (str): Page URL of the environment
+            sessions (int): Warm browsers kept open
+            session_max_messages (int): Messages before a browser is recycled
+        """
+        self.sessions = [
+            MonitorSession(url, session_max_messages) for _ in range(max(1, sessions))
+        ]
+        self.executor = ThreadPoolExecutor(max_workers=len(self.sessions))
+
+    def _run_session(self, session, messages):
+        """
+        Send a slice of the sample on one session.
+
+        A query that breaks the session is retried once on a recycled
+        browser. When no browser can be started, the queries left are
+        returned as "skipped".
+
+        Returns:
+            tuple: (startup_s and page_load_s of every browser started, query results)
+        """
+        startups, results = [], []
+        for index, (category, query) in enumerate(messages):
+            for _ in range(2):
+                try:
+                    if session.ensure():
+                        startups.append((session.startup_s, session.page_load_s))
+                except WebDriverException as e:
+                    error = f"session unavailable: {e.msg or e}"
+                    results.extend(
+                        _failed(c, q, error, status="skipped") for c, q in messages[index:]
+                    )
+                    return startups, results
+                result = session.send(category, query)
+                if not session.broken:
+                    break
+            results.append(result)
+        return startups, results
+
+    def run_interval(self, messages):
+        """
+        Send one corpus sample across the warm sessions.
+
+        Args:
+            messages (list): (category, query) tuples, e.g. from sample_corpus()
+
+        Returns:
+            tuple: (query results, (startup_s, page_load_s) of every browser started
+                in this interval)
+        """
+        slices = [messages[i :: len(self.sessions)] for i in range(len(self.sessions))]
+        futures = [
+            self.executor.submit(self._run_session, session, chunk)
+            for session, chunk in zip(self.sessions, slices)
+            if chunk
+        ]
+        results, startups = [], []
+        for future in futures:
+            session_startups, session_results = future.result()
+            results.extend(session_results)
+            startups.extend(session_startups)
+        return results, startups
+
+    def warm_sessions(self):
+        """Number of browsers currently open and usable."""
+        return sum(1 for s in self.sessions if s.driver is not None and not s.broken)
+
+    def close(self):
+        """Quit every browser and stop the worker threads."""
+        self.executor.shutdown(wait=True)
+        for session in self.sessions:
+            session.close()
+
+
+def monitor_summary(results):
+    """
+    Convert the results of an interval to the summary format stored in the history.
+
+    Returns:
+        dict: test id (monitor::<category>[<query>]) -> test data
+    """
+    return {
+        monitor_key(r["category"], r["query"]): {
+            "status": r["status"],
+            "duration": r["response_time"],
+            "response_time": r["response_time"],
+            "sent_message": r["query"],
+            "response_text": r["response"],
+            "error": r["error"],
+        }
+        for r in results
+    }
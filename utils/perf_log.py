@@ -0,0 +1,241 @@
+"""
+Performance-log latency attribution for chatbot QA testing.
+Reads the DevTools network events that Chromium drivers expose through the
+"performance" log type and splits the latency of each sent message into
+network, server and render components.
+
+Event times come from the DevTools event parameters (the browser's monotonic
+clock), not from the log entry times, which the driver stamps when it pulls the
+events and which run on the driver's machine. The wallTime of requests anchors
+the monotonic clock to the browser's epoch clock, the one Date.now() of the page
+uses for the reply time, so both sides of the split share a clock, also for
+remote grid sessions.
+"""
+
+import json
+import statistics
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+_OUTBOUND = ("Network.webSocketFrameSent", "Network.requestWillBeSent")
+_INBOUND = (
+    "Network.webSocketFrameReceived",
+    "Network.responseReceived",
+    "Network.loadingFinished",
+)
+
+
+class DevToolsClock:
+    """
+    Maps DevTools monotonic timestamps (seconds) to browser epoch milliseconds.
+
+    The anchor is the latest event carrying both timestamp and wallTime
+    (requestWillBeSent, webSocketWillSendHandshakeRequest). It is kept across
+    reads because the log is drained before every message, so the anchor
+    often comes from an earlier read (e.g. the page load).
+    """
+
+    def __init__(self):
+        self.offset_ms = None
+
+    def update(self, params):
+        """Re-anchor the clock from an event that carries wallTime."""
+        if params.get("wallTime") is not None and params.get("timestamp") is not None:
+            self.offset_ms = (params["wallTime"] - params["timestamp"]) * 1000
+
+    def epoch_ms(self, timestamp):
+        """Browser epoch milliseconds of a monotonic timestamp, or None without an anchor."""
+        if self.offset_ms is None or timestamp is None:
+            return None
+        return timestamp * 1000 + self.offset_ms
+
+
+def read_performance_log(driver, clock=None):
+    """
+    Read (and drain) the DevTools events buffered in the performance log.
+
+    Args:
+        driver (WebDriver): Chromium driver started with the performance loggingPrefs
+        clock (DevToolsClock, optional): Clock kept across reads; a new one is
+            used (and anchored only by this read) when omitted
+
+    Returns:
+        list: Events with method, params and timestamp (browser epoch ms; empty
+            while the clock has no anchor), or None if the driver does not
+            provide a performance log
+    """
+    try:
+        # execute() also covers remote drivers, which have no get_log()
+        entries = driver.execute(Command.GET_LOG, {"type": "performance"})["value"]
+    except WebDriverException:
+        return None
+
+    clock = clock or DevToolsClock()
+    messages = []
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        messages.append(message)
+        clock.update(message.get("params", {}))
+
+    events = []
+    for message in messages:
+        params = message.get("params", {})
+        # Converted after reading every entry, so events logged before the anchor convert too
+        timestamp = clock.epoch_ms(params.get("timestamp"))
+        if timestamp is None:
+            continue
+        if message.get("method") in _OUTBOUND or message.get("method") in _INBOUND:
+            events.append({"method": message["method"], "params": params, "timestamp": timestamp})
+    return sorted(events, key=lambda e: e["timestamp"])
+
+
+def _carries(event, text):
+    """Check if an outbound event carries the text (raw or JSON-escaped)."""
+    params = event["params"]
+    if event["method"] == "Network.webSocketFrameSent":
+        payload = params.get("response", {}).get("payloadData") or ""
+    else:
+        payload = params.get("request", {}).get("postData") or ""
+    return any(
+        variant in payload
+        for variant in (text, json.dumps(text)[1:-1], json.dumps(text, ensure_ascii=False)[1:-1])
+    )
+
+
+def _endpoint(event):
+    """(host, path) of the request of a requestWillBeSent event."""
+    url = urlsplit(event["params"].get("request", {}).get("url", ""))
+    return url.netloc, url.path
+
+
+def _http_carriers(events, outbound, reply_at):
+    """
+    Requests that may carry the reply to an HTTP outbound request.
+
+    Besides the outbound request itself, only XHR/fetch requests sent after
+    it to the same host are considered (e.g. long polling). Requests to the
+    same endpoint are preferred; replies from several other endpoints of the
+    host (e.g. polling plus analytics) are ambiguous.
+
+    Returns:
+        set: Request ids, or None if the reply cannot be told apart
+    """
+    connection = outbound["params"].get("requestId")
+    host, path = _endpoint(outbound)
+    later = {
+        e["params"].get("requestId"): _endpoint(e)
+        for e in events
+        if e["method"] == "Network.requestWillBeSent"
+        and e["params"].get("type") in ("XHR", "Fetch")
+        and e["timestamp"] >= outbound["timestamp"]
+        and e["params"].get("requestId") != connection
+        and _endpoint(e)[0] == host
+    }
+    responded = {
+        later[e["params"].get("requestId")]
+        for e in events
+        if e["method"] in _INBOUND
+        and e["params"].get("requestId") in later
+        and (reply_at is None or e["timestamp"] <= reply_at)
+    }
+    if (host, path) in responded:
+        return {connection} | {rid for rid, endpoint in later.items() if endpoint == (host, path)}
+    if len(responded) > 1:
+        return None
+    return {connection} | set(later)
+
+
+def attribute_latency(events, message, reply_at):
+    """
+    Split the latency of one message into network, server and render time.
+
+    The outbound event is the first WebSocket frame or HTTP request whose
+    payload contains the message. The reply event is the last frame on that
+    socket (or response to the request itself or to a later XHR/fetch to the
+    same host, see _http_carriers()) received before the reply node appeared
+    in the DOM. The first inbound event on the same connection before the
+    reply (the backend acknowledgement) estimates the network round trip;
+    the rest of the outbound-to-reply gap is attributed to the server.
+
+    Args:
+        events (list): Events as returned by read_performance_log()
+        message (str): Text sent by the test
+        reply_at (float): Browser epoch ms (Date.now()) when the first reply node
+            was added to the DOM
+
+    Returns:
+        dict: transport, network_ms (None without an acknowledgement), server_ms,
+            render_ms and total_ms, or None if no outbound event carried the message
+            or the reply event is ambiguous
+    """
+    outbound = next(
+        (e for e in events if e["method"] in _OUTBOUND and _carries(e, message)), None
+    )
+    if outbound is None:
+        return None
+    connection = outbound["params"].get("requestId")
+    websocket = outbound["method"] == "Network.webSocketFrameSent"
+    # Replies come over the same socket, or over XHR/fetch requests (long polling)
+    carriers = {connection} if websocket else _http_carriers(events, outbound, reply_at)
+    if carriers is None:
+        return None
+    inbound = [
+        e
+        for e in events
+        if e["method"] in _INBOUND
+        and e["params"].get("requestId") in carriers
+        and e["timestamp"] >= outbound["timestamp"]
+        and (reply_at is None or e["timestamp"] <= reply_at)
+    ]
+    if not inbound:
+        return None
+
+    reply = inbound[-1]
+    ack = next(
+        (
+            e
+            for e in inbound
+            if e is not reply
+            and e["params"].get("requestId") == connection
+            and e["timestamp"] < reply["timestamp"]
+        ),
+        None,
+    )
+    network_ms = ack["timestamp"] - outbound["timestamp"] if ack else None
+    return {
+        "transport": "websocket" if websocket else "http",
+        "network_ms": round(network_ms, 1) if network_ms is not None else None,
+        "server_ms": round(reply["timestamp"] - outbound["timestamp"] - (network_ms or 0), 1),
+        "render_ms": round(reply_at - reply["timestamp"], 1) if reply_at is not None else None,
+        "total_ms": (
+            round(reply_at - outbound["timestamp"], 1) if reply_at is not None else None
+        ),
+    }
+
+
+def summarize_breakdowns(breakdowns):
+    """
+    Aggregate latency breakdowns of a run.
+
+    Args:
+        breakdowns (list): Dicts returned by attribute_latency()
+
+    Returns:
+        dict: messages plus mean/max per component, or None if there is nothing to aggregate
+    """
+    if not breakdowns:
+        return None
+    summary = {"messages": len(breakdowns)}
+    for component in ("network_ms", "server_ms", "render_ms", "total_ms"):
+        values = [b[component] for b in breakdowns if b.get(component) is not None]
+        summary[component] = (
+            {"mean": round(statistics.fmean(values), 1), "max": max(values)}
+            if values
+            else None
+        )
+    return summary
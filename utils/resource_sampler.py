@@ -0,0 +1,200 @@
+"""
+Browser resource sampler for chatbot QA testing.
+Tracks CPU, memory, threads and open file descriptors of the WebDriver
+process tree (driver service plus the browser processes it spawned).
+"""
+
+import threading
+import time
+
+import psutil
+
+
+class BrowserResourceSampler:
+    """
+    Background sampler for the process tree behind a WebDriver session.
+    Samples are taken at a fixed interval and summarized into peak/mean values.
+    """
+
+    def __init__(self, driver, interval=0.5):
+        """
+        Initialize the sampler.
+
+        Args:
+            driver (WebDriver): Driver whose service process tree will be sampled
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self.samples = []
+        self._root = self._find_root_process(driver)
+        self._processes = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _find_root_process(driver):
+        """Return the psutil process of the driver service, or None if it is not local."""
+        service = getattr(driver, "service", None)
+        process = getattr(service, "process", None)
+        pid = getattr(process, "pid", None)
+        if pid is None:
+            return None
+        try:
+            return psutil.Process(pid)
+        except psutil.Error:
+            return None
+
+    def _tree(self):
+        """Return the current process tree, reusing psutil handles so CPU % is accurate."""
+        try:
+            current = [self._root] + self._root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+        tree = []
+        for proc in current:
+            known = self._processes.get(proc.pid)
+            if known is None:
+                # The first cpu_percent() call always returns 0.0; prime it here
+                try:
+                    proc.cpu_percent(None)
+                except psutil.Error:
+                    continue
+                self._processes[proc.pid] = proc
+                known = proc
+            tree.append(known)
+        return tree
+
+    def sample(self):
+        """
+        Take a single sample of the process tree.
+
+        Returns:
+            dict: Aggregated cpu_percent, rss_mb, threads and open_fds, or None
+        """
+        if self._root is None:
+            return None
+
+        cpu = 0.0
+        rss = 0
+        threads = 0
+        fds = 0
+        for proc in self._tree():
+            try:
+                with proc.oneshot():
+                    cpu += proc.cpu_percent(None)
+                    rss += proc.memory_info().rss
+                    threads += proc.num_threads()
+                    if hasattr(proc, "num_fds"):
+                        fds += proc.num_fds()
+                    else:
+                        fds += proc.num_handles()
+            except psutil.Error:
+                # Processes come and go (renderers, GPU helper); skip the ones that vanished
+                continue
+
+        data = {
+            "time": time.time(),
+            "cpu_percent": cpu,
+            "rss_mb": rss / (1024 * 1024),
+            "threads": threads,
+            "open_fds": fds,
+        }
+        self.samples.append(data)
+        return data
+
+    def _run(self):
+        """Sampling loop executed in the background thread."""
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        """Start sampling in a daemon thread."""
+        if self._root is None or self._thread is not None:
+            return self
+        self.sample()
+        self._thread = threading.Thread(
+            target=self._run, name="browser-resource-sampler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop sampling and return the summary.
+
+        Returns:
+            dict: Summary as returned by summary()
+        """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+            self.sample()
+        return self.summary()
+
+    def summary(self):
+        """
+        Summarize the collected samples.
+
+        Returns:
+            dict: Peak and mean value for every metric, or None if nothing was sampled
+        """
+        if not self.samples:
+            return None
+
+        summary = {"samples": len(self.samples)}
+        for metric in ("cpu_percent", "rss_mb", "threads", "open_fds"):
+            values = [s[metric] for s in self.samples]
+            summary[f"{metric}_peak"] = round(max(values), 2)
+            summary[f"{metric}_mean"] = round(sum(values) / len(values), 2)
+        return summary
+
+
+def detect_memory_growth(rss_series, min_points=3, threshold_mb=5.0):
+    """
+    Check whether a series of per-test peak RSS values keeps growing.
+
+    A least-squares slope is fitted over the series; growth is reported when the
+    slope exceeds the threshold and most consecutive steps are increases.
+
+    Args:
+        rss_series (list): Peak RSS in MB per test, in execution order
+        min_points (int): Minimum number of tests needed to decide
+        threshold_mb (float): Minimum slope in MB per test to flag growth
+
+    Returns:
+        dict: slope_mb_per_test and growing flag, or None if there is not enough data
+    """
+    if len(rss_series) < min_points:
+        return None
+
+    slope, _ = linear_fit(range(len(rss_series)), rss_series)
+    n = len(rss_series)
+
+    increases = sum(1 for a, b in zip(rss_series, rss_series[1:]) if b > a)
+    growing = slope > threshold_mb and increases >= (n - 1) * 0.75
+
+    return {"slope_mb_per_test": round(slope, 2), "growing": growing}
+
+
+def linear_fit(xs, ys):
+    """
+    Least-squares line through a series of points.
+
+    Args:
+        xs (iterable): X values
+        ys (iterable): Y values (same length as xs)
+
+    Returns:
+        tuple: (slope, intercept); slope is 0.0 when all x values are equal
+    """
+    xs = list(xs)
+    ys = list(ys)
+    n = len(xs)
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    num = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    den = sum((x - mean_x) ** 2 for x in xs)
+    slope = num / den if den else 0.0
+    return slope, mean_y - slope * mean_x
@@ -0,0 +1,137 @@
+"""
+Response interning for chatbot QA reports.
+Canned bot replies repeat across dozens of tests; the report keeps a single
+copy of every distinct reply, referenced by its fingerprint, and groups the
+tests by reply with counts and latency statistics.
+"""
+
+import hashlib
+import html
+import statistics
+
+from utils.slo import percentile
+
+
+def normalize_response(response):
+    """Return a reply (text or list of bubble texts) as one string."""
+    if isinstance(response, (list, tuple)):
+        return "\n".join(str(text) for text in response)
+    return str(response)
+
+
+def response_fingerprint(response):
+    """Short, stable fingerprint of a reply."""
+    return hashlib.sha1(normalize_response(response).encode("utf-8")).hexdigest()[:12]
+
+
+class ResponseInterner:
+    """One copy of every distinct reply, keyed by fingerprint."""
+
+    def __init__(self):
+        self.texts = {}
+
+    def intern(self, response):
+        """
+        Store a reply once.
+
+        Args:
+            response (str or list): Reply text or bubble texts
+
+        Returns:
+            tuple: (fingerprint, True if the reply was not seen before)
+        """
+        fingerprint = response_fingerprint(response)
+        if fingerprint in self.texts:
+            return fingerprint, False
+        self.texts[fingerprint] = normalize_response(response)
+        return fingerprint, True
+
+    def update(self, texts):
+        """Add replies interned by another process (fingerprint -> text)."""
+        for fingerprint, text in texts.items():
+            self.texts.setdefault(fingerprint, text)
+
+
+def group_by_response(summary, texts):
+    """
+    Group tests by reply fingerprint.
+
+    Args:
+        summary (dict): test id -> data with response_id, status and response_time
+        texts (dict): fingerprint -> reply text
+
+    Returns:
+        list: Groups (fingerprint, text, tests, passed, failed, sent_messages,
+            latency mean/p50/p95/max and test ids), largest first
+    """
+    groups = {}
+    for test_id, data in summary.items():
+        fingerprint = data.get("response_id")
+        if fingerprint is None:
+            continue
+        group = groups.setdefault(
+            fingerprint,
+            {"test_ids": [], "statuses": [], "latencies": [], "sent_messages": set()},
+        )
+        group["test_ids"].append(test_id)
+        group["statuses"].append(data.get("status"))
+        if data.get("response_time") is not None:
+            group["latencies"].append(data["response_time"])
+        if data.get("sent_message"):
+            group["sent_messages"].add(str(data["sent_message"]))
+
+    result = []
+    for fingerprint, group in groups.items():
+        latencies = group["latencies"]
+        result.append(
+            {
+                "fingerprint": fingerprint,
+                "text": texts.get(fingerprint),
+                "tests": len(group["test_ids"]),
+                "passed": group["statuses"].count("passed"),
+                "failed": sum(s in ("failed", "error") for s in group["statuses"]),
+                "sent_messages": len(group["sent_messages"]),
+                "latency": (
+                    {
+                        "mean": round(statistics.fmean(latencies), 3),
+                        "p50": round(percentile(latencies, 50), 3),
+                        "p95": round(percentile(latencies, 95), 3),
+                        "max": round(max(latencies), 3),
+                    }
+                    if latencies
+                    else None
+                ),
+                "test_ids": group["test_ids"],
+            }
+        )
+    return sorted(result, key=lambda g: (-g["tests"], g["fingerprint"]))
+
+
+def response_groups_html(groups):
+    """Render response groups as a table with each reply shown once."""
+    if not groups:
+        return "<p>No bot responses recorded.</p>"
+    rows = ""
+    for group in groups:
+        latency = group["latency"] or {}
+        tests = "<br>".join(html.escape(test_id) for test_id in group["test_ids"])
+        rows += (
+            "<tr>"
+            f'<td style="padding:6px; border:1px solid #ddd; font-family:monospace;">{group["fingerprint"]}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{group["tests"]}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{group["passed"]} / {group["failed"]}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{group["sent_messages"]}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{latency.get("mean", "")}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{latency.get("p50", "")}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{latency.get("p95", "")}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{latency.get("max", "")}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd; white-space:pre-wrap;">{html.escape(group["text"] or "")}'
+            f"<details><summary>Tests</summary>{tests}</details></td>"
+            "</tr>"
+        )
+    return (
+        '<table style="width:100%; border-collapse: collapse;">'
+        "<tr><th>Fingerprint</th><th>Tests</th><th>Passed / Failed</th><th>Distinct messages</th>"
+        "<th>Mean (s)</th><th>p50 (s)</th><th>p95 (s)</th><th>Max (s)</th><th>Bot Response</th></tr>"
+        f"{rows}</table>"
+    )
@@ -0,0 +1,135 @@
+"""
+Stratified sampling for chatbot QA testing.
+Picks a fixed-budget sample of cases (test cases or corpus queries) spread
+over their categories, weighted toward the cases that failed or were slow in
+recent runs, and rotating so that every case runs within a fixed number of
+cycles.
+
+The sample only depends on its inputs (cycle number and history), so every
+xdist worker collecting the same tests selects the same sample.
+"""
+
+import hashlib
+import random
+import statistics
+
+
+def allocate_budget(sizes, budget):
+    """
+    Split a budget across categories in proportion to their size.
+
+    Every category gets at least one case when the budget allows it.
+
+    Args:
+        sizes (dict): category -> number of cases
+        budget (int): Total cases to pick
+
+    Returns:
+        dict: category -> cases to pick (never more than its size)
+    """
+    categories = sorted(sizes)
+    budget = min(budget, sum(sizes.values()))
+    allocation = {c: 1 if budget >= len(categories) else 0 for c in categories}
+    total = sum(sizes.values())
+    quotas = {c: budget * sizes[c] / total for c in categories}
+    for _ in range(budget - sum(allocation.values())):
+        # The category furthest below its proportional share gets the next case
+        category = max(
+            (c for c in categories if allocation[c] < sizes[c]),
+            key=lambda c: (quotas[c] - allocation[c], c),
+        )
+        allocation[category] += 1
+    return allocation
+
+
+def _digest(text):
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _rotation(category, keys, rotation_cycles):
+    """Assign the keys of a category evenly to rotation slots, stable across processes."""
+    ordered = sorted(keys, key=_digest)
+    # Offset per category, so small categories are not all due in the same cycle
+    offset = _digest(category)
+    return {key: (offset + index) % rotation_cycles for index, key in enumerate(ordered)}
+
+
+def case_weights(keys, stats, failure_weight, slow_weight):
+    """
+    Sampling weight of each case from its recent history.
+
+    A case weighs 1, plus failure_weight times its failure rate, plus
+    slow_weight times how much slower its mean latency is than the median of
+    its category.
+
+    Args:
+        keys (list): Case keys of one category
+        stats (dict): case key -> fail_rate and mean_latency (RunHistory.flake_stats())
+        failure_weight (float): Extra weight of an always-failing case
+        slow_weight (float): Extra weight per multiple of the category median latency
+
+    Returns:
+        dict: case key -> weight
+    """
+    latencies = [
+        stats[k]["mean_latency"] for k in keys if k in stats and stats[k].get("mean_latency")
+    ]
+    median = statistics.median(latencies) if latencies else None
+    weights = {}
+    for key in keys:
+        case = stats.get(key, {})
+        weight = 1.0 + failure_weight * case.get("fail_rate", 0.0)
+        if median and case.get("mean_latency"):
+            weight += slow_weight * max(0.0, case["mean_latency"] / median - 1)
+        weights[key] = weight
+    return weights
+
+
+def stratified_sample(
+    cases,
+    budget,
+    cycle=0,
+    rotation_cycles=4,
+    stats=None,
+    failure_weight=4.0,
+    slow_weight=2.0,
+):
+    """
+    Pick a stratified, history-weighted sample of cases.
+
+    In every category the cases due in this cycle of the rotation are always
+    picked, and the rest of the category's share of the budget is drawn by
+    weighted sampling without replacement. The sample can exceed the budget
+    when the budget is too small to cover the rotation (fewer than
+    cases / rotation_cycles).
+
+    Args:
+        cases (dict): case key -> category, in the order the sample is returned
+        budget (int): Cases to pick
+        cycle (int): Number of the current cycle (e.g. runs stored in the history)
+        rotation_cycles (int): Every case is picked at least once every this many cycles
+        stats (dict, optional): case key -> fail_rate and mean_latency
+        failure_weight (float): Extra weight of an always-failing case
+        slow_weight (float): Extra weight per multiple of the category median latency
+
+    Returns:
+        list: Selected case keys
+    """
+    stats = stats or {}
+    categories = {}
+    for key, category in cases.items():
+        categories.setdefault(category, []).append(key)
+    allocation = allocate_budget({c: len(k) for c, k in categories.items()}, budget)
+    rng = random.Random(f"sample-{cycle}")
+
+    selected = set()
+    for category, keys in sorted(categories.items()):
+        slots = _rotation(category, keys, max(1, rotation_cycles))
+        due = [k for k in keys if slots[k] == cycle % max(1, rotation_cycles)]
+        selected.update(due)
+        rest = [k for k in keys if k not in due]
+        weights = case_weights(keys, stats, failure_weight, slow_weight)
+        # Weighted sampling without replacement (Efraimidis-Spirakis keys)
+        rest.sort(key=lambda k: rng.random() ** (1.0 / weights[k]), reverse=True)
+        selected.update(rest[: max(0, allocation[category] - len(due))])
+    return [key for key in cases if key in selected]
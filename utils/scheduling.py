@@ -0,0 +1,113 @@
+"""
+Duration-aware test scheduling for chatbot QA testing.
+Dispatches tests to xdist workers longest-first using the per-test
+durations stored in the run history, which keeps slow cases from being
+left for the end of the run.
+"""
+
+import statistics
+
+from xdist.scheduler import LoadScheduling
+
+from utils.history import normalize_test_id
+
+
+def estimate_durations(test_ids, known_durations, default_estimate):
+    """
+    Estimate the duration of every test id.
+
+    Tests without history get the median of the known durations, or the
+    default estimate when nothing is known yet.
+
+    Args:
+        test_ids (list): pytest node ids
+        known_durations (dict): Normalized test id -> duration in seconds
+        default_estimate (float): Fallback duration in seconds
+
+    Returns:
+        dict: test id -> estimated duration in seconds
+    """
+    fallback = (
+        statistics.median(known_durations.values())
+        if known_durations
+        else default_estimate
+    )
+    return {
+        test_id: known_durations.get(normalize_test_id(test_id), fallback)
+        for test_id in test_ids
+    }
+
+
+class LongestFirstScheduling(LoadScheduling):
+    """
+    xdist load scheduler that sends the longest tests first.
+
+    Every worker keeps exactly two tests queued (the one running and the
+    next one, which xdist needs for fixture teardown decisions), so each
+    free worker always picks the longest remaining test (LPT scheduling).
+    """
+
+    def __init__(self, config, log=None, durations=None, default_estimate=30.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            config (pytest.Config): pytest configuration
+            log (Producer, optional): xdist logger
+            durations (dict, optional): Normalized test id -> historical duration
+            default_estimate (float): Duration assumed for tests without history
+        """
+        super().__init__(config, log)
+        self.durations = durations or {}
+        self.default_estimate = default_estimate
+
+    def schedule(self):
+        """Create the longest-first pending list and send the first tests."""
+        assert self.collection_is_completed
+
+        # Initial distribution already happened, reschedule on all nodes
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        if not self.collection:
+            return
+
+        estimates = estimate_durations(
+            self.collection, self.durations, self.default_estimate
+        )
+        # sorted() is stable, so ties keep the collection order
+        self.pending[:] = sorted(
+            range(len(self.collection)),
+            key=lambda index: estimates[self.collection[index]],
+            reverse=True,
+        )
+
+        # Two rounds so every node gets one test to run and one queued
+        for _ in range(2):
+            for node in self.nodes:
+                self._send_tests(node, 1)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration=0):
+        """Top the node up to two queued tests, or shut it down when done."""
+        if node.shutting_down:
+            return
+
+        if self.pending:
+            missing = 2 - len(self.node2pending[node])
+            if missing > 0:
+                self._send_tests(node, missing)
+        else:
+            node.shutdown()
+
+        self.log("num items waiting for node:", len(self.pending))
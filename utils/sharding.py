@@ -0,0 +1,187 @@
+"""
+Cross-machine sharding for chatbot QA testing.
+Splits collected test ids into duration-balanced shards and merges the
+per-shard result fragments back into a single summary and report.
+"""
+
+import html
+import json
+import os
+
+from utils.responses import (
+    group_by_response,
+    normalize_response,
+    response_fingerprint,
+    response_groups_html,
+)
+
+
+def parse_shard(value):
+    """
+    Parse a shard specification such as "2/4".
+
+    Args:
+        value (str): "<index>/<total>" with a 1-based index
+
+    Returns:
+        tuple: (index, total)
+    """
+    try:
+        index, total = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected <index>/<total> (e.g. 1/4)")
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"Invalid shard '{value}', index must be between 1 and {total}")
+    return index, total
+
+
+def partition_tests(test_ids, estimates, total):
+    """
+    Partition tests into balanced bins (longest processing time first).
+
+    The result only depends on its inputs, so every machine computes the
+    same partition from the same collection and history. Machines with
+    different histories (or sampled selections) must share a plan instead
+    (write_shard_plan()).
+
+    Args:
+        test_ids (list): Collected pytest node ids
+        estimates (dict): test id -> estimated duration in seconds
+        total (int): Number of shards
+
+    Returns:
+        list: One (test ids, estimated seconds) tuple per shard
+    """
+    bins = [([], 0.0) for _ in range(total)]
+    ordered = sorted(test_ids, key=lambda test_id: (-estimates[test_id], test_id))
+    for test_id in ordered:
+        # Ties go to the lowest shard index to keep the result deterministic
+        target = min(range(total), key=lambda i: (bins[i][1], i))
+        ids, load = bins[target]
+        ids.append(test_id)
+        bins[target] = (ids, load + estimates[test_id])
+    # Keep the collection order inside each shard (better fixture reuse)
+    position = {test_id: i for i, test_id in enumerate(test_ids)}
+    return [(sorted(ids, key=position.get), round(load, 2)) for ids, load in bins]
+
+
+def write_shard_plan(path, bins, count):
+    """
+    Write a partition for every shard machine to read.
+
+    Args:
+        path (str): Plan JSON file
+        bins (list): Partition returned by partition_tests()
+        count (int): --count the test ids were collected with
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    plan = {
+        "total": len(bins),
+        "count": count,
+        "shards": [{"tests": ids, "estimated_s": load} for ids, load in bins],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=2)
+
+
+def load_shard_plan(path, total, count):
+    """
+    Read a partition written by write_shard_plan().
+
+    Args:
+        path (str): Plan JSON file
+        total (int): Number of shards of this run
+        count (int): --count of this run
+
+    Returns:
+        list: One (test ids, estimated seconds) tuple per shard
+
+    Raises:
+        ValueError: If the plan was made for another number of shards or --count
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan["total"] != total or plan["count"] != count:
+        raise ValueError(
+            f"Shard plan {path} is for {plan['total']} shards with --count {plan['count']}, "
+            f"not {total} shards with --count {count}"
+        )
+    return [(shard["tests"], shard["estimated_s"]) for shard in plan["shards"]]
+
+
+def merge_fragments(paths):
+    """
+    Merge per-shard summary JSON fragments.
+
+    Args:
+        paths (list): Summary JSON files written by each shard
+
+    Returns:
+        dict: Combined test id -> data mapping
+    """
+    merged = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            fragment = json.load(f)
+        for test_id, data in fragment.items():
+            data.setdefault("fragment", os.path.basename(path))
+            merged[test_id] = data
+    return merged
+
+
+def render_summary_html(summary, title):
+    """
+    Render a merged summary as a standalone HTML report.
+
+    Args:
+        summary (dict): test id -> data as written by conftest
+        title (str): Report title
+
+    Returns:
+        str: HTML document
+    """
+    counts = {}
+    texts = {}
+    for data in summary.values():
+        counts[data.get("status")] = counts.get(data.get("status"), 0) + 1
+        # Fragments written before responses were fingerprinted only carry the text
+        if data.get("response_text") is not None:
+            data.setdefault("response_id", response_fingerprint(data["response_text"]))
+            texts.setdefault(data["response_id"], normalize_response(data["response_text"]))
+    totals = ", ".join(f"{count} {status}" for status, count in sorted(counts.items(), key=str))
+
+    rows = ""
+    for test_id, data in summary.items():
+        status = data.get("status") or "unknown"
+        color = {"passed": "#2ecc71", "failed": "#e74c3c", "error": "#e74c3c"}.get(status, "#95a5a6")
+        response_time = data.get("response_time")
+        rows += (
+            "<tr>"
+            f'<td style="padding:6px; border:1px solid #ddd;">{html.escape(test_id)}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd; color:{color}; font-weight:bold;">{status}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{data.get("duration")}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{round(response_time * 1000, 2) if response_time else ""}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{html.escape(str(data.get("sent_message") or ""))}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd; font-family:monospace;">{data.get("response_id") or ""}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{html.escape(str(data.get("error") or ""))}</td>'
+            f'<td style="padding:6px; border:1px solid #ddd;">{html.escape(str(data.get("fragment") or ""))}</td>'
+            "</tr>"
+        )
+
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{html.escape(title)}</title></head>
+<body style="font-family: Helvetica, Arial, sans-serif; margin: 20px;">
+<h1>{html.escape(title)}</h1>
+<p>{len(summary)} tests: {html.escape(totals)}</p>
+<table style="width:100%; border-collapse: collapse;">
+<tr><th>Test</th><th>Status</th><th>Duration (s)</th><th>Response Time (ms)</th><th>Sent Message</th><th>Response</th><th>Error</th><th>Shard</th></tr>
+{rows}
+</table>
+<h2>Bot responses grouped by fingerprint</h2>
+{response_groups_html(group_by_response(summary, texts))}
+</body>
+</html>
+"""
@@ -0,0 +1,138 @@
+"""
+Latency SLOs for chatbot QA testing.
+Evaluates objectives such as @pytest.mark.slo(p95=2.0, max=5.0) over all
+the parametrized cases and repeats of a test function, after the results of
+every xdist worker have reached the controller.
+
+A group without any latency (e.g. all its cases skipped or quarantined) has
+no data and neither passes nor fails, unless a min_samples objective asks
+for a number of measured cases.
+"""
+
+import math
+import re
+
+_PERCENTILE = re.compile(r"^p(\d{1,2}(?:\.\d+)?)$")
+
+
+def percentile(values, q):
+    """
+    Percentile with linear interpolation between closest ranks.
+
+    Args:
+        values (list): Sample values
+        q (float): Percentile between 0 and 100
+
+    Returns:
+        float: Value at the percentile
+    """
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def measure(values, objective):
+    """
+    Compute the statistic named by an objective ("p95", "max", "mean").
+
+    Args:
+        values (list): Latencies in seconds
+        objective (str): Objective name
+
+    Returns:
+        float: Measured value
+    """
+    if objective == "max":
+        return max(values)
+    if objective == "mean":
+        return sum(values) / len(values)
+    match = _PERCENTILE.match(objective)
+    if match:
+        return percentile(values, float(match.group(1)))
+    raise ValueError(f"Unknown SLO objective '{objective}', expected pNN, max or mean")
+
+
+def validate_objectives(objectives):
+    """
+    Check the keyword arguments of an slo marker.
+
+    Args:
+        objectives (dict): Objective name -> threshold in seconds
+
+    Raises:
+        ValueError: If the marker is empty, an objective is unknown or a
+            threshold is not a positive number
+    """
+    if not objectives:
+        raise ValueError("slo marker needs at least one objective, e.g. slo(p95=2.0)")
+    for name, threshold in objectives.items():
+        if name == "min_samples":
+            if not isinstance(threshold, int) or threshold <= 0:
+                raise ValueError("SLO min_samples must be a positive number of cases")
+            continue
+        measure([0.0], name)
+        if not isinstance(threshold, (int, float)) or threshold <= 0:
+            raise ValueError(f"SLO threshold for '{name}' must be a positive number of seconds")
+
+
+def evaluate_slos(test_data):
+    """
+    Evaluate the SLO groups found in the collected test data.
+
+    Every entry with "slo" objectives and a "slo_group" (the test function
+    node id) contributes its response_time to its group.
+
+    Args:
+        test_data (dict): test id -> data as collected by conftest
+
+    Returns:
+        dict: group -> samples, missing (cases without a latency), per-objective
+            target/measured/passed, the overall status ("passed", "failed" or
+            "no data") and passed flag (None when there is no data)
+    """
+    groups = {}
+    for data in test_data.values():
+        if not data.get("slo"):
+            continue
+        group = groups.setdefault(
+            data["slo_group"], {"objectives": data["slo"], "latencies": [], "missing": 0}
+        )
+        if data.get("response_time") is not None:
+            group["latencies"].append(data["response_time"])
+        else:
+            group["missing"] += 1
+
+    results = {}
+    for name, group in sorted(groups.items()):
+        latencies = group["latencies"]
+        objectives = {}
+        for objective, target in group["objectives"].items():
+            if objective == "min_samples":
+                objectives[objective] = {
+                    "target": target,
+                    "measured": len(latencies),
+                    "passed": len(latencies) >= target,
+                }
+                continue
+            measured = measure(latencies, objective) if latencies else None
+            objectives[objective] = {
+                "target": target,
+                "measured": round(measured, 3) if measured is not None else None,
+                "passed": measured <= target if measured is not None else None,
+            }
+        if any(o["passed"] is False for o in objectives.values()):
+            status, passed = "failed", False
+        elif not latencies:
+            status, passed = "no data", None
+        else:
+            status, passed = "passed", True
+        results[name] = {
+            "samples": len(latencies),
+            "missing": group["missing"],
+            "objectives": objectives,
+            "status": status,
+            "passed": passed,
+        }
+    return results
@@ -0,0 +1,130 @@
+"""
+Soak monitoring for long single-session conversations.
+Records per-turn latency and periodic browser samples (DOM size, JS heap,
+process RSS) and checks whether any of them degrades with conversation length.
+"""
+
+import statistics
+
+from utils.resource_sampler import BrowserResourceSampler, linear_fit
+
+# performance.memory is Chromium-only; other browsers report no heap size
+_BROWSER_METRICS_SCRIPT = """
+return {
+    dom_nodes: document.getElementsByTagName('*').length,
+    js_heap: performance.memory ? performance.memory.usedJSHeapSize : null
+};
+"""
+
+
+class SoakMonitor:
+    """Collects soak-test measurements for one browser session."""
+
+    def __init__(self, driver, sample_every=25):
+        """
+        Initialize the monitor.
+
+        Args:
+            driver (WebDriver): Driver of the session under test
+            sample_every (int): Turns between browser samples
+        """
+        self.driver = driver
+        self.sample_every = sample_every
+        self.latencies = []
+        self.samples = []
+        self._resources = BrowserResourceSampler(driver)
+
+    def record_turn(self, latency):
+        """
+        Record the latency of a turn, sampling the browser when due.
+
+        Args:
+            latency (float): Seconds from sending the message to the bot reply
+        """
+        self.latencies.append(latency)
+        turn = len(self.latencies)
+        if turn == 1 or turn % self.sample_every == 0:
+            self.sample(turn)
+
+    def sample(self, turn):
+        """
+        Take a browser sample at the given turn.
+
+        Args:
+            turn (int): Number of turns completed so far
+
+        Returns:
+            dict: Sample with turn, median latency of the last turns, DOM nodes,
+                JS heap and RSS (None for values the browser cannot report)
+        """
+        metrics = self.driver.execute_script(_BROWSER_METRICS_SCRIPT) or {}
+        resources = self._resources.sample()
+        recent = self.latencies[-self.sample_every:]
+        data = {
+            "turn": turn,
+            "latency_ms": round(statistics.median(recent) * 1000, 2),
+            "dom_nodes": metrics.get("dom_nodes"),
+            "js_heap_mb": (
+                round(metrics["js_heap"] / (1024 * 1024), 2)
+                if metrics.get("js_heap") is not None
+                else None
+            ),
+            "rss_mb": round(resources["rss_mb"], 2) if resources else None,
+        }
+        self.samples.append(data)
+        return data
+
+    def analyze(self, latency_ratio=1.5, memory_slope_mb=20.0, min_samples=4):
+        """
+        Check whether latency or memory degrades with conversation length.
+
+        Latency degrades when the median of the last tenth of the turns is at
+        least latency_ratio times the median of the first tenth. Memory degrades
+        when the JS heap or RSS slope exceeds memory_slope_mb per 1000 turns.
+        DOM growth is reported but not judged, since the history is expected
+        to grow with the conversation.
+
+        Args:
+            latency_ratio (float): Late/early latency ratio flagged as degradation
+            memory_slope_mb (float): MB per 1000 turns flagged as memory growth
+            min_samples (int): Browser samples needed to fit memory trends
+
+        Returns:
+            dict: Turn count, latency and per-metric trends, and degradation flags
+        """
+        result = {
+            "turns": len(self.latencies),
+            "latency": None,
+            "trends": {},
+            "latency_degraded": False,
+            "memory_degraded": False,
+            "samples": self.samples,
+        }
+        if len(self.latencies) >= 20:
+            window = max(10, len(self.latencies) // 10)
+            early = statistics.median(self.latencies[:window])
+            late = statistics.median(self.latencies[-window:])
+            ratio = late / early if early else 0.0
+            slope, _ = linear_fit(range(len(self.latencies)), self.latencies)
+            result["latency"] = {
+                "early_median_ms": round(early * 1000, 2),
+                "late_median_ms": round(late * 1000, 2),
+                "ratio": round(ratio, 2),
+                "slope_ms_per_100_turns": round(slope * 1000 * 100, 2),
+            }
+            result["latency_degraded"] = ratio >= latency_ratio
+
+        for metric in ("dom_nodes", "js_heap_mb", "rss_mb"):
+            points = [(s["turn"], s[metric]) for s in self.samples if s[metric] is not None]
+            if len(points) < min_samples:
+                continue
+            slope, _ = linear_fit(*zip(*points))
+            result["trends"][metric] = {
+                "first": points[0][1],
+                "last": points[-1][1],
+                "per_1000_turns": round(slope * 1000, 2),
+            }
+            if metric != "dom_nodes" and slope * 1000 > memory_slope_mb:
+                result["memory_degraded"] = True
+
+        return result
@@ -0,0 +1,53 @@
+"""
+Text entry strategies for the page objects.
+"typing" sends the text with send_keys, which the driver replays one key
+event at a time; "script" sets the whole value in one script call and fires
+the events the widget listens for, so long messages cost a single round trip.
+"""
+
+from utils.element_cache import CachedElement
+from utils.tracing import TRACER
+
+INPUT_STRATEGIES = ("script", "typing")
+
+# The native value setter keeps framework-controlled inputs (React, Vue) in sync
+_SET_VALUE_SCRIPT = """
+const [element, text] = arguments;
+element.focus();
+const prototype = element instanceof HTMLTextAreaElement
+    ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+Object.getOwnPropertyDescriptor(prototype, 'value').set.call(element, text);
+const key = text.slice(-1);
+element.dispatchEvent(new KeyboardEvent('keydown', {key: key, bubbles: true}));
+element.dispatchEvent(new InputEvent('input', {data: text, inputType: 'insertText', bubbles: true}));
+element.dispatchEvent(new KeyboardEvent('keyup', {key: key, bubbles: true}));
+element.dispatchEvent(new Event('change', {bubbles: true}));
+"""
+
+
+def enter_text(driver, element, text, strategy="script"):
+    """
+    Replace the content of an input field with the given text.
+
+    The strategy used is recorded on the current test trace as
+    "input_strategy", so it ends up in the test results.
+
+    Args:
+        driver (WebDriver): Driver that owns the element
+        element (WebElement or CachedElement): Input or textarea element; a cached
+            element is re-resolved if the widget re-rendered it
+        text (str): Text to enter
+        strategy (str): "script" (one script call) or "typing" (send_keys)
+    """
+    if strategy not in INPUT_STRATEGIES:
+        raise ValueError(
+            f"Unknown input strategy '{strategy}', expected one of {INPUT_STRATEGIES}"
+        )
+    if strategy == "typing":
+        element.clear()
+        element.send_keys(text)
+    elif isinstance(element, CachedElement):
+        element.apply(lambda resolved: driver.execute_script(_SET_VALUE_SCRIPT, resolved, text))
+    else:
+        driver.execute_script(_SET_VALUE_SCRIPT, element, text)
+    TRACER.annotate("input_strategy", strategy)
@@ -0,0 +1,357 @@
+"""
+Lightweight tracing for chatbot QA testing.
+Records nested timing spans around page-object methods and waits so the
+report can show where harness time goes inside each test.
+
+Trees stay bounded in long tests (e.g. a soak conversation): a span that
+repeats its previous sibling with the same shape is folded into it with a
+call count, and past max_children per parent a span is folded into the
+latest sibling with its name, and so are its children.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+class Span:
+    """A timed section of work, possibly containing nested spans."""
+
+    def __init__(self, name, attributes=None):
+        """
+        Initialize and start the span.
+
+        Args:
+            name (str): Name of the span (method or phase)
+            attributes (dict, optional): Extra data recorded with the span
+        """
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.children = []
+        self.start = time.perf_counter()
+        self.end = None
+        # Repeated spans (e.g. polled checks, turns of a conversation) are merged into one entry
+        self.calls = 1
+        self.merged_duration = 0.0
+
+    @property
+    def duration(self):
+        """Duration in seconds (up to now if the span is still open)."""
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start + self.merged_duration
+
+    def same_shape(self, other):
+        """True if both spans have the same name, attributes and nested span shapes."""
+        return (
+            other.name == self.name
+            and other.attributes == self.attributes
+            and len(other.children) == len(self.children)
+            and all(mine.same_shape(theirs) for mine, theirs in zip(self.children, other.children))
+        )
+
+    def absorb(self, other):
+        """
+        Merge a repeated sibling span into this one, children included.
+
+        Args:
+            other (Span): Closed span with the same shape
+
+        Returns:
+            bool: True if the span was merged
+        """
+        if not self.same_shape(other):
+            return False
+        self.calls += other.calls
+        self.merged_duration += other.duration
+        for mine, theirs in zip(self.children, other.children):
+            mine.absorb(theirs)
+        return True
+
+    def fold(self, other):
+        """
+        Add the calls and duration of another span to this one.
+
+        Each child of the other span is folded into the latest child with
+        its name (or added if there is none), so the tree only grows with
+        new span names.
+
+        Args:
+            other (Span): Closed span with the same name
+        """
+        self.calls += other.calls
+        self.merged_duration += other.duration
+        for theirs in other.children:
+            mine = next((c for c in reversed(self.children) if c.name == theirs.name), None)
+            if mine is None:
+                self.children.append(theirs)
+            else:
+                mine.fold(theirs)
+
+    def to_dict(self, origin=None):
+        """
+        Convert the span and its children to plain data.
+
+        Args:
+            origin (float, optional): perf_counter value used as time zero
+
+        Returns:
+            dict: name, offset_ms, duration_ms, attributes and children
+        """
+        origin = self.start if origin is None else origin
+        data = {
+            "name": self.name,
+            "offset_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round(self.duration * 1000, 2),
+        }
+        if self.calls > 1:
+            data["calls"] = self.calls
+        if self.attributes:
+            data["attributes"] = self.attributes
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in self.children]
+        return data
+
+
+class Tracer:
+    """
+    Collects span trees, one per thread.
+    The conftest hooks reset the tracer at the start of every test and
+    collect the finished tree when the test call ends.
+    """
+
+    def __init__(self, max_children=200):
+        """
+        Initialize the tracer with an empty root span.
+
+        Args:
+            max_children (int): Spans kept per parent before repeated names are folded
+        """
+        self.max_children = max_children
+        self._local = threading.local()
+
+    def _stack(self):
+        """Return the span stack of the current thread."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = [Span("root")]
+            self._local.stack = stack
+        return stack
+
+    def reset(self, name="root"):
+        """
+        Discard the current tree and start a new root span.
+
+        Args:
+            name (str): Name of the new root span (usually the test id)
+        """
+        self._local.stack = [Span(name)]
+
+    @property
+    def current(self):
+        """The innermost open span."""
+        return self._stack()[-1]
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Open a span nested in the current one for the duration of the block.
+
+        Args:
+            name (str): Name of the span
+            **attributes: Extra data recorded with the span
+        """
+        stack = self._stack()
+        parent = stack[-1]
+        span = Span(name, attributes)
+        parent.children.append(span)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            # Pop up to this span in case an inner span was left open
+            while len(stack) > 1 and stack[-1] is not span:
+                stack.pop()
+            if len(stack) > 1:
+                stack.pop()
+            siblings = parent.children
+            if len(siblings) > 1 and siblings[-1] is span:
+                if siblings[-2].absorb(span):
+                    siblings.pop()
+                elif len(siblings) > self.max_children:
+                    same_name = next(
+                        (s for s in reversed(siblings[:-1]) if s.name == span.name), None
+                    )
+                    if same_name is not None:
+                        same_name.fold(span)
+                        siblings.pop()
+
+    def annotate(self, key, value):
+        """
+        Record an attribute on the root span of the current tree.
+
+        Args:
+            key (str): Attribute name
+            value: JSON-serializable value
+        """
+        self._stack()[0].attributes[key] = value
+
+    def finish(self):
+        """
+        Close the root span and return the tree as plain data.
+
+        Returns:
+            dict: Span tree as returned by Span.to_dict()
+        """
+        root = self._stack()[0]
+        root.end = time.perf_counter()
+        return root.to_dict()
+
+
+TRACER = Tracer()
+
+
+def traced(name):
+    """
+    Decorator that runs the wrapped function inside a span.
+
+    Args:
+        name (str): Name of the span
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_public_methods(cls):
+    """
+    Class decorator that wraps every public method of the class in a span
+    named "<ClassName>.<method>".
+    """
+    for attr_name, attr in list(vars(cls).items()):
+        if attr_name.startswith("_") or not callable(attr):
+            continue
+        setattr(cls, attr_name, traced(f"{cls.__name__}.{attr_name}")(attr))
+    return cls
+
+
+def _condition_name(condition):
+    """Return a readable name for a WebDriverWait condition."""
+    name = getattr(condition, "__qualname__", None) or type(condition).__name__
+    return name.split(".<locals>")[0]
+
+
+class TracedWebDriverWait(WebDriverWait):
+    """WebDriverWait that records every until/until_not call as a span."""
+
+    def until(self, method, message=""):
+        """Wait until the condition is truthy, inside a "wait.until" span."""
+        with TRACER.span("wait.until", condition=_condition_name(method)):
+            return super().until(method, message)
+
+    def until_not(self, method, message=""):
+        """Wait until the condition is falsy, inside a "wait.until_not" span."""
+        with TRACER.span("wait.until_not", condition=_condition_name(method)):
+            return super().until_not(method, message)
+
+
+def aggregate_spans(trees):
+    """
+    Aggregate span trees per span name (flame-style table).
+
+    Self time is the span duration minus the time spent in its children,
+    so it shows where time is actually spent rather than where it is nested.
+
+    Args:
+        trees (list): Span trees as returned by Tracer.finish()
+
+    Returns:
+        dict: Per span name: calls, total_ms, self_ms, mean_ms and max_ms
+    """
+    table = {}
+
+    def visit(node):
+        children = node.get("children", [])
+        child_time = sum(child["duration_ms"] for child in children)
+        row = table.setdefault(
+            node["name"], {"calls": 0, "total_ms": 0.0, "self_ms": 0.0, "max_ms": 0.0}
+        )
+        row["calls"] += node.get("calls", 1)
+        row["total_ms"] += node["duration_ms"]
+        row["self_ms"] += max(node["duration_ms"] - child_time, 0.0)
+        row["max_ms"] = max(row["max_ms"], node["duration_ms"])
+        for child in children:
+            visit(child)
+
+    for tree in trees:
+        # The root span is the whole test; only its descendants are interesting
+        for child in tree.get("children", []):
+            visit(child)
+
+    for row in table.values():
+        row["mean_ms"] = round(row["total_ms"] / row["calls"], 2)
+        row["total_ms"] = round(row["total_ms"], 2)
+        row["self_ms"] = round(row["self_ms"], 2)
+        row["max_ms"] = round(row["max_ms"], 2)
+
+    return dict(sorted(table.items(), key=lambda item: item[1]["self_ms"], reverse=True))
+
+
+def format_span_tree(tree, indent=0):
+    """
+    Render a span tree as indented text lines.
+
+    Args:
+        tree (dict): Span tree as returned by Tracer.finish()
+        indent (int): Current nesting level
+
+    Returns:
+        list: One line per span
+    """
+    label = tree["name"]
+    condition = tree.get("attributes", {}).get("condition")
+    if condition:
+        label += f" [{condition}]"
+    if tree.get("calls"):
+        label += f" x{tree['calls']}"
+    lines = [f"{'  ' * indent}{label}  {tree['duration_ms']} ms"]
+    for child in tree.get("children", []):
+        lines.extend(format_span_tree(child, indent + 1))
+    return lines
+
+
+def phase_totals(tree, names):
+    """
+    Sum the duration of spans with the given names anywhere in a tree.
+
+    Args:
+        tree (dict): Span tree as returned by Tracer.finish()
+        names (tuple): Span names to collect (e.g. "echo_wait", "reply_wait")
+
+    Returns:
+        dict: Total milliseconds per span name found in the tree
+    """
+    totals = {}
+
+    def visit(node):
+        if node["name"] in names:
+            totals[node["name"]] = round(
+                totals.get(node["name"], 0.0) + node["duration_ms"], 2
+            )
+            # Phases are not nested in each other; no need to look deeper
+            return
+        for child in node.get("children", []):
+            visit(child)
+
+    visit(tree)
+    return totals